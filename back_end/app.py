@@ -5,24 +5,41 @@ from pathlib import Path
 from typing import Optional
 
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
 from utils.helper.notify_job import (
     create_job_queue,
     init_job_state,
     notify_job,
-    get_job_state
+    get_job_state,
+    cleanup_job,
+    RESTYLE_TASKS_ORDER,
 )
 
 from utils.helper.detect_is_audio import detect_is_audio_trues
+from utils.extract_voice_utils import DEMUCS_MODELS
+from utils.asr.registry import ASR_BACKENDS, available_backends
+from utils.asr.adaptive import DECODING_MODES
+from utils.asr.base import TIMING_MODES
+from utils.cache.artifact_cache import copy_and_hash
+from utils.subtitle_config.subtitle_position import _ALIGNMENT_MAP
+from utils.subtitle_video_utils import SUBTITLE_MODES
+from utils.subtitle_config.export_formats import EXPORT_FORMATS, EXPORT_FILE_TYPES, parse_export_formats
+from utils.helper.segments_json import load_segments_json
+from interfaces.interface import export_subtitles_interface
 
-from service.crud import get_all_jobs, get_job_serialized
-from pipeline import run_full_pipeline, unique_output_dir
+from service.crud import get_all_jobs, get_job_serialized, get_job_params, get_latest_job_file
+from pipeline import run_full_pipeline_job, run_restyle_pipeline_job, unique_output_dir
+from pipeline_streaming import run_streaming_pipeline_job
 from sse import router as sse_router
-from service.crud import create_job, add_job_file
+from service.crud import create_job, add_job_file, set_job_status
 from db.db import init_db
+from scheduler.job_scheduler import scheduler, QueueFullError
+from worker.client import start_worker_pool, stop_worker_pool
+from utils.cache.model_registry import model_registry
 
 app = FastAPI(title="Pipeline Audio → Sous-titres")
 init_db()
@@ -40,9 +57,49 @@ UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 app.mount("/uploads", StaticFiles(directory=str(UPLOAD_DIR)), name="uploads")
 
+# séparation de la voix : "auto" = Demucs seulement si l'audio n'est pas déjà de la parole propre
+SEPARATION_MODES = ("auto", "always", "never")
+
+# "streaming" : extraction / séparation / transcription se chevauchent (premières phrases plus tôt)
+PIPELINE_MODES = ("batch", "streaming")
+
+# formats servis par GET /jobs/{id}/subtitles/{format}
+SUBTITLE_MEDIA_TYPES = {
+    "ass": "text/x-ssa",
+    "srt": "application/x-subrip",
+    "vtt": "text/vtt",
+    "json": "application/json",
+}
+
 # inclure le router SSE
 app.include_router(sse_router)
 
+# scheduler : file persistée + limites par ressource (ffmpeg / demucs / asr)
+scheduler.register_runner("full", run_full_pipeline_job)
+scheduler.register_runner("restyle", run_restyle_pipeline_job)
+scheduler.register_runner("stream", run_streaming_pipeline_job)
+
+
+@app.on_event("startup")
+async def start_scheduler():
+    # workers d'inférence résidents (INFERENCE_WORKERS), avant les jobs restaurés
+    await run_in_threadpool(start_worker_pool)
+    await scheduler.start()
+
+
+@app.on_event("shutdown")
+async def stop_scheduler():
+    await scheduler.stop()
+    await run_in_threadpool(stop_worker_pool)
+
+
+def _queue_full_response(e: QueueFullError) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=str(e),
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
 
 @app.post("/video/process")
 async def upload_and_process_video(
@@ -54,8 +111,52 @@ async def upload_and_process_video(
     font_outline_color: str = Form("#000000"),
     fond: Optional[str] = Form(None),
     fond_file: Optional[UploadFile] = File(None),
+    demucs_model: Optional[str] = Form(None),
+    separation: str = Form("auto"),
+    asr_backend: str = Form("auto"),
+    decoding: Optional[str] = Form(None),
+    timing_mode: Optional[str] = Form(None),
+    mode: str = Form("batch"),
+    export_formats: Optional[str] = Form(None),
+    subtitle_mode: str = Form("burn"),
     file: UploadFile = File(...),
 ):
+    if demucs_model is not None and demucs_model not in DEMUCS_MODELS:
+        raise HTTPException(status_code=400, detail=f"demucs_model doit être l'un de {', '.join(DEMUCS_MODELS)}")
+
+    if separation not in SEPARATION_MODES:
+        raise HTTPException(status_code=400, detail=f"separation doit être l'un de {', '.join(SEPARATION_MODES)}")
+
+    if asr_backend not in ASR_BACKENDS:
+        raise HTTPException(status_code=400, detail=f"asr_backend doit être l'un de {', '.join(ASR_BACKENDS)}")
+    if asr_backend != "auto" and asr_backend not in available_backends():
+        raise HTTPException(status_code=400, detail=f"Moteur ASR non installé sur ce serveur: {asr_backend}")
+
+    if decoding is not None and decoding not in DECODING_MODES:
+        raise HTTPException(status_code=400, detail=f"decoding doit être l'un de {', '.join(DECODING_MODES)}")
+
+    if timing_mode is not None and timing_mode not in TIMING_MODES:
+        raise HTTPException(status_code=400, detail=f"timing_mode doit être l'un de {', '.join(TIMING_MODES)}")
+
+    if mode not in PIPELINE_MODES:
+        raise HTTPException(status_code=400, detail=f"mode doit être l'un de {', '.join(PIPELINE_MODES)}")
+
+    if export_formats is not None:
+        try:
+            export_formats = ",".join(parse_export_formats(export_formats))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"export_formats : {e}")
+
+    # "soft-mkv" / "soft-mp4" : piste de sous-titres sélectionnable, vidéo copiée sans ré-encodage
+    if subtitle_mode not in SUBTITLE_MODES:
+        raise HTTPException(status_code=400, detail=f"subtitle_mode doit être l'un de {', '.join(SUBTITLE_MODES)}")
+
+    # refuser tôt si la file est pleine (avant d'écrire l'upload sur disque)
+    try:
+        scheduler.check_admission()
+    except QueueFullError as e:
+        raise _queue_full_response(e)
+
     # create job id and queue/state
     job_id = str(uuid.uuid4())
     create_job_queue(job_id)
@@ -67,10 +168,9 @@ async def upload_and_process_video(
     # prepare output directory for this job
     job_dir = unique_output_dir(UPLOAD_DIR, prefix="job")
 
-    # save upload
+    # save upload (hash calculé pendant la copie -> clé du cache d'artefacts)
     upload_path = job_dir / file.filename
-    with open(upload_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    upload_hash = copy_and_hash(file.file, upload_path)
 
     is_audio_detected = False
     try:
@@ -110,27 +210,41 @@ async def upload_and_process_video(
         "tasks": list(initial_state.values()),
     }
 
-    # lancer la pipeline en tâche de fond
+    # mettre la pipeline en file (le scheduler la lance dès qu'un worker est libre)
     # (on peut ajuster whisper_model/device depuis les params si souhaité)
-    import asyncio
-    asyncio.create_task(
-        run_full_pipeline(
-            upload_path,
-            job_dir,
-            language=language,
-            whisper_model="small",
-            device="cuda",
-            position=position,
-            font_name=font_name,
-            font_size=int(font_size),
-            font_color=font_color,
-            font_outline_colors=font_outline_color,
-            is_audio=is_audio_detected,
-            fond=fond,
-            job_id=job_id
+    try:
+        await scheduler.submit(
+            job_id,
+            {
+                "upload_path": str(upload_path),
+                "out_dir": str(job_dir),
+                "language": language,
+                "whisper_model": "small",
+                "device": "cuda",
+                "position": position,
+                "font_name": font_name,
+                "font_size": int(font_size),
+                "font_color": font_color,
+                "font_outline_colors": font_outline_color,
+                "is_audio": is_audio_detected,
+                "fond": fond,
+                "demucs_model": demucs_model,
+                "separation": separation,
+                "asr_backend": None if asr_backend == "auto" else asr_backend,
+                "decoding": decoding,
+                "timing_mode": timing_mode,
+                "export_formats": export_formats,
+                "subtitle_mode": subtitle_mode,
+                "upload_hash": upload_hash,
+            },
+            kind="stream" if mode == "streaming" else "full",
         )
-    )
+    except QueueFullError as e:
+        await run_in_threadpool(set_job_status, job_id, "canceled", str(e))
+        cleanup_job(job_id)
+        raise _queue_full_response(e)
 
+    resp_initial["queue"] = scheduler.stats()
     return JSONResponse(content=resp_initial, status_code=202)
 
 
@@ -150,4 +264,104 @@ def get_job(job_id: str):
     job = get_job_serialized(job_id)
     if job is None:
         raise HTTPException(status_code=404, detail="Job non trouvé")
-    return job
\ No newline at end of file
+    return job
+
+
+@app.get("/jobs/{job_id}/subtitles/{fmt}")
+async def get_job_subtitles(job_id: str, fmt: str):
+    """
+    Sous-titres d'un job terminé au format ass, srt, vtt ou json (mots horodatés).
+    Un format non produit par le job est généré depuis ses segments persistés
+    (sans relancer la pipeline) puis enregistré avec les fichiers du job.
+    """
+    if fmt not in SUBTITLE_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"format doit être l'un de {', '.join(SUBTITLE_MEDIA_TYPES)}")
+    if get_job_serialized(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job non trouvé")
+
+    file_type = "ass" if fmt == "ass" else EXPORT_FILE_TYPES[fmt]
+    path = await run_in_threadpool(get_latest_job_file, job_id, file_type)
+    if (not path or not Path(path).exists()) and fmt in EXPORT_FORMATS:
+        segments_path = await run_in_threadpool(get_latest_job_file, job_id, "segments")
+        if not segments_path or not Path(segments_path).exists():
+            raise HTTPException(status_code=409, detail="Segments non disponibles pour ce job (job non terminé ?)")
+        segments, language = await run_in_threadpool(load_segments_json, segments_path)
+        stem = Path(segments_path).name.replace(".segments.json", "")
+        exported = await run_in_threadpool(
+            export_subtitles_interface, segments, Path(segments_path).parent, stem, [fmt], language,
+        )
+        path = str(exported[fmt])
+        await run_in_threadpool(add_job_file, job_id, file_type, path)
+    if not path or not Path(path).exists():
+        raise HTTPException(status_code=404, detail=f"Aucun fichier {fmt} pour ce job")
+    return FileResponse(path, media_type=SUBTITLE_MEDIA_TYPES[fmt], filename=Path(path).name)
+
+
+@app.get("/queue")
+def queue_stats():
+    """
+    État du scheduler : jobs en file / en cours, occupation des ressources
+    et modèles chargés dans le process de l'API.
+    """
+    return {**scheduler.stats(), "models": model_registry.snapshot(), "asr_backends": available_backends()}
+
+
+@app.post("/jobs/{job_id}/restyle")
+async def restyle_job(
+    job_id: str,
+    position: Optional[str] = Form(None),
+    font_name: Optional[str] = Form(None),
+    font_size: Optional[int] = Form(None),
+    font_color: Optional[str] = Form(None),
+    font_outline_color: Optional[str] = Form(None),
+):
+    """
+    Re-génère les sous-titres d'un job terminé avec un nouveau style, sans
+    re-transcrire : seules les étapes creation_ass et assemblage sont relancées,
+    dans un nouveau job (suivi via /stream/{nouveau job_id}).
+    Les champs non fournis reprennent le style du job d'origine.
+    """
+    source = get_job_serialized(job_id)
+    if source is None:
+        raise HTTPException(status_code=404, detail="Job non trouvé")
+    params = get_job_params(job_id)
+    if not params or not any(f["file_type"] == "segments" for f in source["files"]):
+        raise HTTPException(status_code=409, detail="Segments non disponibles pour ce job (job non terminé ?)")
+    if position is not None and position not in _ALIGNMENT_MAP:
+        raise HTTPException(status_code=400, detail=f"position doit être l'un de {', '.join(_ALIGNMENT_MAP)}")
+
+    try:
+        scheduler.check_admission()
+    except QueueFullError as e:
+        raise _queue_full_response(e)
+
+    restyle_id = str(uuid.uuid4())
+    create_job_queue(restyle_id)
+    init_job_state(restyle_id, RESTYLE_TASKS_ORDER)
+    create_job(restyle_id)
+    out_dir = unique_output_dir(Path(params["args"]["out_dir"]), prefix="restyle")
+
+    try:
+        await scheduler.submit(
+            restyle_id,
+            {
+                "source_job_id": job_id,
+                "out_dir": str(out_dir),
+                "position": position,
+                "font_name": font_name,
+                "font_size": font_size,
+                "font_color": font_color,
+                "font_outline_colors": font_outline_color,
+            },
+            kind="restyle",
+        )
+    except QueueFullError as e:
+        await run_in_threadpool(set_job_status, restyle_id, "canceled", str(e))
+        cleanup_job(restyle_id)
+        raise _queue_full_response(e)
+
+    state = get_job_state(restyle_id) or {}
+    return JSONResponse(
+        content={"job_id": restyle_id, "source_job_id": job_id, "tasks": list(state.values())},
+        status_code=202,
+    )
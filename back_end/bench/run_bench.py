@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# bench/run_bench.py
+"""
+Benchmark + contrôle d'équivalence des chemins chauds du découpage et des sous-titres
+(CPU uniquement, aucun modèle) : segment_phrases, segment_phrases_array,
+IncrementalSegmenter (feed / finish par fenêtres), split_on_silences et
+segments_to_ass sur des transcriptions synthétiques.
+
+Pour chaque taille : temps, mots/s, pic mémoire (tracemalloc) et empreinte sha256
+de la sortie, comparée à bench/baseline.json. Code de sortie 1 si une sortie diffère.
+
+Lancement (depuis back_end/) :
+    python -m bench.run_bench                         # 1k, 100k, 1M mots
+    python -m bench.run_bench --sizes 1000,100000     # tailles choisies
+    python -m bench.run_bench --hours 3               # + 3 h de parole synthétique
+    python -m bench.run_bench --skip segment_phrases  # sans l'implémentation de référence
+    python -m bench.run_bench --record                # ré-enregistre la baseline
+"""
+import argparse
+import gc
+import hashlib
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from bench.synthetic import WORDS_PER_SECOND, generate_aligned_segments, silence_map
+from utils.decoupage.array_segmenter import PHRASE_OPTS, IncrementalSegmenter, segment_phrases_array
+from utils.decoupage.segmenter import flatten_aligned, segment_phrases, split_on_silences
+from utils.subtitle_config.segment_to_ass import segments_to_ass
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+SEED = 0
+
+# segments alignés passés à chaque feed() (≈ une fenêtre de transcription)
+FEED_SEGMENTS = 40
+
+
+def _digest_phrases(phrases: List[Dict[str, Any]]) -> str:
+    rows = [(p["start"], p["end"], p["text"], len(p.get("words") or [])) for p in phrases]
+    return hashlib.sha256(json.dumps(rows, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _digest_chunks(chunks: List[List[Dict[str, Any]]]) -> str:
+    rows = [(c[0]["start"], c[-1]["end"], len(c)) for c in chunks]
+    return hashlib.sha256(json.dumps(rows).encode("utf-8")).hexdigest()
+
+
+def _segment_incremental(segments: List[Dict[str, Any]], silences) -> List[Dict[str, Any]]:
+    """Chemin de production (build_phrases avec on_phrases) : feed() par fenêtres puis finish()."""
+    seg = IncrementalSegmenter(**PHRASE_OPTS, silence_regions=silences)
+    phrases = []
+    for i in range(0, len(segments), FEED_SEGMENTS):
+        phrases.extend(seg.feed(segments[i:i + FEED_SEGMENTS]))
+    phrases.extend(seg.finish())
+    return phrases
+
+
+def _measure(fn: Callable[[], Any], memory: bool) -> Tuple[Any, float, int]:
+    """(résultat, secondes, pic mémoire en octets) ; le pic vient d'une seconde exécution tracée."""
+    gc.collect()
+    t0 = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - t0
+    peak = 0
+    if memory:
+        del result
+        gc.collect()
+        tracemalloc.start()
+        result = fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def bench_size(n_words: int, skip: Tuple[str, ...], memory: bool, workdir: Path) -> Dict[str, Dict[str, Any]]:
+    segments = generate_aligned_segments(n_words, seed=SEED)
+    silences = silence_map(segments)
+    words = flatten_aligned(segments)
+
+    cases: Dict[str, Tuple[Callable[[], Any], Callable[[Any], str]]] = {
+        "segment_phrases": (
+            lambda: segment_phrases(segments, **PHRASE_OPTS, silence_regions=silences), _digest_phrases),
+        "segment_phrases_array": (
+            lambda: segment_phrases_array(segments, **PHRASE_OPTS, silence_regions=silences), _digest_phrases),
+        "incremental_segmenter": (
+            lambda: _segment_incremental(segments, silences), _digest_phrases),
+        "split_on_silences": (
+            lambda: split_on_silences(words, PHRASE_OPTS["silence_threshold"], silences), _digest_chunks),
+    }
+    ass_path = workdir / f"bench_{n_words}.ass"
+    phrases = segment_phrases_array(segments, **PHRASE_OPTS, silence_regions=silences)
+    cases["segments_to_ass"] = (
+        lambda: segments_to_ass(phrases, str(ass_path)),
+        lambda _: hashlib.sha256(ass_path.read_bytes()).hexdigest(),
+    )
+
+    report = {"generator": {"digest": _digest_phrases(segments)}}
+    for name, (fn, digest) in cases.items():
+        if name in skip:
+            continue
+        result, elapsed, peak = _measure(fn, memory)
+        report[name] = {
+            "digest": digest(result),
+            "seconds": round(elapsed, 4),
+            "words_per_s": int(n_words / elapsed) if elapsed > 0 else None,
+            "peak_mb": round(peak / 1e6, 1) if memory else None,
+        }
+        del result
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark / équivalence du découpage en phrases et de l'export ASS")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="nombres de mots, séparés par des virgules")
+    parser.add_argument("--hours", type=float, default=None,
+                        help=f"ajoute une taille de HOURS heures de parole ({WORDS_PER_SECOND} mots/s)")
+    parser.add_argument("--skip", default="", help="chemins à ne pas mesurer (séparés par des virgules)")
+    parser.add_argument("--no-memory", action="store_true", help="pas de mesure tracemalloc (plus rapide)")
+    parser.add_argument("--record", action="store_true", help="enregistre les empreintes comme nouvelle baseline")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    if args.hours:
+        sizes.append(int(args.hours * 3600 * WORDS_PER_SECOND))
+    skip = tuple(s.strip() for s in args.skip.split(",") if s.strip())
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8")) if baseline_path.exists() else {}
+
+    failures = []
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            report = bench_size(n, skip, not args.no_memory, Path(tmp))
+            results[str(n)] = report
+            print(f"\n== {n} mots ==")
+            for name, r in report.items():
+                if name == "generator":
+                    continue
+                mem = f"{r['peak_mb']:>9.1f} Mo" if r["peak_mb"] is not None else ""
+                print(f"  {name:<24} {r['seconds']:>9.3f} s  {r['words_per_s'] or 0:>12,} mots/s {mem}")
+
+            # les versions tableaux (batch et incrémentale) doivent rendre exactement les phrases de la référence
+            for name in ("segment_phrases_array", "incremental_segmenter"):
+                if "segment_phrases" in report and name in report \
+                        and report["segment_phrases"]["digest"] != report[name]["digest"]:
+                    failures.append(f"{n}: {name} diffère de segment_phrases")
+
+            expected = baseline.get(str(n), {})
+            for name, r in report.items():
+                want = expected.get(name)
+                if want is not None and want != r["digest"]:
+                    failures.append(f"{n}: {name} diffère de la baseline")
+
+    if args.record:
+        for n, report in results.items():
+            baseline.setdefault(n, {}).update({name: r["digest"] for name, r in report.items()})
+        baseline_path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"\nBaseline enregistrée -> {baseline_path}")
+        return 0
+
+    if failures:
+        print("\nÉCHEC :")
+        for f in failures:
+            print("  -", f)
+        return 1
+    print("\nSorties identiques à la baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+# bench/synthetic.py
+"""
+Générateur déterministe de segments alignés au format whisperx
+({start, end, text, words: [{word, start, end, score}]}) pour les benchmarks :
+aucun modèle, aucun fichier audio, même graine -> mêmes segments.
+"""
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+# débit moyen de parole utilisé pour convertir des heures en nombre de mots
+WORDS_PER_SECOND = 2.5
+
+_VOCAB = (
+    "le la les un une des et mais donc or ni car je tu il elle nous vous ils "
+    "sous-titre vidéo audio transcription alignement phrase silence musique voix "
+    "aujourd'hui demain toujours jamais très bien vraiment exactement ensuite alors "
+    "parce que quand comment pourquoi projet serveur fichier modèle rapide lent"
+).split()
+_STRONG = (".", "!", "?", "…")
+_SOFT = (",", ";", ":")
+
+
+def generate_aligned_segments(
+    n_words: Optional[int] = None,
+    *,
+    hours: Optional[float] = None,
+    seed: int = 0,
+    strong_punct: float = 0.08,     # part des mots suivis d'une ponctuation forte
+    soft_punct: float = 0.06,       # part des mots suivis d'une virgule / point-virgule / deux-points
+    pause_prob: float = 0.06,       # probabilité d'une petite pause (0.2 - 0.5 s) après un mot
+    long_pause_prob: float = 0.015,  # probabilité d'un vrai silence (0.6 - 4 s) après un mot
+    words_per_segment: Tuple[int, int] = (6, 24),
+) -> List[Dict[str, Any]]:
+    """
+    `n_words` mots (ou `hours` heures de parole à WORDS_PER_SECOND), découpés en
+    segments ASR de taille aléatoire ; les timestamps sont arrondis à la ms comme whisperx.
+    """
+    if n_words is None:
+        if hours is None:
+            raise ValueError("n_words ou hours requis")
+        n_words = int(hours * 3600 * WORDS_PER_SECOND)
+
+    rng = random.Random(seed)
+    segments: List[Dict[str, Any]] = []
+    t = 0.0
+    remaining = n_words
+    while remaining > 0:
+        size = min(remaining, rng.randint(*words_per_segment))
+        words = []
+        for _ in range(size):
+            text = rng.choice(_VOCAB)
+            r = rng.random()
+            if r < strong_punct:
+                text += rng.choice(_STRONG)
+            elif r < strong_punct + soft_punct:
+                text += rng.choice(_SOFT)
+            start = round(t, 3)
+            t += rng.uniform(0.12, 0.55)
+            end = round(t, 3)
+            words.append({"word": text, "start": start, "end": end, "score": round(rng.uniform(0.5, 1.0), 3)})
+
+            r = rng.random()
+            if r < long_pause_prob:
+                t += rng.uniform(0.6, 4.0)
+            elif r < long_pause_prob + pause_prob:
+                t += rng.uniform(0.2, 0.5)
+            else:
+                t += rng.uniform(0.0, 0.12)
+        segments.append({
+            "start": words[0]["start"],
+            "end": words[-1]["end"],
+            "text": " ".join(w["word"] for w in words),
+            "words": words,
+        })
+        remaining -= size
+    return segments
+
+
+def silence_map(segments: List[Dict[str, Any]], min_gap_s: float = 0.6) -> List[Tuple[float, float]]:
+    """Carte de silences (triée, disjointe) équivalente à celle de la VAD : trous >= min_gap_s entre mots."""
+    out = []
+    prev_end = None
+    for seg in segments:
+        for w in seg["words"]:
+            if prev_end is not None and w["start"] - prev_end >= min_gap_s:
+                out.append((prev_end, w["start"]))
+            prev_end = w["end"]
+    return out
@@ -1,5 +1,5 @@
 # db.py
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 DATABASE_URL = "sqlite:///jobs.db"
@@ -9,6 +9,27 @@ engine = create_engine(
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+
+def _add_missing_columns():
+    """
+    create_all ne modifie pas les tables existantes : on ajoute ici les colonnes
+    nullable apparues depuis (jobs.db déjà présent sur les serveurs).
+    """
+    insp = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not insp.has_table(table.name):
+                continue
+            existing = {c["name"] for c in insp.get_columns(table.name)}
+            for col in table.columns:
+                if col.name in existing or not col.nullable:
+                    continue
+                col_type = col.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{col.name}" {col_type}'))
+
+
 def init_db():
     # appeler au démarrage de l'app
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    import model.models_db  # noqa: F401  (enregistre les tables dans Base.metadata)
+    Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
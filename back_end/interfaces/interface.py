@@ -1,15 +1,20 @@
 # tools/interfaces.py
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Tuple, Union
+from typing import Callable, Optional, List, Dict, Any, Sequence, Tuple, Union
 import logging
 
+import numpy as np
+
 from utils.create_video_from_audio_utils import build_video_from_wav
-from utils.align_utils import build_phrases
 from utils.extract_audio_utils import extract_audio
-from utils.subtitle_video_utils import burn_subtitles_into_video
+from utils.extract_audio.extract_to_array import extract_to_array
+from utils.subtitle_video_utils import burn_subtitles_into_video, mux_subtitles_into_video
 from utils.extract_voice_utils import run_demucs
-from utils.subtitle_config.segment_to_ass import segments_to_ass
+from utils.audio.speech_analysis import analyze_speech, DEFAULT_SKIP_THRESHOLD
+from utils.subtitle_config.segment_to_ass import AssWriter, segments_to_ass
+from utils.subtitle_config.export_formats import export_subtitles, parse_export_formats, DEFAULT_EXPORT_FORMATS
 from utils.subtitle_config.convert_color import hex_to_ass_color
+from worker.client import get_worker_pool
 
 
 
@@ -27,42 +32,81 @@ def _ensure_parent(path: Union[str, Path]) -> Path:
 # 1) Interface pour extract_audio
 def extract_audio_interface(
     input_video: Union[str, Path],
-    output_wav: Union[str, Path],
+    output_wav: Optional[Union[str, Path]],
     sample_rate: int = 44100,
     channels: int = 2,
     duration_threshold_seconds: int = 600,
     timeout: int = 7200,
+    asr_wav: Optional[Union[str, Path]] = None,
+    asr_sample_rate: int = 16000,
 ) -> Dict[str, Any]:
     """
     Wrapper safe pour extract_audio.
     - Vérifie que input_video existe.
-    - Crée le dossier parent de output_wav si nécessaire.
-    - Retourne le dict produit par extract_audio (output, method, time_s).
+    - Crée le dossier parent de output_wav / asr_wav si nécessaire.
+    - asr_wav : sortie mono 16 kHz pour Whisper produite dans la même passe ffmpeg
+      (output_wav=None si seule cette sortie est utile).
+    - Retourne le dict produit par extract_audio (output, asr_output, method, time_s).
     """
     input_video = Path(input_video)
     if not input_video.exists():
         raise FileNotFoundError(f"input_video introuvable: {input_video}")
 
-    output_wav = _ensure_parent(output_wav)
+    if output_wav is not None:
+        output_wav = str(_ensure_parent(output_wav))
+    if asr_wav is not None:
+        asr_wav = str(_ensure_parent(asr_wav))
 
     result = extract_audio(
         str(input_video),
-        str(output_wav),
+        output_wav,
         sample_rate=sample_rate,
         channels=channels,
         duration_threshold_seconds=duration_threshold_seconds,
         timeout=timeout,
+        asr_wav=asr_wav,
+        asr_sample_rate=asr_sample_rate,
     )
     logger.info("extract_audio -> %s", result)
     return result
 
 
+# 1 bis) Interface pour extract_to_array (audio décodé en mémoire, sans WAV intermédiaire)
+def extract_audio_to_array_interface(
+    input_video: Union[str, Path],
+    sample_rate: int = 16000,
+    channels: int = 1,
+    timeout: int = 7200,
+) -> np.ndarray:
+    """
+    Wrapper safe pour extract_to_array.
+    - Vérifie que input_video existe.
+    - Retourne le PCM float32 (mono 16 kHz par défaut, prêt pour Whisper).
+    """
+    input_video = Path(input_video)
+    if not input_video.exists():
+        raise FileNotFoundError(f"input_video introuvable: {input_video}")
+
+    result = extract_to_array(str(input_video), sample_rate=sample_rate, channels=channels, timeout=timeout)
+    audio = result["audio"]
+    logger.info("extract_to_array -> %.1fs d'audio en %.2fs", len(audio) / float(sample_rate), result["time_s"])
+    return audio
+
+
 # 2) Interface pour get_voice (retour Path | None)
-def get_voice_interface(wath_path: Union[str, Path], out_voice_path: Union[str, Path], single_model: Optional[str]) -> Optional[Path]:
+def get_voice_interface(
+    wath_path: Union[str, Path],
+    out_voice_path: Union[str, Path],
+    single_model: Optional[str],
+    model: Optional[str] = None,
+    segment: Optional[float] = None,
+    overlap: float = 0.25,
+) -> Optional[Path]:
     """
     Wrapper pour get_voice.
     - Vérifie l'existence du fichier d'entrée.
     - Crée le dossier de sortie si nécessaire.
+    - model / segment / overlap : choix du modèle demucs ("mdx", "mdx_q", "htdemucs") et découpage.
     - Retourne le Path du fichiers nettoyé ou None.
     """
     logger.info("Separation voix: -> %s", out_voice_path)
@@ -73,38 +117,107 @@ def get_voice_interface(wath_path: Union[str, Path], out_voice_path: Union[str,
         raise FileNotFoundError(f"Fichier d'entrée introuvable: {wath_path}")
     out_voice_path.parent.mkdir(parents=True, exist_ok=True)
 
-    result = run_demucs(str(wath_path), str(out_voice_path), single_sig=single_model)
+    result = run_demucs(
+        str(wath_path),
+        str(out_voice_path),
+        single_sig=single_model,
+        model=model,
+        segment=segment,
+        overlap=overlap,
+    )
     # result est soit Path soit None selon ton implémentation
     logger.info("get_voice -> %s", result)
     return Path(result) if result is not None else ""
 
 
+# 2b) Interface pour l'analyse parole / musique (décide si Demucs est utile)
+def analyze_speech_interface(
+    wav_path: Union[str, Path],
+    max_seconds: float = 180.0,
+    threshold: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Wrapper pour analyze_speech.
+    - Vérifie l'existence du WAV.
+    - Retourne {"skip_separation", "speech_score", "threshold", "features", ...}.
+    """
+    wav_path = Path(wav_path)
+    if not wav_path.exists():
+        raise FileNotFoundError(f"Fichier d'entrée introuvable: {wav_path}")
+    if threshold is None:
+        threshold = DEFAULT_SKIP_THRESHOLD
+    return analyze_speech(wav_path, max_seconds=max_seconds, threshold=threshold)
+
+
 # 3) Interface pour transcribe_align_and_build_phrases (phrase_segments, lang)
 def build_phrases_interface(
-    audio_clear_path: Union[str, Path],
+    audio_clear_path: Union[str, Path, np.ndarray],
     language: str,
     whisper_model: str,
     device: str = "cuda",
-    reuse_models: bool = True
-) -> Tuple[List[Dict[str, Any]], str]:
+    reuse_models: bool = True,
+    asr_backend: Optional[str] = None,
+    decoding: Optional[str] = None,
+    timing_mode: Optional[str] = None,
+    on_phrases: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+    phrases: bool = True,
+) -> Tuple[List[Dict[str, Any]], str, Dict[str, Any]]:
     """
     Wrapper pour transcribe_align_and_build_phrases.
-    - Vérifie que le fichier audio existe.
-    - Retourne (phrase_segments, detected_language) où phrase_segments = list de {start,end,text}.
-    """
-    audio_clear_path = Path(audio_clear_path)
-    if not audio_clear_path.exists():
-        raise FileNotFoundError(f"Audio introuvable: {audio_clear_path}")
-
-    phrase_segments, lang = build_phrases(
-        audio_clear_path=audio_clear_path,
-        language=language,
-        whisper_model=whisper_model,
-        device=device,
-        reuse_models=reuse_models,
-    )
-    logger.info("transcribe_align_and_build_phrases -> %d phrase segments, lang=%s", len(phrase_segments), lang)
-    return phrase_segments, lang
+    - Vérifie que le fichier audio existe (ou accepte un buffer float32 mono 16 kHz).
+    - Si un pool de workers d'inférence est démarré, la requête y est envoyée
+      (modèles déjà chargés) ; sinon la transcription tourne dans ce process.
+    - asr_backend choisit le moteur de transcription (voir utils/asr/registry.py).
+    - decoding : "adaptive" (glouton puis beam sur les fenêtres peu sûres), "beam" ou "greedy".
+    - timing_mode : "align" (alignement wav2vec2, plus précis) ou "asr" (timestamps de mots Whisper).
+    - on_phrases : appelé (depuis le thread de transcription) avec chaque lot de phrases définitives.
+    - phrases=False : segments alignés rendus sans découpage en phrases, carte de silences
+      dans info["silence_regions"] (découpage fait par l'appelant, voir pipeline_streaming).
+    - Retourne (phrase_segments, detected_language, info) où phrase_segments = list de {start,end,text}
+      et info les statistiques de transcription (moteur, fenêtres re-décodées).
+    """
+    if isinstance(audio_clear_path, (str, Path)):
+        audio_clear_path = Path(audio_clear_path)
+        if not audio_clear_path.exists():
+            raise FileNotFoundError(f"Audio introuvable: {audio_clear_path}")
+        audio_arg = str(audio_clear_path.resolve())
+    else:
+        # buffer float32 mono 16 kHz déjà décodé
+        audio_arg = audio_clear_path
+
+    pool = get_worker_pool()
+    if pool is not None:
+        phrase_segments, lang, info = pool.build_phrases(
+            audio_clear_path=audio_arg,
+            language=language,
+            whisper_model=whisper_model,
+            device=device,
+            reuse_models=reuse_models,
+            asr_backend=asr_backend,
+            decoding=decoding,
+            timing_mode=timing_mode,
+            on_phrases=on_phrases,
+            phrases=phrases,
+        )
+    else:
+        # import tardif : torch / whisperx ne sont chargés que si l'inférence tourne ici
+        from utils.align_utils import build_phrases
+
+        phrase_segments, lang, info = build_phrases(
+            audio_clear_path=audio_clear_path,
+            language=language,
+            whisper_model=whisper_model,
+            device=device,
+            reuse_models=reuse_models,
+            asr_backend=asr_backend,
+            decoding=decoding,
+            timing_mode=timing_mode,
+            on_phrases=on_phrases,
+            phrases=phrases,
+        )
+    logger.info("transcribe_align_and_build_phrases -> %d %s, lang=%s",
+                len(phrase_segments), "phrase segments" if phrases else "segments alignés", lang)
+    return phrase_segments, lang, info
 
 
 # 4) Interface pour segments_to_ass(écrit fichier .srt puis retourne Path)
@@ -138,6 +251,52 @@ def segments_to_ass_interface(
     )
     return out
 
+# 4 bis) .ass écrit au fil de la transcription (mêmes réglages que segments_to_ass_interface)
+def open_ass_writer_interface(
+    output_ass_path: Union[str, Path],
+    playresx: int = 1920,
+    playresy: int = 1080,
+    font_name: str = "Arial",
+    font_size: int = 36,
+    font_color: str = "#FFFFFF",
+    outline_color: str = "#000000",
+    position: str = "top-center",
+) -> AssWriter:
+    """
+    Ouvre un AssWriter non atomique : le .ass grandit à chaque write_segments() + flush()
+    et finalize() le ferme. Contenu final identique à segments_to_ass_interface.
+    """
+    return AssWriter(
+        str(_ensure_parent(output_ass_path)),
+        playresx=playresx,
+        playresy=playresy,
+        fontname=font_name,
+        fontsize=font_size,
+        font_color_ass=hex_to_ass_color(font_color),
+        outline_color_ass=hex_to_ass_color(outline_color),
+        outline_width=2,
+        position=position,
+        margin_v=30,
+        atomic=False,
+    )
+
+# 4 ter) Interface pour les exports SRT / WebVTT / JSON mot à mot (un seul parcours des segments)
+def export_subtitles_interface(
+    segments: List[Dict[str, Any]],
+    output_dir: Union[str, Path],
+    stem: str,
+    formats: Union[str, Sequence[str], None] = None,
+    language: Optional[str] = None,
+) -> Dict[str, Path]:
+    """
+    - formats : "srt,vtt,json" ou ["srt", ...] (sous-ensemble) ; None = SUBTITLE_EXPORT_FORMATS.
+    - Retourne {format: chemin} des fichiers écrits dans output_dir.
+    """
+    wanted = DEFAULT_EXPORT_FORMATS if formats is None else parse_export_formats(formats)
+    paths = export_subtitles(segments, Path(output_dir), stem, wanted, language=language)
+    logger.info("Exports sous-titres -> %s", ", ".join(str(p) for p in paths.values()) or "aucun")
+    return paths
+
 # 5) Interface pour burn_subtitles_into_video (retourne Path)
 def burn_subtitles_into_video_interface(
     input: Union[str, Path],
@@ -145,11 +304,15 @@ def burn_subtitles_into_video_interface(
     output_video: Optional[Union[str, Path]] = None,
     is_audio: bool = False,
     fond: Optional[str] = None,
+    subtitle_mode: str = "burn",
+    language: Optional[str] = None,
 ) -> Path:
     """
     Wrapper safe pour deux cas :
       - si is_audio == True : l'input est un fichier audio -> on appelle build_video_from_wav
       - sinon : l'input est une vidéo -> on appelle burn_subtitles_into_video
+    subtitle_mode : "burn" (incrustation, ré-encodage) ou "soft-mkv" / "soft-mp4"
+    (piste de sous-titres ajoutée sans ré-encodage, conteneur donné par output_video).
 
     Paramètres :
       - input : chemin vers la vidéo ou l'audio (str | Path)
@@ -187,16 +350,29 @@ def burn_subtitles_into_video_interface(
             logger.exception("Erreur lors de build_video_from_wav: %s", e)
             raise
         
-    # input est une vidéo -> on brûle les sous-titres sur la vidéo existante
-    try:
-        out = burn_subtitles_into_video(
-            input_video=input,
-            input_srt=input_srt,
-            output_video=str(out_path)
-        )
-    except Exception as e:
-        logger.exception("Erreur lors de burn_subtitles_into_video: %s", e)
-        raise
+    if subtitle_mode != "burn":
+        # piste de sous-titres sélectionnable : vidéo et audio copiés, aucun ré-encodage
+        try:
+            out = mux_subtitles_into_video(
+                input_video=input,
+                input_subs=input_srt,
+                output_video=str(out_path),
+                language=language,
+            )
+        except Exception as e:
+            logger.exception("Erreur lors de mux_subtitles_into_video: %s", e)
+            raise
+    else:
+        # input est une vidéo -> on brûle les sous-titres sur la vidéo existante
+        try:
+            out = burn_subtitles_into_video(
+                input_video=input,
+                input_srt=input_srt,
+                output_video=str(out_path)
+            )
+        except Exception as e:
+            logger.exception("Erreur lors de burn_subtitles_into_video: %s", e)
+            raise
 
     out_path = Path(out)
     if not out_path.exists():
@@ -12,8 +12,10 @@ class Job(Base):
     start_time = Column(DateTime(timezone=True), server_default=func.now())
     end_time = Column(DateTime(timezone=True), nullable=True)
     message = Column(Text, nullable=True)
+    params = Column(Text, nullable=True)  # JSON {"kind": ..., "args": {...}} pour relancer le job
 
     files = relationship("JobFile", back_populates="job", cascade="all, delete-orphan")
+    checkpoints = relationship("JobCheckpoint", back_populates="job", cascade="all, delete-orphan")
 
 
 class JobFile(Base):
@@ -25,3 +27,14 @@ class JobFile(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     job = relationship("Job", back_populates="files")
+
+
+class JobCheckpoint(Base):
+    __tablename__ = "job_checkpoints"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String, ForeignKey("jobs.id"), index=True)
+    stage = Column(String, index=True)  # ex: "extraction", "isolation_voix", "transcription", "creation_ass", "assemblage"
+    artifact_path = Column(Text)        # "" si l'étape s'est terminée sans artefact
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    job = relationship("Job", back_populates="checkpoints")
@@ -1,4 +1,6 @@
+import asyncio
 import datetime
+import os
 import shutil
 from utils.helper.segment_to_dict import segment_to_dict
 from utils.helper.convert_audio_to_wav import convert_audio_to_wav
@@ -9,9 +11,13 @@ from starlette.concurrency import run_in_threadpool
 # importe tes interfaces (adapte si le module s'appelle différemment)
 from interfaces.interface import (
     extract_audio_interface,
+    extract_audio_to_array_interface,
     get_voice_interface,
+    analyze_speech_interface,
     build_phrases_interface,
     segments_to_ass_interface,
+    open_ass_writer_interface,
+    export_subtitles_interface,
     burn_subtitles_into_video_interface
 )
 
@@ -20,7 +26,25 @@ import traceback
 from pathlib import Path
 from typing import Optional
 from utils.helper.notify_job import notify_job
-from service.crud import add_job_file, set_job_status
+from utils.helper.segments_json import save_segments_json, load_segments_json
+from service.crud import (
+    add_job_file,
+    set_job_status,
+    get_job_params,
+    get_latest_job_file,
+    add_job_checkpoint,
+    get_job_checkpoints,
+)
+from utils.cache.artifact_cache import get_artifact_cache, hash_file
+from utils.extract_voice_utils import resolve_demucs_model, DEMUCS_SEGMENT, DEMUCS_OVERLAP
+from utils.asr.adaptive import DEFAULT_DECODING
+from utils.asr.base import DEFAULT_TIMING_MODE
+from utils.asr.registry import asr_settings
+from utils.audio.speech_analysis import DEFAULT_SKIP_THRESHOLD
+from utils.subtitle_config.export_formats import EXPORT_FILE_TYPES
+from utils.subtitle_video_utils import SUBTITLE_MODES
+from utils.subtitle_config.segment_to_ass import AssWriter
+from scheduler.resources import resource_slot
 
 def unique_output_dir(base_dir: Path, prefix: str = "job") -> Path:
     ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -33,6 +57,195 @@ def unique_output_dir(base_dir: Path, prefix: str = "job") -> Path:
 logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
 logger = logging.getLogger("app")
 
+# vidéo transcrite sans séparation : décoder l'audio directement en mémoire (pas de WAV 16 kHz sur disque)
+EXTRACT_TO_ARRAY = os.environ.get("EXTRACT_TO_ARRAY", "1") not in ("0", "false", "no")
+
+
+def _checkpoint_artifact(checkpoints: dict, stage: str) -> Optional[str]:
+    """
+    Artefact du checkpoint `stage` s'il est encore sur disque, sinon None.
+    "" = étape terminée sans artefact (ex: séparation de la voix échouée).
+    """
+    path = checkpoints.get(stage)
+    if path is None:
+        return None
+    return path if path == "" or Path(path).exists() else None
+
+
+async def _save_checkpoint(job_id: Optional[str], stage: str, path) -> None:
+    if job_id:
+        await run_in_threadpool(add_job_checkpoint, job_id, stage, str(path) if path else "")
+
+
+async def _ass_geometry(upload_path: Path, is_audio: bool, font_size: int):
+    """(largeur, hauteur, taille de police ajustée) du .ass pour cet upload."""
+    # Si upload était audio, on fixe une résolution par défaut
+    if is_audio:
+        video_w, video_h = 1280, 720
+    else:
+        try:
+            video_w, video_h = await run_in_threadpool(get_video_resolution, upload_path)
+        except Exception:
+            video_w, video_h = 1920, 1080
+    return video_w, video_h, choose_font_size_for_video(video_h, font_size)
+
+
+def _ass_output_path(upload_path: Path, out_dir: Path) -> Path:
+    return out_dir / "sous_titre" / (upload_path.stem + ".ass")
+
+
+async def _open_live_ass(
+    upload_path: Path,
+    out_dir: Path,
+    *,
+    is_audio: bool,
+    position: str,
+    font_name: str,
+    font_size: int,
+    font_color: str,
+    font_outline_colors: str,
+) -> AssWriter:
+    """
+    .ass final ouvert avant la transcription et complété phrase par phrase (fichier
+    valide après chaque flush) ; _render_subtitled_video le ferme au lieu de le réécrire.
+    """
+    video_w, video_h, adjusted_font_size = await _ass_geometry(upload_path, is_audio, font_size)
+    return await run_in_threadpool(
+        open_ass_writer_interface,
+        _ass_output_path(upload_path, out_dir),
+        video_w, video_h,
+        font_name,
+        adjusted_font_size,
+        font_color,
+        font_outline_colors,
+        position,
+    )
+
+
+async def _render_subtitled_video(
+    push,
+    job_id: Optional[str],
+    phrase_segments,
+    upload_path: Path,
+    out_dir: Path,
+    *,
+    is_audio: bool,
+    fond: Optional[str],
+    position: str,
+    font_name: str,
+    font_size: int,
+    font_color: str,
+    font_outline_colors: str,
+    checkpoints: Optional[dict] = None,
+    language: Optional[str] = None,
+    export_formats: Optional[str] = None,
+    subtitle_mode: str = "burn",
+    live_ass: Optional[AssWriter] = None,
+) -> Path:
+    """
+    Étapes communes creation_ass + assemblage (pipeline complète et restyle).
+    `checkpoints` ({stage: artefact}) permet de sauter une étape déjà terminée.
+    `live_ass` : .ass déjà écrit pendant la transcription (voir _open_live_ass), seulement fermé.
+    `export_formats` ("srt,vtt,json", None = SUBTITLE_EXPORT_FORMATS) : exports écrits avec le .ass.
+    `subtitle_mode` : "burn" (incrustation) ou "soft-mkv" / "soft-mp4" (piste sans ré-encodage).
+    Retourne le chemin de la vidéo sous-titrée.
+    """
+    checkpoints = checkpoints or {}
+
+    def done(stage):
+        return _checkpoint_artifact(checkpoints, stage)
+
+    async def checkpoint(stage, path):
+        await _save_checkpoint(job_id, stage, path)
+
+    final_path = done("assemblage")
+    if final_path and done("creation_ass"):
+        for task, path in (("creation_ass", done("creation_ass")), ("assemblage", final_path)):
+            push("task_finished", {"task": task, "info": "Étape déjà terminée (reprise).", "data": path, "download": "True"})
+        return Path(final_path)
+
+    push("task_started", {"task": "creation_ass"})
+    # 4) write ASS only (we no longer produce .srt)
+    out_dir_str = out_dir / "sous_titre"
+    out_dir_str.mkdir(parents=True, exist_ok=True)
+
+    ass_out = _ass_output_path(upload_path, out_dir)
+    ass_path = done("creation_ass")
+    exports = {}
+    if ass_path:
+        ass_info = "Étape déjà terminée (reprise)."
+    else:
+        if live_ass is not None and live_ass.count == len(phrase_segments):
+            # toutes les phrases sont déjà dans le .ass : fermeture (fsync) au lieu d'une réécriture
+            logger.info("ASS écrit pendant la transcription -> %s", live_ass.path)
+            ass_path = await run_in_threadpool(live_ass.finalize)
+        else:
+            if live_ass is not None:
+                live_ass.abort()
+            video_w, video_h, adjusted_font_size = await _ass_geometry(upload_path, is_audio, font_size)
+            logger.info("Écriture ASS -> %s", ass_out)
+            ass_path = await run_in_threadpool(
+                segments_to_ass_interface,
+                phrase_segments,
+                str(ass_out),
+                video_w, video_h,           # playres
+                font_name,
+                adjusted_font_size,
+                font_color,
+                font_outline_colors,
+                position
+            )
+        ass_info = "Creation du fichier sous titre .ass reussit"
+        await run_in_threadpool(add_job_file, job_id, "ass", str(ass_path))
+        # SRT / WebVTT / JSON mot à mot, servis ensuite par GET /jobs/{id}/subtitles/{format}
+        exports = await run_in_threadpool(
+            export_subtitles_interface, phrase_segments, out_dir_str, upload_path.stem, export_formats, language,
+        )
+        for fmt, path in exports.items():
+            await run_in_threadpool(add_job_file, job_id, EXPORT_FILE_TYPES[fmt], str(path))
+        await checkpoint("creation_ass", ass_path)
+    push(
+        "task_finished", 
+        {
+            "task": "creation_ass",
+            "info": ass_info,
+            "data": str(ass_path),
+            "exports": {fmt: str(path) for fmt, path in exports.items()},
+            "download": "True"
+        }
+    )
+
+    # si is_audio True -> on doit générer une vidéo depuis le wav + ass (build_video_from_wav)
+    subtitled_out = out_dir / (upload_path.stem + "_sub" + SUBTITLE_MODES[subtitle_mode])
+    logger.info("Assemblage (%s) -> %s", subtitle_mode, subtitled_out)
+    push("task_started", {"task": "assemblage"})
+
+    async with resource_slot("ffmpeg"):
+        await run_in_threadpool(
+            burn_subtitles_into_video_interface,
+            str(upload_path),
+            str(ass_path),
+            str(subtitled_out),
+            is_audio,
+            fond,
+            subtitle_mode,
+            language,
+        )
+    push(
+        "task_finished", 
+        {
+            "task": "assemblage",
+            "info": "Assemblagww du fichier sous titre et video reussit. ",
+            "data": str(subtitled_out),
+            "download": "True"
+        }
+    )
+    await run_in_threadpool(add_job_file, job_id, "final", str(subtitled_out))
+    await checkpoint("assemblage", subtitled_out)
+
+    return subtitled_out
+
+
 async def run_full_pipeline(
     upload_path: Path,   # anciennement video_path ; peut être audio ou video selon is_audio
     out_dir: Path,
@@ -47,9 +260,17 @@ async def run_full_pipeline(
     font_color: str,
     font_outline_colors: str,
     single_model: Optional[str] = "OK",
+    demucs_model: Optional[str] = None,
+    separation: str = "auto",  # "auto" (analyse parole), "always" ou "never"
+    asr_backend: Optional[str] = None,  # moteur de transcription ; None = ASR_BACKEND / auto
+    decoding: Optional[str] = None,  # "adaptive", "beam" ou "greedy" ; None = ASR_DECODING
+    timing_mode: Optional[str] = None,  # "align" (whisperx) ou "asr" (timestamps Whisper) ; None = TIMING_MODE
+    export_formats: Optional[str] = None,  # "srt,vtt,json" ; None = SUBTITLE_EXPORT_FORMATS
+    subtitle_mode: str = "burn",  # "burn" (incrustation) ou "soft-mkv" / "soft-mp4" (sans ré-encodage)
     is_audio: bool = False,
     fond: Optional[str] = None,
     job_id: Optional[str] = None,
+    upload_hash: Optional[str] = None,
 ):
     """
     Appelle les interfaces (bloquantes) dans un thread pool et renvoie un dict résultat.
@@ -62,86 +283,262 @@ async def run_full_pipeline(
         if job_id:
             notify_job(job_id, event, payload)
     
+    live_ass = None  # .ass écrit pendant la transcription (si elle a lieu)
     try:
-        # Si l'entrée est audio, on convertit en .wav si nécessaire puis on saute l'étape d'extraction.
-        if is_audio:
-            push("task_started", {"task": "extraction"})
-            logger.info("Upload detecté comme audio. Préparation audio...")
-            # wav_out sera le WAV utilisé pour la suite
-            wav_out = out_dir / (upload_path.stem + ".wav")
-            if upload_path.suffix.lower() != ".wav":
-                # conversion
-                await run_in_threadpool(
-                    convert_audio_to_wav, 
-                    upload_path, 
-                    wav_out, 
-                    44100, 
-                    2
-                )
-            else:
-                # si c'est déjà un .wav, on le copie localement (sécurité)
-                shutil.copy2(upload_path, wav_out)
-            upload_path = wav_out
-        else:
-            # cas vidéo: extraire l'audio depuis la vidéo (comme avant)
-            push("task_started", {"task": "extraction"})
-            logger.info("Extraction audio -> %s", out_dir / (upload_path.stem + ".wav"))
-            wav_out = out_dir / (upload_path.stem + ".wav")
-            # extract_audio_interface peut être lent -> run_in_threadpool
-            await run_in_threadpool(
-                extract_audio_interface,
-                str(upload_path),
-                str(wav_out),
-                44100,
-                2
+        # checkpoints durables : une étape déjà terminée (artefact présent) n'est pas relancée
+        checkpoints = await run_in_threadpool(get_job_checkpoints, job_id) if job_id else {}
+
+        def done(stage):
+            return _checkpoint_artifact(checkpoints, stage)
+
+        async def checkpoint(stage, path):
+            await _save_checkpoint(job_id, stage, path)
+
+        # cache adressé par contenu : clés = hash de l'upload + paramètres de chaque étape
+        cache = get_artifact_cache()
+        if cache is not None and not upload_hash:
+            upload_hash = await run_in_threadpool(hash_file, upload_path)
+        demucs_key_model = resolve_demucs_model(demucs_model, single_model)
+
+        def cache_key(stage, **params):
+            return cache.key(upload_hash, stage, **params) if cache is not None else None
+
+        wav_key = cache_key("wav", sample_rate=44100, channels=2)
+        asr_key = cache_key("wav", sample_rate=16000, channels=1)
+        demucs_params = dict(demucs_model=demucs_key_model, demucs_segment=DEMUCS_SEGMENT, demucs_overlap=DEMUCS_OVERLAP)
+        voc_key = cache_key("vocals", sample_rate=44100, channels=2, **demucs_params)
+        seg_key = None
+        if cache is not None:
+            # moteur résolu ("auto" -> moteur réel), device effectif, précision et seuils ASR
+            seg_key = cache_key(
+                "segments", **demucs_params, whisper_model=whisper_model, language=language,
+                separation=separation, decoding=decoding or DEFAULT_DECODING,
+                timing_mode=timing_mode or DEFAULT_TIMING_MODE,
+                speech_threshold=DEFAULT_SKIP_THRESHOLD if separation == "auto" else None,
+                **await run_in_threadpool(asr_settings, asr_backend, device),
             )
 
+        # segments déjà connus (reprise ou cache) -> séparation et transcription sautées
+        phrase_segments, detected_lang, skip_info = None, None, None
+        transcription_info = {}
+        segments_path = done("transcription")
+        if segments_path:
+            phrase_segments, detected_lang = await run_in_threadpool(load_segments_json, segments_path)
+            skip_info = "Étape déjà terminée (reprise)."
+        elif cache is not None:
+            cached_segments = await run_in_threadpool(cache.get_json, seg_key)
+            if cached_segments is not None:
+                phrase_segments = cached_segments["segments"]
+                detected_lang = cached_segments["language"]
+                skip_info = "Étape sautée (cache)."
+
+        # wav_out : 44.1 kHz stéréo (Demucs, vidéo d'un upload audio)
+        # asr_wav : 16 kHz mono (analyse parole + Whisper), produit dans la même passe ffmpeg
+        wav_out = out_dir / (upload_path.stem + ".wav")
+        asr_wav = out_dir / (upload_path.stem + ".16k.wav")
+        need_full_wav = is_audio or separation != "never"
+        # transcription seule (vidéo, sans séparation) : PCM 16 kHz décodé directement en mémoire
+        asr_audio = None
+        to_array = EXTRACT_TO_ARRAY and not need_full_wav
+        targets = [(asr_key, asr_wav)]
+        if need_full_wav:
+            targets.insert(0, (wav_key, wav_out))
+
+        # avec des segments connus, l'audio n'est utile que pour reconstruire la vidéo d'un upload audio
+        if phrase_segments is None or is_audio:
+            if done("extraction") and all(p.exists() for _, p in targets):
+                wav_info = "Étape déjà terminée (reprise)."
+            else:
+                push("task_started", {"task": "extraction"})
+                wav_from_cache = False
+                if cache is not None:
+                    wav_from_cache = True
+                    for key, path in targets:
+                        if await run_in_threadpool(cache.materialize, key, path) is None:
+                            wav_from_cache = False
+                            break
+
+                full_out = wav_out if need_full_wav else None
+                if wav_from_cache:
+                    logger.info("Audio trouvé dans le cache -> %s", [str(p) for _, p in targets])
+                    wav_info = "Audio trouvé dans le cache."
+                elif to_array:
+                    logger.info("Extraction audio en mémoire (pas de WAV intermédiaire)")
+                    async with resource_slot("ffmpeg"):
+                        asr_audio = await run_in_threadpool(extract_audio_to_array_interface, str(upload_path))
+                    wav_info = "Extraction de l'audio reussit."
+                # Si l'entrée est audio, on convertit en .wav si nécessaire puis on saute l'étape d'extraction.
+                elif is_audio:
+                    logger.info("Upload detecté comme audio. Préparation audio...")
+                    async with resource_slot("ffmpeg"):
+                        if upload_path.suffix.lower() != ".wav":
+                            # conversion (44.1 kHz stéréo + 16 kHz mono en un décodage)
+                            await run_in_threadpool(
+                                convert_audio_to_wav, 
+                                upload_path, 
+                                wav_out, 
+                                44100, 
+                                2,
+                                asr_wav,
+                            )
+                        else:
+                            # si c'est déjà un .wav, on le copie localement (sécurité)
+                            shutil.copy2(upload_path, wav_out)
+                            await run_in_threadpool(convert_audio_to_wav, upload_path, None, 44100, 2, asr_wav)
+                    wav_info = "Préparation de l'audio reussit."
+                else:
+                    # cas vidéo: extraire l'audio depuis la vidéo (comme avant)
+                    logger.info("Extraction audio -> %s + %s", full_out, asr_wav)
+                    # extract_audio_interface peut être lent -> run_in_threadpool
+                    async with resource_slot("ffmpeg"):
+                        await run_in_threadpool(
+                            extract_audio_interface,
+                            str(upload_path),
+                            str(full_out) if full_out else None,
+                            44100,
+                            2,
+                            asr_wav=str(asr_wav),
+                        )
+                    wav_info = "Extraction de l'audio reussit."
+
+                # audio en mémoire : rien à mettre en cache ni à reprendre (ré-extrait si besoin)
+                if asr_audio is None:
+                    if cache is not None and not wav_from_cache:
+                        for key, path in targets:
+                            await run_in_threadpool(cache.put, key, path)
+                    await checkpoint("extraction", targets[0][1])
+                    for _, path in targets:
+                        await run_in_threadpool(add_job_file, job_id, "wav", str(path))
+
             push(
                 "task_finished", 
                 {
                     "task": "extraction",
-                    "info": "Extraction de l'audio reussit.",
-                    "data": str(wav_out),
-                    "download": "True",
+                    "info": wav_info,
+                    "data": "" if asr_audio is not None else str(targets[0][1]),
+                    "download": "False" if asr_audio is not None else "True",
                 }
             )
-            await run_in_threadpool(add_job_file, job_id, "wav", str(wav_out))
+        else:
+            push("task_finished", {"task": "extraction", "info": skip_info, "data": "", "download": "False"})
 
-        
-        # 2) optionally run spleeter to isolate vocals (get_voice)
-        push("task_started", {"task": "isolation_voix"})
-        voc = await run_in_threadpool(
-            get_voice_interface, 
-            str(wav_out), 
-            str(out_dir), 
-            single_model
-        )
-        # get_voice_interface returns Path or empty string per your code; normalize
-        voc_path_str = str(voc) if voc else ""
-        push(
-            "task_finished", 
-            {
+        if is_audio:
+            upload_path = wav_out
+
+        if phrase_segments is not None:
+            logger.info("Segments déjà disponibles, séparation et transcription sautées.")
+            push("task_finished", {"task": "isolation_voix", "info": skip_info, "data": "", "download": "False"})
+        else:
+            # 2) optionally run demucs to isolate vocals (get_voice)
+            voc_path_str = done("isolation_voix")
+            decision = None
+            separation_skipped = False
+            if voc_path_str is not None:
+                voc_info = "Étape déjà terminée (reprise)."
+            else:
+                push("task_started", {"task": "isolation_voix"})
+                # "auto" : analyse rapide du WAV, Demucs sauté si l'audio est déjà de la parole propre
+                if separation == "auto":
+                    decision = await run_in_threadpool(analyze_speech_interface, str(asr_wav))
+                    separation_skipped = decision["skip_separation"]
+                elif separation == "never":
+                    separation_skipped = True
+
+                voc = None
+                voc_from_cache = False
+                if separation_skipped:
+                    voc_info = (
+                        "Isolation sautée : l'audio est déjà dominé par la voix."
+                        if decision else "Isolation de la voix désactivée."
+                    )
+                else:
+                    if cache is not None:
+                        voc = await run_in_threadpool(
+                            cache.materialize, voc_key, out_dir / demucs_key_model / wav_out.stem / "vocals.wav"
+                        )
+                    voc_from_cache = voc is not None
+                    if not voc_from_cache:
+                        async with resource_slot("demucs"):
+                            voc = await run_in_threadpool(
+                                get_voice_interface, 
+                                str(wav_out), 
+                                str(out_dir), 
+                                single_model,
+                                demucs_model,
+                                DEMUCS_SEGMENT,
+                                DEMUCS_OVERLAP,
+                            )
+                    voc_info = "Voix trouvée dans le cache." if voc_from_cache else "Isolation du voix reussit."
+                # get_voice_interface returns Path or empty string per your code; normalize
+                voc_path_str = str(voc) if voc else ""
+                if cache is not None and voc_path_str and not voc_from_cache:
+                    await run_in_threadpool(cache.put, voc_key, voc_path_str)
+                await checkpoint("isolation_voix", voc_path_str)
+                if voc_path_str:
+                    await run_in_threadpool(add_job_file, job_id, "vocals", voc_path_str)
+            isolation_payload = {
                 "task": "isolation_voix",
-                "info": "Isolation du voix reussit.", 
+                "info": voc_info, 
                 "data": voc_path_str,
-                "download": "True"
+                "download": "True" if voc_path_str else "False",
+                "separation": separation,
             }
-        )    
-        if voc_path_str:
-            await run_in_threadpool(add_job_file, job_id, "vocals", voc_path_str)    
-
-        # 3) transcribe & build phrase segments (from vocals if available else from wav)
-        push("task_started", {"task": "transcription"})
-        audio_for_transcribe = Path(voc_path_str) if voc_path_str else wav_out
-        logger.info("Transcription & alignement sur -> %s", audio_for_transcribe)
-        phrase_segments, detected_lang = await run_in_threadpool(
-            build_phrases_interface,
-            str(audio_for_transcribe),
-            language,
-            whisper_model,
-            device,
-            True,  # reuse_models
-        )
+            if decision is not None:
+                isolation_payload["decision"] = {
+                    "skipped": separation_skipped,
+                    "speech_score": decision["speech_score"],
+                    "threshold": decision["threshold"],
+                    "features": decision["features"],
+                }
+            push("task_finished", isolation_payload)
+
+            # 3) transcribe & build phrase segments (from vocals if available else from wav)
+            push("task_started", {"task": "transcription"})
+            # sans voix isolée, Whisper lit directement le WAV 16 kHz mono (pas de ré-échantillonnage)
+            if voc_path_str:
+                audio_for_transcribe = voc_path_str
+            elif asr_audio is not None:
+                audio_for_transcribe = asr_audio
+            else:
+                audio_for_transcribe = str(asr_wav)
+            logger.info("Transcription & alignement sur -> %s",
+                        "audio en mémoire" if asr_audio is not None and not voc_path_str else audio_for_transcribe)
+            # phrases définitives poussées en évènements "segment" pendant la transcription
+            # et ajoutées au .ass final (qui grandit au fil de l'eau)
+            loop = asyncio.get_running_loop()
+            streamed = {"n": 0}
+            live_ass = await _open_live_ass(
+                upload_path, out_dir, is_audio=is_audio, position=position, font_name=font_name,
+                font_size=font_size, font_color=font_color, font_outline_colors=font_outline_colors,
+            )
+
+            def on_phrases(phrases):
+                live_ass.write_segments(phrases)
+                live_ass.flush()
+                payload = {"index": streamed["n"], "segments": [segment_to_dict(p) for p in phrases]}
+                streamed["n"] += len(phrases)
+                loop.call_soon_threadsafe(push, "segment", payload)
+
+            async with resource_slot("asr"):
+                phrase_segments, detected_lang, transcription_info = await run_in_threadpool(
+                    build_phrases_interface,
+                    audio_for_transcribe,
+                    language,
+                    whisper_model,
+                    device,
+                    True,  # reuse_models
+                    asr_backend,
+                    decoding,
+                    timing_mode,
+                    on_phrases=on_phrases,
+                )
+            # on ne met en cache que des segments reproductibles : voix isolée, ou séparation
+            # sautée volontairement (pas un échec de demucs) ; la clé inclut le mode de séparation
+            if cache is not None and (voc_path_str or separation_skipped):
+                await run_in_threadpool(
+                    cache.put_json, seg_key, "segments.json",
+                    {"language": detected_lang, "segments": phrase_segments},
+                )
         
         safe_preview = [segment_to_dict(s) for s in phrase_segments[:3]]
         
@@ -149,86 +546,136 @@ async def run_full_pipeline(
             "n_segments": len(phrase_segments),
             "language_detected": detected_lang,
             "preview": safe_preview,
+            # fenêtres peu sûres re-décodées en beam search (décodage adaptatif)
+            "redecoded_windows": transcription_info.get("redecoded_windows", 0),
         }
 
+        if not segments_path:
+            # segments persistés : permettent de changer le style sans re-transcrire (/jobs/{id}/restyle)
+            # et servent de checkpoint de l'étape transcription
+            segments_path = await run_in_threadpool(
+                save_segments_json,
+                phrase_segments,
+                detected_lang,
+                out_dir / "sous_titre" / (upload_path.stem + ".segments.json"),
+            )
+            await run_in_threadpool(add_job_file, job_id, "segments", str(segments_path))
+            await checkpoint("transcription", segments_path)
+
         push(
             "task_finished", 
             {
                 "task": "transcription",
-                "info": "Transcription reussie", 
+                "info": skip_info or "Transcription reussie", 
                 "data": safe_payload,
                 "download": "False"
             }
         )
-        
-        # Si upload était audio, on fixe une résolution par défaut
-        if is_audio:
-            video_w, video_h = 1280, 720
-        else:
-            try:
-                video_w, video_h = await run_in_threadpool(get_video_resolution, upload_path)
-            except Exception:
-                video_w, video_h = 1920, 1080
-
-        adjusted_font_size = choose_font_size_for_video(video_h, font_size)
-
 
-        push("task_started", {"task": "creation_ass"})
-        # 4) write ASS only (we no longer produce .srt)
-        out_dir_str = out_dir / "sous_titre"
-        out_dir_str.mkdir(parents=True, exist_ok=True)
-
-        ass_out = out_dir_str / (upload_path.stem + ".ass")
-        logger.info("Écriture ASS -> %s", ass_out)
-        ass_path = await run_in_threadpool(
-            segments_to_ass_interface,
+        subtitled_out = await _render_subtitled_video(
+            push,
+            job_id,
             phrase_segments,
-            str(ass_out),
-            video_w, video_h,           # playres
-            font_name,
-            adjusted_font_size,
-            font_color,
-            font_outline_colors,
-            position
+            upload_path,
+            out_dir,
+            is_audio=is_audio,
+            fond=fond,
+            position=position,
+            font_name=font_name,
+            font_size=font_size,
+            font_color=font_color,
+            font_outline_colors=font_outline_colors,
+            checkpoints=checkpoints,
+            language=detected_lang,
+            export_formats=export_formats,
+            subtitle_mode=subtitle_mode,
+            live_ass=live_ass,
         )
-        push(
-            "task_finished", 
-            {
-                "task": "creation_ass",
-                "info": "Creation du fichier sous titre .ass reussit",
-                "data": str(ass_path),
-                "download": "True"
-            }
-        )
-        await run_in_threadpool(add_job_file, job_id, "ass", str(ass_path))
-        
-
-        # si is_audio True -> on doit générer une vidéo depuis le wav + ass (build_video_from_wav)
-        subtitled_out = out_dir / (upload_path.stem + "_sub.mp4")
-        logger.info("Incrustation SRT -> %s", subtitled_out)
-        push("task_started", {"task": "assemblage"})
         
-        await run_in_threadpool(
-            burn_subtitles_into_video_interface,
-            str(upload_path),
-            str(ass_path),
-            str(subtitled_out),
-            is_audio,
-            fond,
-        )
         push(
-            "task_finished", 
+            "finished", 
             {
-                "task": "assemblage",
-                "info": "Assemblagww du fichier sous titre et video reussit. ",
+                "task": "Terminer",
+                "info": "Video sous-titrer pret a telecharger",
                 "data": str(subtitled_out),
                 "download": "True"
             }
         )
-        await run_in_threadpool(add_job_file, job_id, "final", str(subtitled_out))
-        
+        await run_in_threadpool(set_job_status, job_id, "finished", "Done")
+
+    except Exception as e:
+        push("error", {"error": str(e)})
+        logger.error("Erreur pipeline: %s\n%s", e, traceback.format_exc())
+        if job_id:
+            await run_in_threadpool(set_job_status, job_id, "error", str(e))
+    finally:
+        if live_ass is not None:
+            live_ass.abort()  # sans effet s'il a été finalisé
+
+
+async def run_full_pipeline_job(job_id: str, args: dict):
+    """
+    Runner du scheduler : reconstruit l'appel à run_full_pipeline depuis les
+    paramètres persistés (JSON) du job.
+    """
+    args = dict(args)
+    upload_path = Path(args.pop("upload_path"))
+    out_dir = Path(args.pop("out_dir"))
+    await run_full_pipeline(upload_path, out_dir, job_id=job_id, **args)
+
+
+async def run_restyle_pipeline(
+    job_id: str,
+    source_job_id: str,
+    out_dir: Path,
+    *,
+    position: Optional[str] = None,
+    font_name: Optional[str] = None,
+    font_size: Optional[int] = None,
+    font_color: Optional[str] = None,
+    font_outline_colors: Optional[str] = None,
+):
+    """
+    Re-génère .ass + vidéo d'un job terminé avec un nouveau style, à partir des
+    segments persistés (pas de Demucs ni de Whisper). Les paramètres de style à
+    None reprennent ceux du job source.
+    """
+    def push(event, payload):
+        notify_job(job_id, event, payload)
+
+    try:
+        params = await run_in_threadpool(get_job_params, source_job_id)
+        segments_path = await run_in_threadpool(get_latest_job_file, source_job_id, "segments")
+        if not params or not segments_path:
+            raise FileNotFoundError(f"Job {source_job_id}: segments ou paramètres introuvables")
+        src = params["args"]
+        phrase_segments, segments_lang = await run_in_threadpool(load_segments_json, segments_path)
+
+        # pour un upload audio la vidéo est reconstruite depuis le WAV converti
+        is_audio = bool(src.get("is_audio"))
+        media_path = Path(src["upload_path"])
+        if is_audio:
+            media_path = Path(src["out_dir"]) / (media_path.stem + ".wav")
+
+        subtitled_out = await _render_subtitled_video(
+            push,
+            job_id,
+            phrase_segments,
+            media_path,
+            Path(out_dir),
+            is_audio=is_audio,
+            fond=src.get("fond"),
+            position=position or src["position"],
+            font_name=font_name or src["font_name"],
+            font_size=int(font_size or src["font_size"]),
+            font_color=font_color or src["font_color"],
+            font_outline_colors=font_outline_colors or src["font_outline_colors"],
+            language=segments_lang,
+            export_formats=src.get("export_formats"),
+            subtitle_mode=src.get("subtitle_mode") or "burn",
+        )
         push(
-            "finished", 
+            "finished",
             {
                 "task": "Terminer",
                 "info": "Video sous-titrer pret a telecharger",
@@ -240,4 +687,13 @@ async def run_full_pipeline(
 
     except Exception as e:
         push("error", {"error": str(e)})
-        logger.error("Erreur pipeline: %s\n%s", e, traceback.format_exc())
\ No newline at end of file
+        logger.error("Erreur restyle: %s\n%s", e, traceback.format_exc())
+        await run_in_threadpool(set_job_status, job_id, "error", str(e))
+
+
+async def run_restyle_pipeline_job(job_id: str, args: dict):
+    """Runner du scheduler pour les jobs "restyle"."""
+    args = dict(args)
+    source_job_id = args.pop("source_job_id")
+    out_dir = Path(args.pop("out_dir"))
+    await run_restyle_pipeline(job_id, source_job_id, out_dir, **args)
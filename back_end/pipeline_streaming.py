@@ -0,0 +1,366 @@
+# pipeline_streaming.py
+# Mode streaming : l'audio circule par fenêtres entre extraction, séparation et
+# transcription (tâches asyncio reliées par des files bornées) ; les premières
+# phrases sont disponibles bien avant la fin de la séparation du fichier.
+import asyncio
+import logging
+import os
+import traceback
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+from interfaces.interface import build_phrases_interface
+from pipeline import (
+    run_full_pipeline, _render_subtitled_video, _save_checkpoint, _checkpoint_artifact, _open_live_ass,
+)
+from scheduler.resources import resource_slot
+from service.crud import add_job_file, set_job_status, get_job_checkpoints
+from utils.asr.base import shift_segments
+from utils.audio.speech_analysis import speech_dominance, DEFAULT_SKIP_THRESHOLD
+from utils.audio.vad import split_on_silences
+from utils.decoupage.array_segmenter import PHRASE_OPTS, IncrementalSegmenter
+from utils.extract_audio.extract_to_array import PcmPipe, RingBuffer
+from utils.extract_voice_utils import resolve_demucs_model, DEMUCS_SEGMENT, DEMUCS_OVERLAP
+from utils.helper.notify_job import notify_job
+from utils.helper.segment_to_dict import segment_to_dict
+from utils.helper.segments_json import save_segments_json, load_segments_json
+
+logger = logging.getLogger("app")
+
+# durée des fenêtres qui circulent entre les étapes
+STREAM_CHUNK_S = float(os.environ.get("STREAM_CHUNK_S", "30"))
+# fenêtres en attente entre deux étapes (contre-pression : l'extraction ralentit si Demucs / Whisper traînent)
+STREAM_QUEUE_SIZE = int(os.environ.get("STREAM_QUEUE_SIZE", "2"))
+# contexte audio précédent donné à Demucs pour éviter les artefacts aux jointures
+_SEPARATION_CONTEXT_S = 5.0
+_SEP_RATE, _SEP_CHANNELS = 44100, 2
+_ASR_RATE = 16000
+
+_END = object()
+
+
+async def _extract_stage(upload_path: Path, sample_rate: int, channels: int, out_q: asyncio.Queue) -> None:
+    """
+    ffmpeg -> fenêtres de STREAM_CHUNK_S secondes (temps de début, PCM float32).
+    Le slot "ffmpeg" n'est pris que pendant chaque lecture : entre deux lectures ffmpeg
+    est bloqué sur son pipe (contre-pression) et ne consomme rien.
+    """
+    pipe = PcmPipe(str(upload_path), sample_rate, channels, chunk_frames=int(STREAM_CHUNK_S * sample_rate))
+    try:
+        while True:
+            async with resource_slot("ffmpeg"):
+                item = await run_in_threadpool(pipe.read)
+            if item is None:
+                break
+            pos, block = item
+            await out_q.put((pos / sample_rate, block))
+    finally:
+        # étape annulée : un thread peut encore être dans pipe.read() -> on tue ffmpeg
+        # (sans attendre, ce qui débloque la lecture) puis on récupère le process hors de l'event loop
+        pipe.kill()
+        asyncio.get_running_loop().run_in_executor(None, pipe.close)
+    await out_q.put(_END)
+
+
+async def _separation_stage(
+    in_q: asyncio.Queue,
+    out_q: asyncio.Queue,
+    *,
+    separation: str,
+    demucs_model: str,
+    device: str,
+) -> Dict[str, Any]:
+    """
+    44.1 kHz stéréo -> voix 16 kHz mono. En mode "auto", la décision est prise sur la
+    première fenêtre (même score que l'analyse du mode batch) ; la séparation sautée,
+    les fenêtres sont seulement converties au taux de Whisper.
+    """
+    from utils.extract_voice_utils import separate_vocals_array, vocals_to_asr
+
+    context = RingBuffer(int(_SEPARATION_CONTEXT_S * _SEP_RATE), channels=_SEP_CHANNELS)
+    skip = separation == "never"
+    decision = None
+    while True:
+        item = await in_q.get()
+        if item is _END:
+            break
+        start_s, block = item
+        if decision is None and separation == "auto":
+            decision = speech_dominance(block.mean(axis=1), _SEP_RATE)
+            skip = decision["score"] >= DEFAULT_SKIP_THRESHOLD
+            logger.info("Streaming: score parole %.2f -> séparation %s", decision["score"], "sautée" if skip else "active")
+
+        if skip:
+            voice = block
+        else:
+            prev = context.latest(len(context))
+            x = np.concatenate((prev, block)) if len(prev) else block
+            async with resource_slot("demucs"):
+                voice = await run_in_threadpool(
+                    separate_vocals_array, x, demucs_model, device, len(prev), DEMUCS_SEGMENT, DEMUCS_OVERLAP,
+                )
+            context.write(block)
+        await out_q.put((start_s, await run_in_threadpool(vocals_to_asr, voice, _SEP_RATE, _ASR_RATE)))
+    await out_q.put(_END)
+    return {"skipped": skip, "decision": decision}
+
+
+async def _transcription_stage(
+    in_q: asyncio.Queue,
+    push,
+    *,
+    language: str,
+    whisper_model: str,
+    device: str,
+    asr_backend: Optional[str],
+    decoding: Optional[str],
+    timing_mode: Optional[str],
+    live_ass=None,
+) -> Dict[str, Any]:
+    """
+    Accumule l'audio 16 kHz et transcrit dès qu'une fenêtre est pleine, coupée sur le
+    silence le plus marqué (pas au milieu d'un mot). Les segments alignés de chaque fenêtre
+    sont recalés sur la timeline du fichier et passés à un seul IncrementalSegmenter
+    (une phrase peut chevaucher deux fenêtres, comme en batch) ; les phrases définitives
+    sont annoncées au fil de l'eau et ajoutées à `live_ass` (AssWriter).
+    La langue détectée sur la première fenêtre est imposée aux suivantes.
+    """
+    max_len = int(STREAM_CHUNK_S * _ASR_RATE)
+    pending = np.zeros(0, dtype=np.float32)
+    pending_start = 0.0
+    segmenter = IncrementalSegmenter(**PHRASE_OPTS)
+    segments: List[Dict[str, Any]] = []
+    lang = language
+    detected_lang = None
+    redecoded = 0
+
+    def emit(phrases: List[Dict[str, Any]], processed_s: float) -> None:
+        if phrases and live_ass is not None:
+            live_ass.write_segments(phrases)
+            live_ass.flush()
+        if phrases:
+            # même évènement que le mode batch : phrases définitives
+            push("segment", {"index": len(segments), "segments": [segment_to_dict(s) for s in phrases]})
+        segments.extend(phrases)
+        push("task_progress", {
+            "task": "transcription",
+            "processed_s": round(processed_s, 3),
+            "n_segments": len(segments),
+            "preview": [segment_to_dict(s) for s in phrases[:3]],
+        })
+
+    async def transcribe(buf: np.ndarray, start_s: float) -> None:
+        nonlocal lang, detected_lang, redecoded
+        async with resource_slot("asr"):
+            aligned, window_lang, info = await run_in_threadpool(
+                build_phrases_interface, buf, lang, whisper_model, device, True,
+                asr_backend, decoding, timing_mode, phrases=False,
+            )
+        if detected_lang is None:
+            detected_lang = window_lang
+            lang = lang or window_lang  # fenêtres suivantes : même langue
+        redecoded += info.get("redecoded_windows", 0)
+        if not aligned:
+            logger.info("Fenêtre %.1fs sans segment.", start_s)
+        segmenter.add_silence_regions([(s + start_s, e + start_s) for s, e in info.get("silence_regions") or []])
+        emit(segmenter.feed(shift_segments(aligned, start_s)), start_s + len(buf) / _ASR_RATE)
+
+    while True:
+        item = await in_q.get()
+        if item is _END:
+            break
+        _, block = item
+        pending = np.concatenate((pending, block))
+        while len(pending) > max_len:
+            cut = split_on_silences(pending, _ASR_RATE, max_chunk_s=STREAM_CHUNK_S,
+                                    min_chunk_s=STREAM_CHUNK_S / 3)[0][1]
+            await transcribe(pending[:cut], pending_start)
+            pending, pending_start = pending[cut:], pending_start + cut / _ASR_RATE
+    if len(pending):
+        await transcribe(pending, pending_start)
+    emit(segmenter.finish(), pending_start + len(pending) / _ASR_RATE)
+    return {"segments": segments, "language": detected_lang or language, "redecoded_windows": redecoded}
+
+
+async def run_streaming_pipeline(
+    upload_path: Path,
+    out_dir: Path,
+    *,
+    language: str,
+    whisper_model: str,
+    device: str,
+    position: str,
+    font_name: str,
+    font_size: int,
+    font_color: str,
+    font_outline_colors: str,
+    single_model: Optional[str] = "OK",
+    demucs_model: Optional[str] = None,
+    separation: str = "auto",
+    asr_backend: Optional[str] = None,
+    decoding: Optional[str] = None,
+    timing_mode: Optional[str] = None,
+    export_formats: Optional[str] = None,
+    subtitle_mode: str = "burn",
+    is_audio: bool = False,
+    fond: Optional[str] = None,
+    job_id: Optional[str] = None,
+    **_: Any,
+):
+    """
+    Variante de run_full_pipeline où extraction, séparation et transcription se
+    chevauchent. Les artefacts intermédiaires (WAV, stems) ne sont pas écrits ; les
+    segments, le .ass et la vidéo finale le sont comme en batch (reprise via checkpoints).
+    Un upload audio a besoin du WAV 44.1 kHz pour construire sa vidéo : il passe par le mode batch.
+    """
+    if is_audio:
+        logger.info("Upload audio : mode batch utilisé à la place du streaming.")
+        return await run_full_pipeline(
+            upload_path, out_dir, language=language, whisper_model=whisper_model, device=device,
+            position=position, font_name=font_name, font_size=font_size, font_color=font_color,
+            font_outline_colors=font_outline_colors, single_model=single_model, demucs_model=demucs_model,
+            separation=separation, asr_backend=asr_backend, decoding=decoding, timing_mode=timing_mode,
+            export_formats=export_formats, subtitle_mode=subtitle_mode, is_audio=is_audio, fond=fond, job_id=job_id, **_,
+        )
+
+    if language == "en":
+        whisper_model += ".en"
+
+    def push(event, payload):
+        if job_id:
+            notify_job(job_id, event, payload)
+
+    live_ass = None  # .ass écrit pendant la transcription (si elle a lieu)
+    try:
+        checkpoints = await run_in_threadpool(get_job_checkpoints, job_id) if job_id else {}
+        segments_path = _checkpoint_artifact(checkpoints, "transcription")
+        redecoded = 0
+
+        if segments_path:
+            phrase_segments, detected_lang = await run_in_threadpool(load_segments_json, segments_path)
+            for task in ("extraction", "isolation_voix", "transcription"):
+                push("task_finished", {"task": task, "info": "Étape déjà terminée (reprise).", "data": "", "download": "False"})
+        else:
+            for task in ("extraction", "transcription"):
+                push("task_started", {"task": task})
+
+            separate = separation != "never"
+            rate, channels = (_SEP_RATE, _SEP_CHANNELS) if separate else (_ASR_RATE, 1)
+            pcm_q: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+            asr_q: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE) if separate else pcm_q
+
+            stages = [asyncio.ensure_future(_extract_stage(upload_path, rate, channels, pcm_q))]
+            if separate:
+                push("task_started", {"task": "isolation_voix"})
+                stages.append(asyncio.ensure_future(_separation_stage(
+                    pcm_q, asr_q, separation=separation,
+                    demucs_model=resolve_demucs_model(demucs_model, single_model), device=device,
+                )))
+            # .ass final complété fenêtre par fenêtre, fermé à l'étape creation_ass
+            live_ass = await _open_live_ass(
+                upload_path, out_dir, is_audio=is_audio, position=position, font_name=font_name,
+                font_size=font_size, font_color=font_color, font_outline_colors=font_outline_colors,
+            )
+            stages.append(asyncio.ensure_future(_transcription_stage(
+                asr_q, push, language=language, whisper_model=whisper_model, device=device,
+                asr_backend=asr_backend, decoding=decoding, timing_mode=timing_mode, live_ass=live_ass,
+            )))
+            try:
+                results = await asyncio.gather(*stages)
+            except BaseException:
+                for t in stages:
+                    t.cancel()
+                raise
+
+            transcription = results[-1]
+            isolation = results[1] if separate else {"skipped": True, "decision": None}
+            phrase_segments, detected_lang = transcription["segments"], transcription["language"]
+            redecoded = transcription["redecoded_windows"]
+
+            push("task_finished", {"task": "extraction", "info": "Extraction de l'audio reussit (streaming).", "data": "", "download": "False"})
+            isolation_payload = {
+                "task": "isolation_voix",
+                "info": "Isolation sautée." if isolation["skipped"] else "Isolation du voix reussit.",
+                "data": "",
+                "download": "False",
+                "separation": separation,
+            }
+            if isolation["decision"] is not None:
+                isolation_payload["decision"] = {
+                    "skipped": isolation["skipped"],
+                    "speech_score": isolation["decision"]["score"],
+                    "threshold": DEFAULT_SKIP_THRESHOLD,
+                    "features": isolation["decision"],
+                }
+            push("task_finished", isolation_payload)
+
+            segments_path = await run_in_threadpool(
+                save_segments_json,
+                phrase_segments,
+                detected_lang,
+                out_dir / "sous_titre" / (upload_path.stem + ".segments.json"),
+            )
+            await run_in_threadpool(add_job_file, job_id, "segments", str(segments_path))
+            await _save_checkpoint(job_id, "transcription", segments_path)
+
+        push("task_finished", {
+            "task": "transcription",
+            "info": "Transcription reussie",
+            "data": {
+                "n_segments": len(phrase_segments),
+                "language_detected": detected_lang,
+                "preview": [segment_to_dict(s) for s in phrase_segments[:3]],
+                "redecoded_windows": redecoded,
+            },
+            "download": "False",
+        })
+
+        subtitled_out = await _render_subtitled_video(
+            push,
+            job_id,
+            phrase_segments,
+            upload_path,
+            out_dir,
+            is_audio=is_audio,
+            fond=fond,
+            position=position,
+            font_name=font_name,
+            font_size=font_size,
+            font_color=font_color,
+            font_outline_colors=font_outline_colors,
+            checkpoints=checkpoints,
+            language=detected_lang,
+            export_formats=export_formats,
+            subtitle_mode=subtitle_mode,
+            live_ass=live_ass,
+        )
+        push(
+            "finished",
+            {
+                "task": "Terminer",
+                "info": "Video sous-titrer pret a telecharger",
+                "data": str(subtitled_out),
+                "download": "True"
+            }
+        )
+        await run_in_threadpool(set_job_status, job_id, "finished", "Done")
+
+    except Exception as e:
+        push("error", {"error": str(e)})
+        logger.error("Erreur pipeline streaming: %s\n%s", e, traceback.format_exc())
+        if job_id:
+            await run_in_threadpool(set_job_status, job_id, "error", str(e))
+    finally:
+        if live_ass is not None:
+            live_ass.abort()  # sans effet s'il a été finalisé
+
+
+async def run_streaming_pipeline_job(job_id: str, args: dict):
+    """Runner du scheduler pour les jobs "stream" (mêmes paramètres que "full")."""
+    args = dict(args)
+    upload_path = Path(args.pop("upload_path"))
+    out_dir = Path(args.pop("out_dir"))
+    await run_streaming_pipeline(upload_path, out_dir, job_id=job_id, **args)
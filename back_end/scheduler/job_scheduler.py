@@ -0,0 +1,151 @@
+# scheduler/job_scheduler.py
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from service.crud import set_job_params, set_job_status, get_jobs_by_status
+from utils.helper.notify_job import create_job_queue, init_job_state, get_job_queue
+from .resources import _env_int, resources_usage
+
+logger = logging.getLogger("scheduler")
+
+# runner(job_id, args) -> coroutine
+Runner = Callable[[str, Dict[str, Any]], Awaitable[Any]]
+
+
+class QueueFullError(Exception):
+    """Levée par submit() quand la file d'attente est pleine."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"File d'attente pleine, réessayer dans {retry_after}s")
+        self.retry_after = retry_after
+
+
+class JobScheduler:
+    """
+    File de jobs persistée dans la table `jobs` (status "queued" + params JSON).
+    - max_running : nombre de jobs exécutés simultanément
+    - max_backlog : nombre de jobs en attente au-delà duquel submit() refuse (429)
+    Les limites fines (ffmpeg / demucs / asr) sont gérées par scheduler.resources.
+    """
+
+    def __init__(self, max_running: int, max_backlog: int):
+        self.max_running = max_running
+        self.max_backlog = max_backlog
+        self._queue: Optional[asyncio.Queue] = None
+        self._pending: List[str] = []
+        self._running: set = set()
+        self._runners: Dict[str, Runner] = {}
+        self._workers: List[asyncio.Task] = []
+        self._avg_job_s = 120.0  # estimation initiale, lissée à chaque job terminé
+        self._admitting = 0  # submit() en cours (écritures en base), comptés dans la file
+
+    def register_runner(self, kind: str, runner: Runner) -> None:
+        self._runners[kind] = runner
+
+    # --- admission -----------------------------------------------------------
+    def retry_after(self) -> int:
+        """Estimation (secondes) du temps avant qu'une place se libère dans la file."""
+        jobs_ahead = max(1, len(self._pending) + self._admitting - self.max_backlog + 1)
+        return max(1, int(self._avg_job_s * jobs_ahead / self.max_running))
+
+    def check_admission(self) -> None:
+        if len(self._pending) + self._admitting >= self.max_backlog:
+            raise QueueFullError(self.retry_after())
+
+    async def submit(self, job_id: str, args: Dict[str, Any], kind: str = "full") -> None:
+        """
+        Met le job en file. Le job doit déjà exister en base (create_job).
+        Lève QueueFullError si la file est pleine.
+        Les écritures en base passent par le thread pool (pas de SQL bloquant dans l'event loop).
+        """
+        if kind not in self._runners:
+            raise KeyError(f"Aucun runner enregistré pour '{kind}'")
+        self.check_admission()
+        # place réservée pendant les écritures : deux submit() simultanés ne dépassent pas le backlog
+        self._admitting += 1
+        try:
+            await run_in_threadpool(set_job_params, job_id, {"kind": kind, "args": args})
+            await run_in_threadpool(set_job_status, job_id, "queued")
+        finally:
+            self._admitting -= 1
+        self._enqueue(job_id, kind, args)
+
+    def _enqueue(self, job_id: str, kind: str, args: Dict[str, Any]) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._pending.append(job_id)
+        self._queue.put_nowait((job_id, kind, args))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self._pending),
+            "running": len(self._running),
+            "max_running": self.max_running,
+            "max_backlog": self.max_backlog,
+            "avg_job_s": round(self._avg_job_s, 1),
+            "resources": resources_usage(),
+        }
+
+    # --- cycle de vie ----------------------------------------------------------
+    async def start(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        await self._restore()
+        for i in range(self.max_running):
+            self._workers.append(asyncio.create_task(self._worker(i)))
+        logger.info("Scheduler démarré: %d workers, backlog max %d", self.max_running, self.max_backlog)
+
+    async def stop(self) -> None:
+        for w in self._workers:
+            w.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _restore(self) -> None:
+        """
+        Recharge les jobs restés en file ou interrompus ("running") lors du
+        précédent arrêt du serveur ; la pipeline reprend après le dernier checkpoint.
+        """
+        jobs = await run_in_threadpool(get_jobs_by_status, ("running", "queued"))
+        for job_id, params in jobs:
+            if not params or params.get("kind") not in self._runners:
+                logger.warning("Job %s en file sans paramètres exploitables, ignoré.", job_id)
+                continue
+            if get_job_queue(job_id) is None:
+                create_job_queue(job_id)
+                init_job_state(job_id)
+            self._enqueue(job_id, params["kind"], params.get("args") or {})
+            logger.info("Job %s remis en file", job_id)
+
+    async def _worker(self, idx: int) -> None:
+        while True:
+            job_id, kind, args = await self._queue.get()
+            try:
+                self._pending.remove(job_id)
+            except ValueError:
+                pass
+            self._running.add(job_id)
+            t0 = time.perf_counter()
+            try:
+                await run_in_threadpool(set_job_status, job_id, "running")
+                await self._runners[kind](job_id, args)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Job %s (%s) a échoué dans le worker %d: %s", job_id, kind, idx, e)
+                await run_in_threadpool(set_job_status, job_id, "error", str(e))
+            finally:
+                self._running.discard(job_id)
+                elapsed = time.perf_counter() - t0
+                self._avg_job_s = 0.8 * self._avg_job_s + 0.2 * elapsed
+                self._queue.task_done()
+
+
+scheduler = JobScheduler(
+    max_running=_env_int("MAX_RUNNING_JOBS", 2),
+    max_backlog=_env_int("MAX_QUEUED_JOBS", 20),
+)
@@ -0,0 +1,66 @@
+# scheduler/resources.py
+import asyncio
+import os
+from typing import Dict
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.environ.get(name, default)))
+    except (TypeError, ValueError):
+        return default
+
+
+# nombre de slots par ressource (surcharge possible par variables d'environnement)
+# - ffmpeg : extraction / incrustation, lié au CPU
+# - demucs : séparation de la voix, très gourmand en VRAM/RAM
+# - asr    : transcription + alignement (whisper / whisperx)
+RESOURCE_LIMITS: Dict[str, int] = {
+    "ffmpeg": _env_int("FFMPEG_SLOTS", max(1, (os.cpu_count() or 2) // 2)),
+    "demucs": _env_int("DEMUCS_SLOTS", 1),
+    "asr": _env_int("ASR_SLOTS", 1),
+}
+
+_SEMAPHORES: Dict[str, asyncio.Semaphore] = {}
+# slots pris par ressource (compté ici : pas de lecture de l'état interne du sémaphore)
+_IN_USE: Dict[str, int] = {}
+
+
+class _Slot:
+    """Contexte `async with` : prend un slot de la ressource et le compte jusqu'à sa libération."""
+
+    __slots__ = ("name", "_sem")
+
+    def __init__(self, name: str, sem: asyncio.Semaphore):
+        self.name = name
+        self._sem = sem
+
+    async def __aenter__(self) -> "_Slot":
+        await self._sem.acquire()
+        _IN_USE[self.name] = _IN_USE.get(self.name, 0) + 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        _IN_USE[self.name] -= 1
+        self._sem.release()
+
+
+def resource_slot(name: str) -> _Slot:
+    """
+    Retourne un slot de la ressource `name` (sémaphore créé à la première demande,
+    dans l'event loop). Usage :
+        async with resource_slot("demucs"):
+            await run_in_threadpool(...)
+    """
+    sem = _SEMAPHORES.get(name)
+    if sem is None:
+        if name not in RESOURCE_LIMITS:
+            raise KeyError(f"Ressource inconnue: {name}")
+        sem = asyncio.Semaphore(RESOURCE_LIMITS[name])
+        _SEMAPHORES[name] = sem
+    return _Slot(name, sem)
+
+
+def resources_usage() -> Dict[str, dict]:
+    """Snapshot {ressource: {"limit": n, "in_use": k}} pour le monitoring."""
+    return {name: {"limit": limit, "in_use": _IN_USE.get(name, 0)} for name, limit in RESOURCE_LIMITS.items()}
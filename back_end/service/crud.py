@@ -1,8 +1,9 @@
 # crud.py
 from db.db import SessionLocal
-from model.models_db import Job, JobFile
+from model.models_db import Job, JobFile, JobCheckpoint
 from sqlalchemy.orm import Session, joinedload
 from datetime import datetime
+import json
 
 def create_job(job_id: str, db: Session = None):
     close = False
@@ -33,6 +34,51 @@ def set_job_status(job_id: str, status: str, message: str = None):
     db.close()
     return job
 
+def set_job_params(job_id: str, params: dict):
+    """
+    Enregistre (JSON) les paramètres nécessaires pour relancer le job après un redémarrage.
+    """
+    db = SessionLocal()
+    job = db.query(Job).get(job_id)
+    if not job:
+        db.close()
+        return None
+    job.params = json.dumps(params, default=str)
+    db.commit()
+    db.refresh(job)
+    db.close()
+    return job
+
+def get_job_params(job_id: str):
+    """
+    Retourne les paramètres persistés du job ({"kind": ..., "args": {...}}) ou None.
+    """
+    db = SessionLocal()
+    try:
+        job = db.query(Job).get(job_id)
+        if not job or not job.params:
+            return None
+        return json.loads(job.params)
+    finally:
+        db.close()
+
+def get_jobs_by_status(statuses):
+    """
+    Retourne [(job_id, params_dict)] des jobs dont le status est dans `statuses`,
+    du plus ancien au plus récent (ordre de la file).
+    """
+    db = SessionLocal()
+    try:
+        jobs = (
+            db.query(Job)
+            .filter(Job.status.in_(list(statuses)))
+            .order_by(Job.start_time.asc())
+            .all()
+        )
+        return [(j.id, json.loads(j.params) if j.params else None) for j in jobs]
+    finally:
+        db.close()
+
 def add_job_file(job_id: str, file_type: str, path: str):
     db = SessionLocal()
     job = db.query(Job).get(job_id)
@@ -46,6 +92,54 @@ def add_job_file(job_id: str, file_type: str, path: str):
     db.close()
     return jf
 
+def get_latest_job_file(job_id: str, file_type: str):
+    """
+    Chemin du dernier fichier `file_type` enregistré pour le job (ou None).
+    """
+    db = SessionLocal()
+    try:
+        jf = (
+            db.query(JobFile)
+            .filter(JobFile.job_id == job_id, JobFile.file_type == file_type)
+            .order_by(JobFile.id.desc())
+            .first()
+        )
+        return jf.path if jf else None
+    finally:
+        db.close()
+
+def add_job_checkpoint(job_id: str, stage: str, artifact_path: str):
+    """
+    Marque l'étape `stage` comme terminée (durable) avec le chemin de son artefact.
+    """
+    db = SessionLocal()
+    job = db.query(Job).get(job_id)
+    if not job:
+        db.close()
+        return None
+    ck = JobCheckpoint(job_id=job_id, stage=stage, artifact_path=artifact_path)
+    db.add(ck)
+    db.commit()
+    db.refresh(ck)
+    db.close()
+    return ck
+
+def get_job_checkpoints(job_id: str):
+    """
+    Retourne {stage: artifact_path} (dernier checkpoint de chaque étape).
+    """
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(JobCheckpoint)
+            .filter(JobCheckpoint.job_id == job_id)
+            .order_by(JobCheckpoint.id.asc())
+            .all()
+        )
+        return {ck.stage: ck.artifact_path for ck in rows}
+    finally:
+        db.close()
+
 def get_job(job_id: str):
     db = SessionLocal()
     job = db.query(Job).get(job_id)
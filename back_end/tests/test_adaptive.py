@@ -0,0 +1,77 @@
+# tests/test_adaptive.py
+import numpy as np
+
+from utils.asr.adaptive import SAMPLE_RATE, low_confidence_windows, transcribe_adaptive
+from utils.asr.stub_backend import StubBackend
+
+
+def _seg(start, end, text, logprob=-0.2, compression=1.2):
+    return {"start": start, "end": end, "text": text, "avg_logprob": logprob, "compression_ratio": compression}
+
+
+GREEDY = [
+    _seg(0.0, 2.0, "ok 1"),
+    _seg(2.5, 4.0, "douteux 1", logprob=-1.5),
+    _seg(4.2, 6.0, "douteux 2", compression=3.0),  # voisin (< 1 s) : même fenêtre
+    _seg(6.5, 8.0, "ok 2"),
+    _seg(9.5, 10.0, "douteux 3", logprob=-2.0),
+]
+
+
+def test_low_confidence_windows_groups_neighbours():
+    windows = low_confidence_windows(GREEDY, duration=12.0)
+    # chaque fenêtre s'étend jusqu'aux segments conservés voisins (ou aux bornes de l'audio)
+    assert windows == [(1, 2, 2.0, 6.5), (4, 4, 8.0, 12.0)]
+
+
+def test_low_confidence_windows_splits_on_long_gap():
+    segments = [_seg(0.0, 1.0, "a", logprob=-2.0), _seg(3.0, 4.0, "b", logprob=-2.0)]
+    assert low_confidence_windows(segments, duration=5.0) == [(0, 0, 0.0, 3.0), (1, 1, 1.0, 5.0)]
+
+
+class FakeDecoder:
+    """Glouton = GREEDY ; beam = un segment par fenêtre, plus ou moins confiant selon `beam_logprob`."""
+
+    def __init__(self, beam_logprob):
+        self.beam_logprob = beam_logprob
+        self.calls = []
+
+    def __call__(self, audio, beam_size):
+        self.calls.append((len(audio) / SAMPLE_RATE, beam_size))
+        if beam_size == 1:
+            return {"segments": [dict(s) for s in GREEDY], "text": "", "language": "fr"}
+        duration = len(audio) / SAMPLE_RATE
+        return {"segments": [_seg(0.1, duration - 0.1, f"beam {len(self.calls)}", logprob=self.beam_logprob)]}
+
+
+def test_beam_replaces_only_low_confidence_windows():
+    decode = FakeDecoder(beam_logprob=-0.3)
+    result = transcribe_adaptive(decode, np.zeros(12 * SAMPLE_RATE, dtype=np.float32), beam_size=5)
+
+    assert decode.calls == [(12.0, 1), (4.5, 5), (4.0, 5)]
+    assert [s["text"] for s in result["segments"]] == ["ok 1", "beam 2", "ok 2", "beam 3"]
+    # timestamps de la fenêtre beam recalés sur la timeline complète
+    assert (result["segments"][1]["start"], result["segments"][1]["end"]) == (2.1, 6.4)
+    assert result["text"] == "ok 1 beam 2 ok 2 beam 3"
+    assert result["language"] == "fr"
+    assert result["info"] == {"decoding": "adaptive", "redecoded_windows": 2}
+
+
+def test_less_confident_beam_keeps_greedy():
+    decode = FakeDecoder(beam_logprob=-3.0)
+    result = transcribe_adaptive(decode, np.zeros(12 * SAMPLE_RATE, dtype=np.float32))
+
+    assert [s["text"] for s in result["segments"]] == [s["text"] for s in GREEDY]
+    assert result["info"]["redecoded_windows"] == 2
+
+
+def test_stub_backend_without_scores_is_not_redecoded():
+    backend = StubBackend()
+    audio = np.zeros(10 * SAMPLE_RATE, dtype=np.float32)
+
+    def decode(buf, beam):
+        return backend.transcribe(buf, model_name="tiny", device="cpu", language="fr", beam_size=beam)
+
+    result = transcribe_adaptive(decode, audio)
+    assert result["segments"] == decode(audio, 1)["segments"]
+    assert result["info"]["redecoded_windows"] == 0
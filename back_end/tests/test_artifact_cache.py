@@ -0,0 +1,64 @@
+# tests/test_artifact_cache.py
+import os
+
+from utils.cache.artifact_cache import ArtifactCache, copy_and_hash, hash_file
+
+
+def _file(path, size):
+    path.write_bytes(b"x" * size)
+    return path
+
+
+def _age(cache, key, mtime):
+    # le mtime de l'entrée sert de date de dernier accès
+    path = cache.get(key)
+    os.utime(path, (mtime, mtime))
+
+
+def test_key_depends_on_upload_stage_and_params():
+    k = ArtifactCache.key("abc", "segments", whisper_model="small", language="fr")
+    assert k == ArtifactCache.key("abc", "segments", language="fr", whisper_model="small")  # ordre indifférent
+    assert k != ArtifactCache.key("abd", "segments", whisper_model="small", language="fr")
+    assert k != ArtifactCache.key("abc", "vocals", whisper_model="small", language="fr")
+    assert k != ArtifactCache.key("abc", "segments", whisper_model="small", language="en")
+    assert k != ArtifactCache.key("abc", "segments", whisper_model="small", language="fr", device="cpu")
+
+
+def test_hash_file_matches_copy_and_hash(tmp_path):
+    src = _file(tmp_path / "upload.bin", 3 * 1024 * 1024 + 17)
+    with open(src, "rb") as f:
+        digest = copy_and_hash(f, tmp_path / "copy.bin")
+    assert digest == hash_file(src) == hash_file(tmp_path / "copy.bin")
+
+
+def test_put_get_materialize_roundtrip(tmp_path):
+    cache = ArtifactCache(tmp_path / "cache", max_bytes=1 << 20)
+    assert cache.get("0" * 64) is None
+    key = ArtifactCache.key("h", "wav", sample_rate=16000)
+    cache.put(key, _file(tmp_path / "a.wav", 100))
+
+    out = cache.materialize(key, tmp_path / "job" / "a.wav")
+    assert out.read_bytes() == b"x" * 100
+    assert not list((tmp_path / "cache").rglob(".tmp_*"))
+
+
+def test_json_roundtrip(tmp_path):
+    cache = ArtifactCache(tmp_path, max_bytes=1 << 20)
+    key = ArtifactCache.key("h", "segments")
+    cache.put_json(key, "segments.json", {"language": "fr", "segments": [{"text": "é"}]})
+    assert cache.get_json(key) == {"language": "fr", "segments": [{"text": "é"}]}
+
+
+def test_eviction_removes_least_recently_used(tmp_path):
+    cache = ArtifactCache(tmp_path / "cache", max_bytes=250)
+    keys = [ArtifactCache.key("h", "wav", n=i) for i in range(3)]
+    for i, key in enumerate(keys[:2]):
+        cache.put(key, _file(tmp_path / f"{i}.wav", 100))
+        _age(cache, key, 1_000 + i)
+    _age(cache, keys[0], 2_000)  # keys[0] relu plus récemment que keys[1]
+
+    cache.put(keys[2], _file(tmp_path / "2.wav", 100))  # 300 > 250 octets
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[2]) is not None
@@ -0,0 +1,51 @@
+# tests/test_asr_registry.py
+import importlib
+import sys
+
+import pytest
+
+from utils.asr import registry
+
+
+@pytest.fixture
+def fake_torch(tmp_path, monkeypatch):
+    """Paquet `torch` factice (seul torch/version.py est lu) + nvidia-smi présent."""
+    def install(cuda_line):
+        pkg = tmp_path / "torch"
+        pkg.mkdir(exist_ok=True)
+        (pkg / "__init__.py").write_text("raise ImportError('torch ne doit pas être importé')\n")
+        (pkg / "version.py").write_text(f"__version__ = '2.3.0'\n{cuda_line}\n")
+        importlib.invalidate_caches()
+        registry._cuda_available.cache_clear()
+
+    monkeypatch.delitem(sys.modules, "torch", raising=False)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(registry.shutil, "which", lambda name: "/usr/bin/" + name)
+    monkeypatch.delenv("CUDA_VISIBLE_DEVICES", raising=False)
+    yield install
+    registry._cuda_available.cache_clear()
+
+
+def test_cuda_probe_reads_torch_build_without_importing(fake_torch):
+    fake_torch("cuda: Optional[str] = '12.1'")
+    assert registry._cuda_available() is True
+    assert "torch" not in sys.modules
+
+
+def test_cuda_probe_cpu_only_build(fake_torch):
+    fake_torch("cuda: Optional[str] = None")
+    assert registry._cuda_available() is False
+
+
+def test_cuda_probe_respects_hidden_devices(fake_torch, monkeypatch):
+    monkeypatch.setenv("CUDA_VISIBLE_DEVICES", "-1")
+    fake_torch("cuda = '12.1'")
+    assert registry._cuda_available() is False
+
+
+def test_asr_settings_falls_back_to_cpu(fake_torch):
+    fake_torch("cuda = None")
+    settings = registry.asr_settings("stub", "cuda")
+    assert settings["asr_backend"] == "stub" and settings["device"] == "cpu"
+    assert settings["compute_type"] is None
+    assert registry.asr_settings("stub", "cuda") == settings
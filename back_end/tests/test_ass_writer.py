@@ -0,0 +1,67 @@
+# tests/test_ass_writer.py
+import pytest
+
+from utils.subtitle_config.segment_to_ass import AssWriter, segments_to_ass
+
+SEGMENTS = [
+    {"start": 0.0, "end": 1.234, "text": "Bonjour\nle  monde"},
+    {"start": 61.5, "end": 3725.0, "text": "ligne\x07deux, avec virgule"},
+]
+
+
+def _dialogues(path):
+    return [line for line in path.read_text(encoding="utf-8").split("\n") if line.startswith("Dialogue:")]
+
+
+def test_atomic_writer_publishes_on_finalize(tmp_path):
+    path = tmp_path / "sous_titre" / "video.ass"
+    writer = AssWriter(str(path))
+    writer.write_segments(SEGMENTS)
+    writer.flush()
+    assert not path.exists() and path.with_name("video.ass.part").exists()
+
+    assert writer.finalize() == path
+    assert not path.with_name("video.ass.part").exists()
+    assert writer.count == 2
+    assert _dialogues(path) == [
+        "Dialogue: 0,0:00:00.00,0:00:01.23,Default,,0,0,0,,Bonjour le monde",
+        "Dialogue: 0,0:01:01.50,1:02:05.00,Default,,0,0,0,,ligne deux, avec virgule",
+    ]
+    writer.finalize()  # idempotent
+
+
+def test_atomic_writer_abort_leaves_nothing(tmp_path):
+    path = tmp_path / "video.ass"
+    with pytest.raises(RuntimeError):
+        with AssWriter(str(path)) as writer:
+            writer.write_segment(SEGMENTS[0])
+            raise RuntimeError("transcription interrompue")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_live_writer_is_valid_after_each_flush(tmp_path):
+    path = tmp_path / "video.ass"
+    writer = AssWriter(str(path), atomic=False)
+    writer.flush()
+    header = path.read_text(encoding="utf-8")
+    assert header.startswith("[Script Info]") and header.endswith("Effect, Text")
+
+    writer.write_segment(SEGMENTS[0])
+    writer.flush()
+    assert len(_dialogues(path)) == 1
+
+    writer.abort()  # non atomique : les lignes déjà écrites restent
+    assert len(_dialogues(path)) == 1
+
+
+def test_segments_to_ass_matches_streamed_writer(tmp_path):
+    batch, live = tmp_path / "batch.ass", tmp_path / "live.ass"
+    segments_to_ass(SEGMENTS, str(batch), fontname="Arial", fontsize=48, position="bottom-center")
+
+    writer = AssWriter(str(live), fontname="Arial", fontsize=48, position="bottom-center", atomic=False)
+    for seg in SEGMENTS:
+        writer.write_segment(seg)
+        writer.flush()
+    writer.finalize()
+
+    assert batch.read_bytes() == live.read_bytes()
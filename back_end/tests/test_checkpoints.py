@@ -0,0 +1,66 @@
+# tests/test_checkpoints.py
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import model.models_db  # noqa: F401  (enregistre les tables dans Base.metadata)
+from db.db import Base
+from service import crud
+
+
+@pytest.fixture
+def jobs_db(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(crud, "SessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    return engine
+
+
+def test_checkpoints_roundtrip_latest_wins(jobs_db):
+    crud.create_job("j1")
+    crud.add_job_checkpoint("j1", "extraction", "/tmp/a.wav")
+    crud.add_job_checkpoint("j1", "isolation_voix", "")
+    crud.add_job_checkpoint("j1", "extraction", "/tmp/b.wav")  # étape relancée
+
+    assert crud.get_job_checkpoints("j1") == {"extraction": "/tmp/b.wav", "isolation_voix": ""}
+    assert crud.get_job_checkpoints("inconnu") == {}
+    assert crud.add_job_checkpoint("inconnu", "extraction", "x") is None
+
+
+def test_checkpoint_artifact_requires_file_on_disk(tmp_path):
+    pipeline = pytest.importorskip("pipeline")
+    wav = tmp_path / "a.wav"
+    wav.write_bytes(b"")
+    checkpoints = {"extraction": str(wav), "isolation_voix": "", "transcription": str(tmp_path / "absent.json")}
+
+    assert pipeline._checkpoint_artifact(checkpoints, "extraction") == str(wav)
+    assert pipeline._checkpoint_artifact(checkpoints, "isolation_voix") == ""  # terminée sans artefact
+    assert pipeline._checkpoint_artifact(checkpoints, "transcription") is None  # artefact supprimé : relancer
+    assert pipeline._checkpoint_artifact(checkpoints, "assemblage") is None
+
+
+def test_resume_skips_finished_render(tmp_path, monkeypatch):
+    pipeline = pytest.importorskip("pipeline")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("étape relancée malgré le checkpoint")
+
+    monkeypatch.setattr(pipeline, "segments_to_ass_interface", fail)
+    monkeypatch.setattr(pipeline, "burn_subtitles_into_video_interface", fail)
+    ass, final = tmp_path / "v.ass", tmp_path / "v_sub.mp4"
+    ass.write_text("")
+    final.write_bytes(b"")
+
+    events = []
+    out = asyncio.run(pipeline._render_subtitled_video(
+        lambda event, payload: events.append((event, payload["task"])),
+        None, [], tmp_path / "v.mp4", tmp_path,
+        is_audio=False, fond=None, position="bottom", font_name="Arial", font_size=48,
+        font_color="#FFFFFF", font_outline_colors="#000000",
+        checkpoints={"creation_ass": str(ass), "assemblage": str(final)},
+    ))
+
+    assert out == final
+    assert events == [("task_finished", "creation_ass"), ("task_finished", "assemblage")]
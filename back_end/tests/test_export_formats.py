@@ -0,0 +1,60 @@
+# tests/test_export_formats.py
+import json
+
+import pytest
+
+from utils.subtitle_config.export_formats import export_subtitles, parse_export_formats
+
+SEGMENTS = [
+    {"start": 0.0, "end": 1.5, "text": "Bonjour <à> tous\n& merci",
+     "words": [{"word": " Bonjour", "start": 0.0, "end": 0.4, "score": 0.9}, {"word": "tous", "start": 0.5, "end": None}]},
+    {"start": 2.0, "end": 2.5, "text": "   "},  # sans texte : pas de cue SRT / VTT, gardé dans le JSON
+    {"start": 3661.0016, "end": 3662.9996, "text": "fin"},
+]
+
+
+def test_parse_export_formats():
+    assert parse_export_formats("SRT, vtt,srt") == ("srt", "vtt")
+    assert parse_export_formats(["json"]) == ("json",)
+    assert parse_export_formats("") == parse_export_formats(None) == ()
+    with pytest.raises(ValueError, match="ass"):
+        parse_export_formats("srt,ass")
+
+
+def test_srt_and_vtt(tmp_path):
+    paths = export_subtitles(SEGMENTS, tmp_path, "video", ["srt", "vtt"])
+
+    assert set(paths) == {"srt", "vtt"}
+    assert paths["srt"].read_text(encoding="utf-8") == (
+        "1\n00:00:00,000 --> 00:00:01,500\nBonjour <à> tous & merci\n\n"
+        "2\n01:01:01,002 --> 01:01:03,000\nfin\n\n"
+    )
+    assert paths["vtt"].read_text(encoding="utf-8") == (
+        "WEBVTT\n\n"
+        "00:00:00.000 --> 00:00:01.500\nBonjour &lt;à&gt; tous &amp; merci\n\n"
+        "01:01:01.002 --> 01:01:03.000\nfin\n\n"
+    )
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_words_json(tmp_path):
+    paths = export_subtitles(SEGMENTS, tmp_path, "video", ["json"], language="fr")
+
+    assert paths["json"].name == "video.words.json"
+    data = json.loads(paths["json"].read_text(encoding="utf-8"))
+    assert data["language"] == "fr"
+    assert [s["text"] for s in data["segments"]] == ["Bonjour <à> tous & merci", "", "fin"]
+    assert data["segments"][0]["words"] == [
+        {"word": "Bonjour", "start": 0.0, "end": 0.4, "score": 0.9},
+        {"word": "tous", "start": 0.5, "end": None},
+    ]
+
+
+def test_failed_export_removes_partial_files(tmp_path):
+    def segments():
+        yield SEGMENTS[0]
+        raise RuntimeError("segments illisibles")
+
+    with pytest.raises(RuntimeError):
+        export_subtitles(segments(), tmp_path, "video")
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,77 @@
+# tests/test_inference_worker.py
+# Lancement (depuis back_end/) : python -m pytest -q tests
+import socket
+import wave
+
+import pytest
+
+from worker.client import InferenceWorkerError, InferenceWorkerPool
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _write_wav(path, seconds: float, rate: int = 16000) -> None:
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(b"\x00\x00" * int(seconds * rate))
+
+
+@pytest.fixture
+def stub_pool():
+    pool = InferenceWorkerPool.spawn_local(1, base_port=_free_port(), stub=True)
+    try:
+        yield pool
+    finally:
+        pool.close()
+
+
+def test_phrases_events_arrive_before_result(stub_pool, tmp_path):
+    wav = tmp_path / "voice.wav"
+    _write_wav(wav, 7.5)
+
+    calls = []
+    segments, lang, info = stub_pool.build_phrases(
+        on_phrases=lambda phrases: calls.append(("phrases", phrases)),
+        audio_clear_path=str(wav), language="fr", whisper_model="tiny", device="cpu",
+    )
+    calls.append(("result", segments))
+
+    assert [kind for kind, _ in calls] == ["phrases", "result"]
+    assert calls[0][1] == segments
+    assert [s["text"] for s in segments] == ["segment 1", "segment 2", "segment 3"]
+    assert lang == "fr" and info["asr_backend"] == "stub"
+
+
+def test_build_phrases_without_events(stub_pool, tmp_path):
+    wav = tmp_path / "voice.wav"
+    _write_wav(wav, 3.0)
+    segments, _, _ = stub_pool.build_phrases(
+        audio_clear_path=str(wav), language="fr", whisper_model="tiny", device="cpu")
+    assert len(segments) == 1
+
+
+def test_dead_worker_is_respawned(stub_pool):
+    addr = stub_pool.addresses[0]
+    proc = stub_pool._procs[addr]
+    proc.kill()
+    proc.wait()
+
+    with pytest.raises(InferenceWorkerError):
+        stub_pool.request("ping")
+    # le worker a été relancé sur la même adresse et le pool reste utilisable
+    assert stub_pool._procs[addr] is not proc
+    assert stub_pool.request("ping") == "pong"
+
+
+def test_external_dead_worker_is_dropped():
+    pool = InferenceWorkerPool([("127.0.0.1", _free_port())], b"key")
+    with pytest.raises(InferenceWorkerError):
+        pool.request("ping")
+    with pytest.raises(InferenceWorkerError, match="Aucun worker"):
+        pool.request("ping")
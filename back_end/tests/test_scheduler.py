@@ -0,0 +1,114 @@
+# tests/test_scheduler.py
+import asyncio
+
+import pytest
+
+from scheduler import job_scheduler, resources
+from scheduler.job_scheduler import JobScheduler, QueueFullError
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """Table `jobs` simulée : {job_id: {"status", "params"}}."""
+    jobs = {}
+    monkeypatch.setattr(job_scheduler, "set_job_params",
+                        lambda job_id, params: jobs.setdefault(job_id, {}).update(params=params))
+    monkeypatch.setattr(job_scheduler, "set_job_status",
+                        lambda job_id, status, *_: jobs.setdefault(job_id, {}).update(status=status))
+    monkeypatch.setattr(job_scheduler, "get_jobs_by_status", lambda statuses: [
+        (job_id, j.get("params")) for job_id, j in jobs.items() if j.get("status") in statuses
+    ])
+    return jobs
+
+
+async def _noop(job_id, args):
+    pass
+
+
+def test_submit_persists_and_queues(db):
+    async def main():
+        sched = JobScheduler(max_running=1, max_backlog=5)
+        sched.register_runner("full", _noop)
+        await sched.submit("a", {"x": 1})
+        return sched
+
+    sched = asyncio.run(main())
+    assert db["a"] == {"params": {"kind": "full", "args": {"x": 1}}, "status": "queued"}
+    assert sched.stats()["queued"] == 1
+
+
+def test_queue_full_raises_with_retry_after(db):
+    async def main():
+        sched = JobScheduler(max_running=2, max_backlog=2)
+        sched.register_runner("full", _noop)
+        await sched.submit("a", {})
+        await sched.submit("b", {})
+        with pytest.raises(QueueFullError) as exc:
+            await sched.submit("c", {})
+        return exc.value
+
+    err = asyncio.run(main())
+    # 1 job de trop, 2 workers, 120 s par job estimés
+    assert err.retry_after == 60
+    assert "c" not in db
+
+
+def test_concurrent_submits_respect_backlog(db):
+    async def main():
+        sched = JobScheduler(max_running=1, max_backlog=3)
+        sched.register_runner("full", _noop)
+        results = await asyncio.gather(*(sched.submit(str(i), {}) for i in range(6)), return_exceptions=True)
+        return sched, results
+
+    sched, results = asyncio.run(main())
+    assert sum(isinstance(r, QueueFullError) for r in results) == 3
+    assert sched.stats()["queued"] == 3
+
+
+def test_unknown_kind_rejected(db):
+    sched = JobScheduler(max_running=1, max_backlog=3)
+    with pytest.raises(KeyError):
+        asyncio.run(sched.submit("a", {}, kind="restyle"))
+
+
+def test_restore_requeues_interrupted_jobs(db, monkeypatch):
+    monkeypatch.setattr(job_scheduler, "get_job_queue", lambda job_id: object())
+    db["running"] = {"status": "running", "params": {"kind": "full", "args": {"n": 1}}}
+    db["queued"] = {"status": "queued", "params": {"kind": "full", "args": {"n": 2}}}
+    db["done"] = {"status": "finished", "params": {"kind": "full", "args": {}}}
+    db["broken"] = {"status": "queued", "params": None}
+
+    ran = []
+
+    async def runner(job_id, args):
+        ran.append((job_id, args))
+
+    async def main():
+        sched = JobScheduler(max_running=1, max_backlog=5)
+        sched.register_runner("full", runner)
+        await sched.start()
+        await asyncio.wait_for(sched._queue.join(), timeout=5)
+        await sched.stop()
+
+    asyncio.run(main())
+    assert sorted(ran) == [("queued", {"n": 2}), ("running", {"n": 1})]
+    assert db["running"]["status"] == db["queued"]["status"] == "running"
+
+
+def test_resource_slot_counts_in_use(monkeypatch):
+    monkeypatch.setattr(resources, "_SEMAPHORES", {})
+    monkeypatch.setattr(resources, "_IN_USE", {})
+    monkeypatch.setitem(resources.RESOURCE_LIMITS, "demucs", 2)
+
+    async def main():
+        seen = []
+        async with resources.resource_slot("demucs"):
+            seen.append(resources.resources_usage()["demucs"]["in_use"])
+            async with resources.resource_slot("demucs"):
+                seen.append(resources.resources_usage()["demucs"]["in_use"])
+        seen.append(resources.resources_usage()["demucs"]["in_use"])
+        return seen
+
+    assert asyncio.run(main()) == [1, 2, 0]
+    with pytest.raises(KeyError):
+        resources.resource_slot("gpu")
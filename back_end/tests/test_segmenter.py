@@ -0,0 +1,24 @@
+# tests/test_segmenter.py
+from bench.synthetic import generate_aligned_segments, silence_map
+from utils.decoupage.array_segmenter import PHRASE_OPTS, IncrementalSegmenter, segment_phrases_array
+
+
+def test_silence_map_given_window_by_window_matches_batch():
+    segments = generate_aligned_segments(3_000, seed=3)
+    silences = silence_map(segments, min_gap_s=0.3)
+    batch = segment_phrases_array(segments, **PHRASE_OPTS, silence_regions=silences)
+
+    # carte connue seulement fenêtre par fenêtre (mode streaming) : ajoutée avant chaque feed()
+    seg = IncrementalSegmenter(**PHRASE_OPTS)
+    windows = [segments[i:i + 25] for i in range(0, len(segments), 25)]
+    phrases, known = [], 0
+    for k, window in enumerate(windows):
+        limit = windows[k + 1][0]["start"] if k + 1 < len(windows) else float("inf")
+        new = [r for r in silences[known:] if r[0] < limit]
+        known += len(new)
+        seg.add_silence_regions(new)
+        phrases.extend(seg.feed(window))
+    phrases.extend(seg.finish())
+
+    assert known == len(silences)
+    assert phrases == batch
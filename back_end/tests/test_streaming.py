@@ -0,0 +1,52 @@
+# tests/test_streaming.py
+import asyncio
+
+import numpy as np
+import pytest
+
+from utils.decoupage.array_segmenter import PHRASE_OPTS, segment_phrases_array
+
+RATE = 16000
+
+
+def _fake_aligned(buf, language, *args, phrases=True, **kwargs):
+    """Segments alignés factices : un mot toutes les 0,4 s, sans pause (phrases à cheval sur les fenêtres)."""
+    assert phrases is False
+    n = int(len(buf) / RATE / 0.4)
+    words = [{"word": f"mot{i}", "start": round(i * 0.4, 3), "end": round(i * 0.4 + 0.4, 3)} for i in range(n)]
+    segments = [{"start": w["start"], "end": w["end"], "text": w["word"], "words": [w]} for w in words]
+    return segments, language or "fr", {"redecoded_windows": 1, "silence_regions": []}
+
+
+def test_transcription_stage_shares_one_segmenter(monkeypatch):
+    streaming = pytest.importorskip("pipeline_streaming")
+    calls, returned = [], []
+
+    def build(buf, language, *args, **kwargs):
+        calls.append(language)
+        segments, lang, info = _fake_aligned(buf, language, *args, **kwargs)
+        returned.extend(segments)  # recalés en place par l'étape
+        return segments, lang, info
+
+    monkeypatch.setattr(streaming, "build_phrases_interface", build)
+    monkeypatch.setattr(streaming, "STREAM_CHUNK_S", 10.0)
+    events = []
+
+    async def main():
+        q = asyncio.Queue()
+        for i in range(5):
+            await q.put((i * 5.0, np.zeros(5 * RATE, dtype=np.float32)))
+        await q.put(streaming._END)
+        return await streaming._transcription_stage(
+            q, lambda event, payload: events.append((event, payload)), language=None, whisper_model="tiny",
+            device="cpu", asr_backend="stub", decoding=None, timing_mode=None,
+        )
+
+    result = asyncio.run(main())
+
+    assert len(calls) > 1 and calls[0] is None and set(calls[1:]) == {"fr"}  # langue de la 1re fenêtre imposée
+    assert result["language"] == "fr" and result["redecoded_windows"] == len(calls)
+    assert result["segments"] == segment_phrases_array(returned, **PHRASE_OPTS)
+    pushed = [p for e, p in events if e == "segment"]
+    assert [p["index"] for p in pushed] == np.cumsum([0] + [len(p["segments"]) for p in pushed[:-1]]).tolist()
+    assert sum(len(p["segments"]) for p in pushed) == len(result["segments"])
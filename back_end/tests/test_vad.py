@@ -0,0 +1,66 @@
+# tests/test_vad.py
+import numpy as np
+
+from utils.audio.vad import SAMPLE_RATE, compact_windows, remap_to_original, split_on_silences
+
+SR = SAMPLE_RATE
+
+
+def _tone(seconds, amp=0.5):
+    t = np.arange(int(seconds * SR), dtype=np.float32) / SR
+    return (amp * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+
+def test_compact_windows_tables_and_buffers():
+    audio = np.arange(20 * SR, dtype=np.float32)  # valeur = indice d'échantillon
+    regions = [(1.0, 3.0), (5.0, 6.0), (10.0, 14.0)]
+
+    windows = list(compact_windows(audio, regions, gap_s=0.5, max_window_s=4.0))
+
+    assert [table for _, table in windows] == [
+        [(0.0, 1.0, 3.0), (2.5, 5.0, 6.0)],  # 2 s + 0,5 s de silence + 1 s
+        [(0.0, 10.0, 14.0)],
+    ]
+    buf, _ = windows[0]
+    assert len(buf) == int(3.5 * SR)
+    assert buf[0] == 1 * SR and buf[2 * SR - 1] == 3 * SR - 1
+    assert not buf[2 * SR:int(2.5 * SR)].any()
+    assert buf[int(2.5 * SR)] == 5 * SR
+
+
+def test_long_region_is_cut_on_quiet_frame():
+    audio = np.concatenate([_tone(7.0), _tone(0.3, amp=0.001), _tone(7.0)])
+    duration = len(audio) / SR
+
+    windows = list(compact_windows(audio, [(0.0, duration)], max_window_s=10.0))
+
+    assert len(windows) == 2
+    (_, s0, e0), = windows[0][1]
+    (_, s1, e1), = windows[1][1]
+    assert s0 == 0.0 and e1 == duration and e0 == s1
+    assert 7.0 <= e0 <= 7.3  # coupe dans le creux
+    assert all(len(buf) <= 10 * SR for buf, _ in windows)
+
+
+def test_remap_to_original_segments_and_words():
+    table = [(0.0, 1.0, 3.0), (2.5, 5.0, 6.0)]
+    segments = [
+        {"start": 0.5, "end": 2.2, "words": [{"word": "a", "start": 0.5, "end": 1.0},
+                                             {"word": "b", "start": 1.9, "end": 2.2}]},
+        {"start": 2.6, "end": 3.4, "words": [{"word": "c", "start": 2.6, "end": None}]},
+    ]
+
+    remap_to_original(segments, table)
+
+    assert (segments[0]["start"], segments[0]["end"]) == (1.5, 3.0)  # fin dans le silence inséré : bornée
+    assert [(w["start"], w["end"]) for w in segments[0]["words"]] == [(1.5, 2.0), (2.9, 3.0)]
+    assert (segments[1]["start"], segments[1]["end"]) == (5.1, 5.9)
+    assert segments[1]["words"][0] == {"word": "c", "start": 5.1, "end": None}
+
+
+def test_split_on_silences_covers_buffer():
+    audio = np.concatenate([_tone(20.0), _tone(0.5, amp=0.001), _tone(20.0)])
+    bounds = split_on_silences(audio, max_chunk_s=30.0, min_chunk_s=10.0)
+    assert bounds[0][0] == 0 and bounds[-1][1] == len(audio)
+    assert all(a[1] == b[0] for a, b in zip(bounds, bounds[1:]))
+    assert 20 * SR <= bounds[0][1] <= 20.5 * SR
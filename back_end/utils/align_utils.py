@@ -1,40 +1,91 @@
 import logging
 from pathlib import Path
-from typing import List, Dict, Any, Tuple
+from typing import Callable, List, Dict, Any, Optional, Tuple, Union
 
-from utils.decoupage.segmenter import segment_phrases
-from .upgrade_with_whisperx_utils import transcribe_and_align
+import numpy as np
+
+from utils.decoupage.array_segmenter import PHRASE_OPTS, IncrementalSegmenter, segment_phrases_array
+from .upgrade_with_whisperx_utils import transcribe_and_align, load_audio_16k
+from .asr.base import SKIP_SILENCE
+from .audio.vad import speech_regions, silence_regions
 
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
 
+# en dessous de cette part de silence, on transcrit le fichier entier
+_MIN_SILENCE_SHARE = 0.05
+
 def build_phrases(
-    audio_clear_path: Path,
+    audio_clear_path: Union[Path, np.ndarray],
     language: str,
     whisper_model: str,
     device: str,
     reuse_models: bool = True,
-) -> Tuple[List[Dict[str, Any]], str]:
+    asr_backend: Optional[str] = None,
+    decoding: Optional[str] = None,
+    timing_mode: Optional[str] = None,
+    on_phrases: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+    phrases: bool = True,
+) -> Tuple[List[Dict[str, Any]], str, Dict[str, Any]]:
     """
     Wrapper pratique : appelle transcribe_and_align puis reconstruit des segments par phrase précis.
-    Retour: (phrase_segments, detected_language)
+    Si `on_phrases` est donné, l'audio est transcrit et aligné par fenêtres et les phrases lui
+    sont passées au fil de la transcription (dès qu'un silence les ferme) ; le retour
+    contient alors exactement ces phrases.
+    Avec `phrases=False`, les segments alignés (mots horodatés) sont rendus sans découpage et
+    info["silence_regions"] contient la carte de silences : l'appelant découpe lui-même
+    (ex: un IncrementalSegmenter partagé entre plusieurs fenêtres du mode streaming).
+    Retour: (phrase_segments, detected_language, info) ; info = statistiques de transcription
     """
-    aligned_segments, lang = transcribe_and_align(
-        audio_clear_path=audio_clear_path,
+    audio = load_audio_16k(audio_clear_path)
+    duration = len(audio) / 16000.0
+
+    speech, silences = None, None
+    if SKIP_SILENCE and duration > 0:
+        speech = speech_regions(audio)
+        silences = silence_regions(speech, duration)
+        silent_share = sum(e - s for s, e in silences) / duration
+        logger.info("Carte de silences: %d régions de parole, %.0f%% de silence", len(speech), 100 * silent_share)
+        if not speech:
+            speech, silences = None, None  # VAD non concluante : fichier entier, pas de carte
+        elif silent_share < _MIN_SILENCE_SHARE:
+            speech = None  # rien à gagner : fichier entier (la carte sert encore au découpage)
+
+    incremental, on_aligned = None, None
+    if on_phrases is not None:
+        incremental = IncrementalSegmenter(**PHRASE_OPTS, silence_regions=silences)
+        streamed: List[Dict[str, Any]] = []
+
+        def on_aligned(window_segments):
+            phrases = incremental.feed(window_segments)
+            if phrases:
+                streamed.extend(phrases)
+                on_phrases(phrases)
+
+    aligned_segments, lang, info = transcribe_and_align(
+        audio_clear_path=audio,
         language=language,
         whisper_model=whisper_model,
         device=device,
         reuse_models=reuse_models,
+        asr_backend=asr_backend,
+        speech_regions=speech,
+        decoding=decoding,
+        timing_mode=timing_mode,
+        on_aligned=on_aligned,
     )
 
-    phrase_segments = segment_phrases(
-        aligned_segments,
-        silence_threshold=0.4,
-        min_words=3,
-        max_words=14,
-        max_chars=80,
-        max_duration=6,
-    )
+    if not phrases:
+        return aligned_segments, lang, {**info, "silence_regions": silences or []}
+
+    if incremental is not None:
+        tail = incremental.finish()
+        if tail:
+            streamed.extend(tail)
+            on_phrases(tail)
+        return streamed, lang, info
+
+    phrase_segments = segment_phrases_array(aligned_segments, **PHRASE_OPTS, silence_regions=silences)
 
-    return phrase_segments, lang
\ No newline at end of file
+    return phrase_segments, lang, info
\ No newline at end of file
@@ -0,0 +1,125 @@
+# utils/asr/adaptive.py
+import logging
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .base import shift_segments
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+# "adaptive" : glouton puis beam sur les fenêtres peu sûres ; "beam" : beam partout ; "greedy" : glouton partout
+DECODING_MODES = ("adaptive", "beam", "greedy")
+DEFAULT_DECODING = os.environ.get("ASR_DECODING", "adaptive")
+# mêmes seuils que les replis de température de Whisper
+LOGPROB_THRESHOLD = float(os.environ.get("ASR_LOGPROB_THRESHOLD", "-1.0"))
+COMPRESSION_THRESHOLD = float(os.environ.get("ASR_COMPRESSION_THRESHOLD", "2.4"))
+# deux segments douteux séparés de moins de MERGE_GAP_S sont re-décodés ensemble
+MERGE_GAP_S = 1.0
+
+Decoder = Callable[[np.ndarray, int], Dict[str, Any]]
+
+
+def is_low_confidence(
+    seg: Dict[str, Any],
+    logprob_threshold: float = LOGPROB_THRESHOLD,
+    compression_threshold: float = COMPRESSION_THRESHOLD,
+) -> bool:
+    avg_logprob = seg.get("avg_logprob")
+    compression_ratio = seg.get("compression_ratio")
+    return (avg_logprob is not None and avg_logprob < logprob_threshold) or (
+        compression_ratio is not None and compression_ratio > compression_threshold
+    )
+
+
+def _mean_logprob(segments: List[Dict[str, Any]]) -> Optional[float]:
+    values = [s["avg_logprob"] for s in segments if s.get("avg_logprob") is not None]
+    return sum(values) / len(values) if values else None
+
+
+def low_confidence_windows(
+    segments: List[Dict[str, Any]],
+    duration: float,
+    logprob_threshold: float = LOGPROB_THRESHOLD,
+    compression_threshold: float = COMPRESSION_THRESHOLD,
+) -> List[Tuple[int, int, float, float]]:
+    """
+    Regroupe les segments douteux voisins en fenêtres (i_first, i_last, start_s, end_s).
+    Une fenêtre s'étend jusqu'aux segments conservés qui l'entourent : le re-décodage
+    ne recouvre jamais un segment gardé.
+    """
+    flagged = [i for i, s in enumerate(segments) if is_low_confidence(s, logprob_threshold, compression_threshold)]
+    groups: List[List[int]] = []
+    for i in flagged:
+        if groups and i == groups[-1][-1] + 1 and segments[i]["start"] - segments[i - 1]["end"] < MERGE_GAP_S:
+            groups[-1].append(i)
+        else:
+            groups.append([i])
+
+    windows = []
+    for g in groups:
+        first, last = g[0], g[-1]
+        start = segments[first - 1]["end"] if first > 0 else 0.0
+        end = segments[last + 1]["start"] if last + 1 < len(segments) else duration
+        windows.append((first, last, start, max(end, segments[last]["end"])))
+    return windows
+
+
+def transcribe_adaptive(
+    decode: Decoder,
+    audio: np.ndarray,
+    *,
+    beam_size: int = 5,
+    logprob_threshold: float = LOGPROB_THRESHOLD,
+    compression_threshold: float = COMPRESSION_THRESHOLD,
+) -> Dict[str, Any]:
+    """
+    Décodage glouton sur tout l'audio, puis re-décodage en beam search
+    (`beam_size`) des seules fenêtres dont avg_logprob < logprob_threshold
+    ou compression_ratio > compression_threshold.
+    `decode(audio, beam_size)` renvoie un résultat au format AsrBackend.transcribe.
+    Le résultat beam ne remplace le glouton que s'il n'est pas moins confiant.
+    info["redecoded_windows"] = nombre de fenêtres re-décodées.
+    """
+    result = decode(audio, 1)
+    segments = result["segments"]
+    duration = len(audio) / SAMPLE_RATE
+    windows = low_confidence_windows(segments, duration, logprob_threshold, compression_threshold)
+
+    replacements: Dict[int, Tuple[int, List[Dict[str, Any]]]] = {}
+    redecoded = 0
+    for first, last, start, end in windows:
+        a, b = int(start * SAMPLE_RATE), int(end * SAMPLE_RATE)
+        if b <= a:
+            continue
+        beam = decode(audio[a:b], beam_size)
+        redecoded += 1
+        beam_segments = shift_segments(beam["segments"], start, limit_s=end)
+
+        greedy_score = _mean_logprob(segments[first:last + 1])
+        beam_score = _mean_logprob(beam_segments)
+        if beam_segments and (greedy_score is None or beam_score is None or beam_score >= greedy_score):
+            replacements[first] = (last, beam_segments)
+
+    merged: List[Dict[str, Any]] = []
+    i = 0
+    while i < len(segments):
+        if i in replacements:
+            last, beam_segments = replacements[i]
+            merged.extend(beam_segments)
+            i = last + 1
+        else:
+            merged.append(segments[i])
+            i += 1
+
+    if windows:
+        logger.info("Décodage adaptatif: %d/%d fenêtres re-décodées en beam=%d, %d remplacées",
+                    redecoded, len(windows), beam_size, len(replacements))
+
+    result["segments"] = merged
+    result["text"] = " ".join(s["text"] for s in merged if s["text"]).strip()
+    result["info"] = {**result.get("info", {}), "decoding": "adaptive", "redecoded_windows": redecoded}
+    return result
@@ -0,0 +1,64 @@
+# utils/asr/base.py
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# horodatage des mots : "align" = wav2vec2 via whisperx.align (plus précis),
+# "asr" = timestamps natifs du moteur ASR (pas de modèle d'alignement à charger)
+TIMING_MODES = ("align", "asr")
+DEFAULT_TIMING_MODE = os.environ.get("TIMING_MODE", "align")
+# ne décoder que les régions de parole (carte de silences calculée sur l'audio 16 kHz)
+SKIP_SILENCE = os.environ.get("ASR_SKIP_SILENCE", "1") not in ("0", "false", "no")
+
+
+def shift_segments(
+    segments: List[Dict[str, Any]],
+    offset_s: float,
+    limit_s: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """Décale en place les timestamps des segments (et de leurs mots) de `offset_s`, bornés à `limit_s`."""
+    def shift(t):
+        t = t + offset_s
+        return round(min(t, limit_s) if limit_s is not None else t, 3)
+
+    for seg in segments:
+        seg["start"] = shift(seg["start"])
+        seg["end"] = shift(seg["end"])
+        for w in seg.get("words") or []:
+            if w.get("start") is not None:
+                w["start"] = shift(w["start"])
+            if w.get("end") is not None:
+                w["end"] = shift(w["end"])
+    return segments
+
+
+class AsrBackend:
+    """
+    Interface commune des moteurs de transcription.
+    transcribe() reçoit l'audio déjà décodé (float32 mono 16 kHz) et renvoie :
+        {"text": str, "segments": [{"start", "end", "text", ...}], "language": str,
+         "info": {...}, "compute_type": str}
+    Les segments portent si possible avg_logprob / compression_ratio / no_speech_prob.
+    beam_size <= 1 demande un décodage glouton ; word_timestamps=True ajoute
+    "words": [{"word", "start", "end", "probability"}] à chaque segment.
+    """
+
+    name = "base"
+
+    def is_available(self) -> bool:
+        return True
+
+    def transcribe(
+        self,
+        audio: np.ndarray,
+        *,
+        model_name: str,
+        device: str,
+        language: str,
+        temperature: float = 0.0,
+        beam_size: int = 5,
+        reuse: bool = True,
+        word_timestamps: bool = False,
+    ) -> Dict[str, Any]:
+        raise NotImplementedError
@@ -0,0 +1,95 @@
+# utils/asr/ctranslate2_backend.py
+# pip install faster-whisper
+import importlib.util
+import logging
+import os
+from typing import Any, Dict
+
+import numpy as np
+
+from .base import AsrBackend
+from ..cache.model_registry import model_registry
+
+logger = logging.getLogger(__name__)
+
+# taille approximative des poids float32 (Mo) ; ctranslate2 n'expose pas de paramètres torch
+_FP32_SIZES_MB = {"tiny": 150, "base": 290, "small": 970, "medium": 3100, "large": 6200}
+_BYTES_PER_WEIGHT = {"int8": 1, "int8_float16": 1, "int8_float32": 1, "int16": 2, "float16": 2, "float32": 4}
+
+
+def _default_compute_type(device: str) -> str:
+    # CPU : int8 (quantifié, plusieurs fois plus rapide que float32) ; GPU : float16
+    env = os.environ.get("ASR_CT2_COMPUTE_TYPE")
+    if env:
+        return env
+    return "float16" if device.startswith("cuda") else "int8"
+
+
+def _estimate_bytes(model_name: str, compute_type: str) -> int:
+    base = model_name.split(".")[0].split("-")[0]
+    fp32_mb = _FP32_SIZES_MB.get(base, _FP32_SIZES_MB["large"])
+    return int(fp32_mb * 1024 ** 2 * _BYTES_PER_WEIGHT.get(compute_type, 4) / 4)
+
+
+class CTranslate2Backend(AsrBackend):
+    """Whisper via CTranslate2 (faster-whisper) : int8 / int16 sur CPU, float16 sur GPU."""
+
+    name = "ctranslate2"
+
+    def is_available(self) -> bool:
+        return importlib.util.find_spec("faster_whisper") is not None
+
+    def transcribe(self, audio: np.ndarray, *, model_name: str, device: str, language: str,
+                   temperature: float = 0.0, beam_size: int = 5, reuse: bool = True,
+                   word_timestamps: bool = False) -> Dict[str, Any]:
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise RuntimeError("faster-whisper non installé. 'pip install faster-whisper'")
+
+        ct2_device = "cuda" if device.startswith("cuda") else "cpu"
+        compute_type = _default_compute_type(ct2_device)
+        cpu_threads = int(os.environ.get("ASR_CT2_THREADS", "0") or 0)
+
+        def load():
+            logger.info("Chargement faster-whisper model=%s compute_type=%s device=%s", model_name, compute_type, ct2_device)
+            return WhisperModel(model_name, device=ct2_device, compute_type=compute_type, cpu_threads=cpu_threads)
+
+        key = ("ct2", model_name, ct2_device, compute_type)
+        if reuse:
+            model = model_registry.get(key, load, size_of=lambda _m: _estimate_bytes(model_name, compute_type))
+        else:
+            model = load()
+
+        seg_iter, info = model.transcribe(
+            audio.astype(np.float32, copy=False),
+            language=language,
+            temperature=temperature,
+            beam_size=max(1, beam_size or 1),  # 1 = décodage glouton
+            word_timestamps=word_timestamps,
+            task="transcribe",
+        )
+        segments = []
+        for s in seg_iter:  # générateur : le décodage a lieu ici
+            seg = {
+                "start": float(s.start),
+                "end": float(s.end),
+                "text": s.text.strip(),
+                "avg_logprob": s.avg_logprob,
+                "compression_ratio": s.compression_ratio,
+                "no_speech_prob": s.no_speech_prob,
+            }
+            if word_timestamps:
+                seg["words"] = [
+                    {"word": w.word, "start": float(w.start), "end": float(w.end), "probability": w.probability}
+                    for w in (s.words or [])
+                ]
+            segments.append(seg)
+        return {
+            "text": " ".join(s["text"] for s in segments).strip(),
+            "segments": segments,
+            "language": getattr(info, "language", None) or language,
+            "info": {"language": getattr(info, "language", None),
+                     "language_probability": getattr(info, "language_probability", None)},
+            "compute_type": compute_type,
+        }
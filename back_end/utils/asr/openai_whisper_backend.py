@@ -0,0 +1,39 @@
+# utils/asr/openai_whisper_backend.py
+import importlib.util
+import logging
+from typing import Any, Dict
+
+import numpy as np
+
+from .base import AsrBackend
+from ..cache.model_registry import model_registry
+
+logger = logging.getLogger(__name__)
+
+
+class OpenAIWhisperBackend(AsrBackend):
+    """openai-whisper (PyTorch) : float16 sur GPU avec repli float32, float32 sur CPU."""
+
+    name = "openai-whisper"
+
+    def is_available(self) -> bool:
+        # pas d'import ici : torch n'est chargé que lorsque la transcription tourne
+        return importlib.util.find_spec("whisper") is not None
+
+    def transcribe(self, audio: np.ndarray, *, model_name: str, device: str, language: str,
+                   temperature: float = 0.0, beam_size: int = 5, reuse: bool = True,
+                   word_timestamps: bool = False) -> Dict[str, Any]:
+        from ..transcribe_with_whisper_utils import transcribe_with_whisper_auto
+
+        return transcribe_with_whisper_auto(
+            logger,
+            audio=audio,
+            model_name=model_name,
+            device=device,
+            language=language,
+            temperature=temperature,
+            beam_size=beam_size,
+            reuse=reuse,
+            registry=model_registry,
+            word_timestamps=word_timestamps,
+        )
@@ -0,0 +1,120 @@
+# utils/asr/parallel.py
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .base import shift_segments
+from ..audio.vad import SAMPLE_RATE, split_on_silences
+
+logger = logging.getLogger(__name__)
+
+# 0 = désactivé (un seul model.transcribe sur tout le fichier)
+DEFAULT_CHUNK_WORKERS = int(os.environ.get("ASR_CHUNK_WORKERS", "0") or 0)
+DEFAULT_MAX_CHUNK_S = float(os.environ.get("ASR_CHUNK_MAX_S", "30"))
+
+# état propre à chaque process du pool : le moteur (et son modèle) vit le temps du process
+_worker_backend = None
+_worker_opts: Dict[str, Any] = {}
+
+_pools: Dict[Tuple, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def _init_worker(backend_name: str, opts: Dict[str, Any], threads: int) -> None:
+    global _worker_backend, _worker_opts
+    # limiter les threads BLAS / CTranslate2 : workers x threads ≈ nombre de cœurs
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["ASR_CT2_THREADS"] = str(threads)
+    try:
+        import torch
+
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+    from .registry import get_backend
+
+    _worker_backend = get_backend(backend_name)
+    _worker_opts = opts
+
+
+def _transcribe_chunk(job: Tuple[float, np.ndarray, Dict[str, Any]]) -> Dict[str, Any]:
+    offset_s, chunk, decode_opts = job
+    result = _worker_backend.transcribe(chunk, reuse=True, **_worker_opts, **decode_opts)
+    # recaler les timestamps sur la timeline du fichier complet
+    shift_segments(result["segments"], offset_s)
+    return result
+
+
+def _get_pool(backend_name: str, opts: Dict[str, Any], workers: int) -> ProcessPoolExecutor:
+    key = (backend_name, tuple(sorted(opts.items())), workers)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            threads = max(1, (os.cpu_count() or 1) // workers)
+            logger.info("Pool ASR: %d workers x %d threads (%s, %s)", workers, threads, backend_name, opts.get("model_name"))
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),  # pas de fork après chargement de torch
+                initializer=_init_worker,
+                initargs=(backend_name, opts, threads),
+            )
+            _pools[key] = pool
+        return pool
+
+
+def shutdown_pools() -> None:
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        _pools.clear()
+
+
+atexit.register(shutdown_pools)
+
+
+def transcribe_chunked(
+    audio: np.ndarray,
+    backend_name: str,
+    *,
+    model_name: str,
+    device: str,
+    language: str,
+    temperature: float = 0.0,
+    beam_size: int = 5,
+    word_timestamps: bool = False,
+    workers: Optional[int] = None,
+    max_chunk_s: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Transcription parallèle : le buffer 16 kHz est coupé sur les silences (VAD énergie),
+    les morceaux sont transcrits par un pool de process (un modèle chargé par process,
+    conservé entre les jobs) puis les segments sont recollés dans l'ordre, timestamps
+    recalés. Même format de retour que AsrBackend.transcribe.
+    """
+    workers = workers or DEFAULT_CHUNK_WORKERS or (os.cpu_count() or 1)
+    bounds = split_on_silences(audio, SAMPLE_RATE, max_chunk_s=max_chunk_s or DEFAULT_MAX_CHUNK_S)
+    # le pool (et les modèles chargés) ne dépend que du modèle ; les options de décodage voyagent avec chaque morceau
+    pool = _get_pool(backend_name, {"model_name": model_name, "device": device}, workers)
+    decode_opts = {"language": language, "temperature": temperature, "beam_size": beam_size,
+                   "word_timestamps": word_timestamps}
+    jobs = [(start / SAMPLE_RATE, audio[start:end], decode_opts) for start, end in bounds]
+    results = list(pool.map(_transcribe_chunk, jobs))
+
+    segments: List[Dict[str, Any]] = []
+    for r in results:
+        segments.extend(r["segments"])
+    first = results[0] if results else {}
+    return {
+        "text": " ".join(r["text"] for r in results if r["text"]).strip(),
+        "segments": segments,
+        "language": first.get("language", language),
+        "info": {**first.get("info", {}), "chunks": len(bounds), "workers": min(workers, len(bounds))},
+        "compute_type": first.get("compute_type"),
+    }
@@ -0,0 +1,110 @@
+# utils/asr/registry.py
+import functools
+import importlib.util
+import logging
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .adaptive import COMPRESSION_THRESHOLD, LOGPROB_THRESHOLD
+from .base import SKIP_SILENCE, AsrBackend
+from .ctranslate2_backend import CTranslate2Backend, _default_compute_type
+from .openai_whisper_backend import OpenAIWhisperBackend
+from .stub_backend import StubBackend
+
+logger = logging.getLogger(__name__)
+
+_BACKENDS: Dict[str, AsrBackend] = {}
+
+
+def register_backend(backend: AsrBackend) -> None:
+    _BACKENDS[backend.name] = backend
+
+
+def get_backend(name: str) -> AsrBackend:
+    try:
+        return _BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Moteur ASR inconnu: {name} (disponibles: {', '.join(_BACKENDS)})")
+
+
+def available_backends() -> List[str]:
+    return [name for name, b in _BACKENDS.items() if b.is_available()]
+
+
+_TORCH_CUDA_RE = re.compile(r"^cuda\s*(?::[^=]*)?=\s*(.+?)\s*$", re.M)
+
+
+@functools.lru_cache(maxsize=1)
+def _cuda_available() -> bool:
+    """
+    CUDA utilisable, sans importer torch ni initialiser CUDA : appelé par le process API
+    à chaque job (clé du cache des segments). Calculé une fois :
+    torch compilé avec CUDA (lu dans torch/version.py), un GPU NVIDIA visible
+    et CUDA_VISIBLE_DEVICES ne masquant pas tous les GPU.
+    """
+    spec = importlib.util.find_spec("torch")
+    if spec is None or not spec.submodule_search_locations:
+        return False
+    try:
+        version = (Path(list(spec.submodule_search_locations)[0]) / "version.py").read_text()
+    except OSError:
+        return False
+    match = _TORCH_CUDA_RE.search(version)
+    if not match or match.group(1) == "None":
+        return False  # torch CPU uniquement
+    visible = os.environ.get("CUDA_VISIBLE_DEVICES")
+    if visible is not None and visible.strip() in ("", "-1"):
+        return False
+    gpus = Path("/proc/driver/nvidia/gpus")
+    return (gpus.is_dir() and any(gpus.iterdir())) or shutil.which("nvidia-smi") is not None
+
+
+def choose_backend(requested: Optional[str], device: str) -> AsrBackend:
+    """
+    Sélection du moteur :
+    - nom explicite (par job) ou variable ASR_BACKEND ;
+    - "auto" : openai-whisper sur GPU, CTranslate2 int8 sur CPU s'il est installé.
+    """
+    name = requested or os.environ.get("ASR_BACKEND", "auto")
+    if name != "auto":
+        return get_backend(name)
+
+    on_gpu = device.startswith("cuda") and _cuda_available()
+    order = ["openai-whisper", "ctranslate2"] if on_gpu else ["ctranslate2", "openai-whisper"]
+    for candidate in order:
+        if _BACKENDS[candidate].is_available():
+            logger.info("Moteur ASR choisi automatiquement: %s (device=%s)", candidate, device)
+            return _BACKENDS[candidate]
+    raise RuntimeError("Aucun moteur ASR disponible (installer openai-whisper ou faster-whisper).")
+
+
+def asr_settings(requested: Optional[str], device: str) -> Dict[str, Any]:
+    """
+    Réglages dont dépend la sortie de la transcription (clé du cache des segments) :
+    moteur réellement choisi, device effectif (repli cpu sans CUDA), précision CTranslate2,
+    seuils du décodage adaptatif et saut des silences.
+    """
+    if device.startswith("cuda") and not _cuda_available():
+        device = "cpu"
+    try:
+        backend = choose_backend(requested, device).name
+    except (RuntimeError, ValueError):
+        backend = requested or os.environ.get("ASR_BACKEND", "auto")
+    return {
+        "asr_backend": backend,
+        "device": device,
+        "compute_type": _default_compute_type(device) if backend == "ctranslate2" else None,
+        "logprob_threshold": LOGPROB_THRESHOLD,
+        "compression_threshold": COMPRESSION_THRESHOLD,
+        "skip_silence": SKIP_SILENCE,
+    }
+
+
+register_backend(OpenAIWhisperBackend())
+register_backend(CTranslate2Backend())
+register_backend(StubBackend())
+
+ASR_BACKENDS = ("auto",) + tuple(_BACKENDS)
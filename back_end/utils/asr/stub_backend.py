@@ -0,0 +1,42 @@
+# utils/asr/stub_backend.py
+from typing import Any, Dict
+
+import numpy as np
+
+from .base import AsrBackend
+
+SAMPLE_RATE = 16000
+
+
+class StubBackend(AsrBackend):
+    """
+    Moteur déterministe sans modèle (tests / machines CPU) :
+    un segment "segment N" toutes les 3 secondes d'audio.
+    """
+
+    name = "stub"
+
+    def transcribe(self, audio: np.ndarray, *, model_name: str, device: str, language: str,
+                   temperature: float = 0.0, beam_size: int = 5, reuse: bool = True,
+                   word_timestamps: bool = False) -> Dict[str, Any]:
+        duration = len(audio) / float(SAMPLE_RATE)
+        segments = []
+        t, i = 0.0, 0
+        while t < duration:
+            end = min(duration, t + 3.0)
+            seg = {"start": round(t, 3), "end": round(end, 3), "text": f"segment {i + 1}"}
+            if word_timestamps:
+                mid = round((t + end) / 2, 3)
+                seg["words"] = [
+                    {"word": "segment", "start": seg["start"], "end": mid, "probability": 1.0},
+                    {"word": str(i + 1), "start": mid, "end": seg["end"], "probability": 1.0},
+                ]
+            segments.append(seg)
+            t, i = end, i + 1
+        return {
+            "text": " ".join(s["text"] for s in segments),
+            "segments": segments,
+            "language": language,
+            "info": {"language": language},
+            "compute_type": "none",
+        }
@@ -0,0 +1,220 @@
+# utils/audio/vad.py
+import logging
+from bisect import bisect_right
+from typing import Iterator, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+_FRAME_S = 0.03  # 30 ms par trame
+_BLOCK_S = 60.0  # lecture par blocs d'une minute quand l'audio est un WavMemmap
+
+
+def frame_energy_db(audio: np.ndarray, sr: int = SAMPLE_RATE, frame_s: float = _FRAME_S) -> np.ndarray:
+    """
+    Énergie RMS par trame en dBFS (vectorisé, une passe sur le buffer).
+    `audio` peut être un WavMemmap : il est alors lu par blocs, sans copie complète en float.
+    """
+    frame = max(1, int(frame_s * sr))
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    if isinstance(audio, np.ndarray):
+        return _energy_db(audio[: n_frames * frame], frame)
+    block = frame * max(1, int(_BLOCK_S / frame_s))
+    stop = n_frames * frame
+    return np.concatenate([_energy_db(audio[a:min(a + block, stop)], frame) for a in range(0, stop, block)])
+
+
+def _energy_db(samples: np.ndarray, frame: int) -> np.ndarray:
+    frames = samples.reshape(-1, frame)
+    rms = np.sqrt(np.mean(frames * frames, axis=1, dtype=np.float32))
+    return (20.0 * np.log10(np.maximum(rms, 1e-6))).astype(np.float32)
+
+
+def split_on_silences(
+    audio: np.ndarray,
+    sr: int = SAMPLE_RATE,
+    max_chunk_s: float = 30.0,
+    min_chunk_s: float = 10.0,
+    frame_s: float = _FRAME_S,
+) -> List[Tuple[int, int]]:
+    """
+    Découpe le buffer en morceaux de `min_chunk_s` à `max_chunk_s` secondes,
+    chaque coupe tombant sur la trame la plus silencieuse de la fenêtre autorisée
+    (jamais au milieu d'un mot si une pause existe).
+    Retourne des bornes en échantillons [(start, end), ...] couvrant tout le buffer.
+    """
+    n = len(audio)
+    max_len = int(max_chunk_s * sr)
+    if n <= max_len:
+        return [(0, n)] if n else []
+
+    frame = max(1, int(frame_s * sr))
+    db = frame_energy_db(audio, sr, frame_s)
+    min_frames = max(1, int(min_chunk_s / frame_s))
+    max_frames = max(min_frames + 1, int(max_chunk_s / frame_s))
+
+    bounds = [(a * frame, b * frame) for a, b in _quiet_cuts(db, min_frames, max_frames)]
+    bounds[-1] = (bounds[-1][0], n)
+    logger.info("VAD: %d morceaux (max %.0fs) sur %.1fs d'audio", len(bounds), max_chunk_s, n / sr)
+    return bounds
+
+
+def _quiet_cuts(db: np.ndarray, min_frames: int, max_frames: int) -> List[Tuple[int, int]]:
+    """Bornes en trames de morceaux de `min_frames` à `max_frames` trames, coupés sur la trame la plus silencieuse."""
+    bounds = []
+    start_f = 0
+    total_f = len(db)
+    while (total_f - start_f) > max_frames:
+        lo, hi = start_f + min_frames, start_f + max_frames
+        cut_f = lo + int(np.argmin(db[lo:hi]))
+        bounds.append((start_f, cut_f))
+        start_f = cut_f
+    bounds.append((start_f, total_f))
+    return bounds
+
+
+def speech_regions(
+    audio: np.ndarray,
+    sr: int = SAMPLE_RATE,
+    min_silence_s: float = 1.0,
+    min_speech_s: float = 0.1,
+    pad_s: float = 0.2,
+    margin_db: float = 12.0,
+    floor_db: float = -50.0,
+    frame_s: float = _FRAME_S,
+) -> List[Tuple[float, float]]:
+    """
+    Carte de parole (vectorisée) : trames au-dessus du bruit de fond (10e percentile)
+    + `margin_db` et d'au moins `floor_db` dBFS. Les pauses plus courtes que
+    `min_silence_s` sont comblées, les bouffées plus courtes que `min_speech_s`
+    ignorées, puis chaque région est élargie de `pad_s`.
+    Retourne [(start_s, end_s), ...] triées et disjointes.
+    """
+    db = frame_energy_db(audio, sr, frame_s)
+    if db.size == 0:
+        return []
+    threshold = max(float(np.percentile(db, 10)) + margin_db, floor_db)
+    mask = db > threshold
+
+    # débuts / fins des plages True
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.view(np.int8), [0]))))
+    starts, ends = edges[0::2], edges[1::2]
+    if starts.size == 0:
+        return []
+
+    # combler les pauses courtes
+    keep = (starts[1:] - ends[:-1]) * frame_s >= min_silence_s
+    starts = starts[np.concatenate(([True], keep))]
+    ends = ends[np.concatenate((keep, [True]))]
+
+    # ignorer les bouffées isolées trop courtes (clics)
+    long_enough = (ends - starts) * frame_s >= min_speech_s
+    starts, ends = starts[long_enough], ends[long_enough]
+
+    duration = len(audio) / sr
+    regions: List[Tuple[float, float]] = []
+    for s, e in zip(starts * frame_s - pad_s, ends * frame_s + pad_s):
+        s, e = round(max(0.0, float(s)), 3), round(min(duration, float(e)), 3)
+        if regions and s <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], e)
+        else:
+            regions.append((s, e))
+    return regions
+
+
+def silence_regions(speech: List[Tuple[float, float]], duration: float) -> List[Tuple[float, float]]:
+    """Complément de la carte de parole sur [0, duration]."""
+    out = []
+    t = 0.0
+    for s, e in speech:
+        if s > t:
+            out.append((t, s))
+        t = max(t, e)
+    if t < duration:
+        out.append((t, duration))
+    return out
+
+
+def compact_windows(
+    audio: np.ndarray,
+    regions: List[Tuple[float, float]],
+    sr: int = SAMPLE_RATE,
+    gap_s: float = 0.3,
+    max_window_s: float = 600.0,
+    frame_s: float = _FRAME_S,
+) -> Iterator[Tuple[np.ndarray, List[Tuple[float, float, float]]]]:
+    """
+    Regroupe les régions de parole en fenêtres d'au plus `max_window_s` secondes et
+    produit, fenêtre par fenêtre, (buffer compact, table) : les régions mises bout à
+    bout (séparées par `gap_s` de silence pour que le décodeur voie la coupure) et,
+    pour chacune, (début dans le buffer de la fenêtre, début original, fin originale).
+    Une seule fenêtre est en mémoire à la fois (pas de copie compacte du fichier
+    entier) ; une région plus longue qu'une fenêtre est coupée sur ses trames les
+    plus silencieuses.
+    """
+    n = len(audio)
+    gap = int(gap_s * sr)
+    max_len = int(max_window_s * sr)
+    samples = [(int(s * sr), min(int(e * sr), n)) for s, e in regions]
+    group, size = [], 0
+    for a, b in _split_long_regions(audio, samples, sr, max_len, frame_s):
+        if group and size + gap + (b - a) > max_len:
+            yield _compact(audio, group, sr, gap)
+            group, size = [], 0
+        size += (gap if group else 0) + b - a
+        group.append((a, b))
+    if group:
+        yield _compact(audio, group, sr, gap)
+
+
+def _split_long_regions(audio, regions, sr, max_len, frame_s):
+    frame = max(1, int(frame_s * sr))
+    max_frames = max(2, max_len // frame - 1)  # -1 : début de région pas aligné sur une trame
+    db = None
+    for a, b in regions:
+        if b - a <= max_len:
+            if b > a:
+                yield a, b
+            continue
+        if db is None:
+            db = frame_energy_db(audio, sr, frame_s)  # par blocs si WavMemmap
+        f0 = -(-a // frame)
+        cuts = [(f0 + s) * frame for s, _ in _quiet_cuts(db[f0:b // frame], max(1, max_frames // 3), max_frames)[1:]]
+        edges = [a] + cuts + [b]
+        yield from zip(edges[:-1], edges[1:])
+
+
+def _compact(audio, group, sr, gap):
+    total = sum(b - a for a, b in group) + gap * (len(group) - 1)
+    buf = np.zeros(total, dtype=np.float32)
+    table = []
+    pos = 0
+    for a, b in group:
+        buf[pos:pos + b - a] = audio[a:b]  # vue ndarray ou fenêtre lue dans le memmap
+        table.append((pos / sr, a / sr, b / sr))
+        pos += b - a + gap
+    return buf, table
+
+
+def remap_to_original(segments: List[dict], table: List[Tuple[float, float, float]]) -> List[dict]:
+    """Recale en place start/end des segments et de leurs mots (temps du buffer compact -> timeline d'origine)."""
+    compact_starts = [c for c, _, _ in table]
+
+    def convert(t: float) -> float:
+        i = max(0, bisect_right(compact_starts, t) - 1)
+        compact_start, start, end = table[i]
+        return round(min(start + max(0.0, t - compact_start), end), 3)
+
+    for seg in segments:
+        seg["start"] = convert(float(seg["start"]))
+        seg["end"] = max(seg["start"], convert(float(seg["end"])))
+        for w in seg.get("words") or []:
+            if w.get("start") is not None:
+                w["start"] = convert(float(w["start"]))
+            if w.get("end") is not None:
+                w["end"] = max(w["start"] if w.get("start") is not None else 0.0, convert(float(w["end"])))
+    return segments
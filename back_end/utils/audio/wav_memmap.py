@@ -0,0 +1,153 @@
+# utils/audio/wav_memmap.py
+import logging
+import os
+import struct
+from pathlib import Path
+from typing import Iterator, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_WAVE_FORMAT_PCM = 1
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class WavInfo(NamedTuple):
+    sample_rate: int
+    channels: int
+    sampwidth: int
+    data_offset: int
+    n_frames: int
+
+
+def read_wav_info(path: Union[str, Path]) -> WavInfo:
+    """
+    Parcourt les chunks RIFF jusqu'à "data" (ignore LIST, fact, ...).
+    Accepte la taille 0 / 0xFFFFFFFF écrite par ffmpeg quand la sortie n'est pas
+    seekable : la taille réelle est alors déduite de la taille du fichier.
+    """
+    with open(path, "rb") as f:
+        head = f.read(12)
+        if len(head) < 12 or head[:4] != b"RIFF" or head[8:12] != b"WAVE":
+            raise ValueError(f"Pas un fichier WAV RIFF: {path}")
+        fmt = None
+        while True:
+            hdr = f.read(8)
+            if len(hdr) < 8:
+                raise ValueError(f"Chunk data absent: {path}")
+            chunk_id, size = hdr[:4], struct.unpack("<I", hdr[4:])[0]
+            if chunk_id == b"fmt ":
+                body = f.read(size)
+                audio_format, channels, sample_rate, _, _, bits = struct.unpack("<HHIIHH", body[:16])
+                if audio_format == _WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                    audio_format = struct.unpack("<H", body[24:26])[0]
+                fmt = (audio_format, channels, sample_rate, bits)
+                f.seek(size & 1, os.SEEK_CUR)
+            elif chunk_id == b"data":
+                data_offset = f.tell()
+                available = os.fstat(f.fileno()).st_size - data_offset
+                if size in (0, 0xFFFFFFFF) or size > available:
+                    size = available
+                break
+            else:
+                f.seek(size + (size & 1), os.SEEK_CUR)
+
+    if fmt is None:
+        raise ValueError(f"Chunk fmt absent: {path}")
+    audio_format, channels, sample_rate, bits = fmt
+    if audio_format != _WAVE_FORMAT_PCM or bits != 16:
+        raise ValueError(f"WAV PCM 16 bits attendu ({path}: format={audio_format}, bits={bits})")
+    return WavInfo(sample_rate, channels, 2, data_offset, size // (2 * channels))
+
+
+class WavMemmap:
+    """
+    Accès à un WAV PCM 16 bits via numpy.memmap : rien n'est lu avant d'être demandé,
+    et la conversion int16 -> float32 ne porte que sur la fenêtre demandée.
+    Se comporte comme un tableau mono float32 pour le découpage :
+        len(w), w[a:b] (échantillons), np.asarray(w) (tout le fichier).
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.info = read_wav_info(self.path)
+        if self.info.n_frames == 0:
+            self._pcm = np.zeros((0, self.info.channels), dtype="<i2")  # mmap d'une zone vide impossible
+        else:
+            self._pcm = np.memmap(
+                self.path, dtype="<i2", mode="r", offset=self.info.data_offset,
+                shape=(self.info.n_frames, self.info.channels),
+            )
+
+    @property
+    def sample_rate(self) -> int:
+        return self.info.sample_rate
+
+    @property
+    def channels(self) -> int:
+        return self.info.channels
+
+    @property
+    def duration(self) -> float:
+        return self.info.n_frames / float(self.info.sample_rate)
+
+    def __len__(self) -> int:
+        return self.info.n_frames
+
+    def window(self, start: int, end: int, mono: bool = True) -> np.ndarray:
+        """Échantillons [start, end) en float32 [-1, 1] ; (n,) si mono, sinon (n, channels)."""
+        pcm = self._pcm[max(0, start):max(0, end)]
+        if mono and self.info.channels > 1:
+            return pcm.mean(axis=1, dtype=np.float32) / np.float32(32768.0)
+        out = pcm.astype(np.float32) / np.float32(32768.0)
+        return out[:, 0] if mono else out
+
+    def window_seconds(self, start_s: float, end_s: float, mono: bool = True) -> np.ndarray:
+        sr = self.info.sample_rate
+        return self.window(int(start_s * sr), int(end_s * sr), mono=mono)
+
+    def iter_windows(self, window_s: float, mono: bool = True) -> Iterator[Tuple[int, np.ndarray]]:
+        """Parcourt le fichier par fenêtres de `window_s` secondes -> (premier échantillon, fenêtre)."""
+        step = max(1, int(window_s * self.info.sample_rate))
+        for start in range(0, self.info.n_frames, step):
+            yield start, self.window(start, start + step, mono=mono)
+
+    def __getitem__(self, key) -> np.ndarray:
+        if not isinstance(key, slice) or key.step not in (None, 1):
+            raise TypeError("WavMemmap ne supporte que le découpage contigu w[a:b]")
+        start, stop, _ = key.indices(self.info.n_frames)
+        return self.window(start, stop)
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        full = self.window(0, self.info.n_frames)
+        return full.astype(dtype, copy=False) if dtype is not None else full
+
+    def close(self) -> None:
+        # le mapping est libéré avec le dernier tableau qui le référence
+        self._pcm = None
+
+    def __enter__(self) -> "WavMemmap":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def open_wav(path: Union[str, Path], sample_rate: Optional[int] = None) -> Optional[WavMemmap]:
+    """
+    Ouvre `path` en memmap si c'est un WAV PCM 16 bits (et au bon taux si `sample_rate`
+    est donné) ; sinon None, l'appelant garde son chemin de décodage habituel.
+    """
+    path = Path(path)
+    if path.suffix.lower() != ".wav" or not path.exists():
+        return None
+    try:
+        w = WavMemmap(path)
+    except (ValueError, OSError) as e:
+        logger.debug("Memmap impossible pour %s: %s", path, e)
+        return None
+    if sample_rate is not None and w.sample_rate != sample_rate:
+        w.close()
+        return None
+    return w
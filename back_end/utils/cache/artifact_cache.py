@@ -0,0 +1,169 @@
+# utils/cache/artifact_cache.py
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, BinaryIO, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+_CHUNK = 1024 * 1024
+
+
+def hash_file(path: Union[str, Path]) -> str:
+    """sha256 du fichier (lecture par blocs)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_CHUNK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def copy_and_hash(src: BinaryIO, dst: Union[str, Path]) -> str:
+    """Copie un flux (upload) vers dst en calculant son sha256 au passage."""
+    h = hashlib.sha256()
+    with open(dst, "wb") as out:
+        for block in iter(lambda: src.read(_CHUNK), b""):
+            h.update(block)
+            out.write(block)
+    return h.hexdigest()
+
+
+class ArtifactCache:
+    """
+    Cache disque adressé par contenu : clé = sha256(hash de l'upload + étape + paramètres).
+    Chaque entrée est un fichier root/<k[:2]>/<k>/<name>. Le mtime sert de date
+    de dernier accès ; au-delà de max_bytes les entrées les moins récemment
+    utilisées sont supprimées.
+    """
+
+    def __init__(self, root: Union[str, Path], max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(upload_hash: str, stage: str, **params: Any) -> str:
+        payload = json.dumps({"src": upload_hash, "stage": stage, **params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def get(self, key: str) -> Optional[Path]:
+        entry = self._entry(key)
+        try:
+            files = [p for p in entry.iterdir() if not p.name.startswith(".")]
+        except FileNotFoundError:
+            return None
+        if not files:
+            return None
+        path = files[0]
+        try:
+            os.utime(path)  # marque comme récemment utilisé
+        except OSError:
+            return None
+        return path
+
+    def put(self, key: str, src: Union[str, Path]) -> Path:
+        """Copie src dans le cache (écriture atomique) puis applique la limite de taille."""
+        src = Path(src)
+        entry = self._entry(key)
+        entry.mkdir(parents=True, exist_ok=True)
+        dest = entry / src.name
+        fd, tmp = tempfile.mkstemp(dir=entry, prefix=".tmp_")
+        os.close(fd)
+        try:
+            shutil.copyfile(src, tmp)
+            os.replace(tmp, dest)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self.evict()
+        return dest
+
+    def materialize(self, key: str, dest: Union[str, Path]) -> Optional[Path]:
+        """Place l'artefact en cache à `dest` (lien dur si possible, sinon copie)."""
+        cached = self.get(key)
+        if cached is None:
+            return None
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        if dest.exists():
+            dest.unlink()
+        try:
+            os.link(cached, dest)
+        except OSError:
+            shutil.copy2(cached, dest)
+        return dest
+
+    def get_json(self, key: str) -> Optional[Any]:
+        path = self.get(key)
+        if path is None:
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def put_json(self, key: str, name: str, obj: Any) -> Path:
+        entry = self._entry(key)
+        entry.mkdir(parents=True, exist_ok=True)
+        dest = entry / name
+        fd, tmp = tempfile.mkstemp(dir=entry, prefix=".tmp_")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(obj, f, ensure_ascii=False, default=str)
+            os.replace(tmp, dest)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self.evict()
+        return dest
+
+    def evict(self) -> None:
+        with self._lock:
+            files = []
+            total = 0
+            for p in self.root.glob("*/*/*"):
+                if p.name.startswith("."):
+                    continue
+                try:
+                    st = p.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((st.st_mtime, st.st_size, p))
+                total += st.st_size
+            if total <= self.max_bytes:
+                return
+            files.sort()
+            for _, size, p in files:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    shutil.rmtree(p.parent)
+                    total -= size
+                    logger.info("Cache: éviction de %s (%d octets)", p.parent.name, size)
+                except OSError:
+                    pass
+
+
+# --- cache global, configuré par variables d'environnement ---
+# ARTIFACT_CACHE_DIR=cache       : dossier du cache
+# ARTIFACT_CACHE_MAX_GB=20       : taille max (0 = cache désactivé)
+_CACHE: Optional[ArtifactCache] = None
+
+
+def get_artifact_cache() -> Optional[ArtifactCache]:
+    global _CACHE
+    if _CACHE is None:
+        max_gb = float(os.environ.get("ARTIFACT_CACHE_MAX_GB", "20") or 0)
+        if max_gb <= 0:
+            return None
+        _CACHE = ArtifactCache(os.environ.get("ARTIFACT_CACHE_DIR", "cache"), int(max_gb * 1024 ** 3))
+    return _CACHE
@@ -0,0 +1,198 @@
+# utils/cache/model_registry.py
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_model_bytes(obj: Any) -> int:
+    """
+    Taille mémoire approximative d'un modèle : paramètres + buffers torch.
+    Accepte aussi un tuple/list (ex: (model_a, metadata) de whisperx).
+    """
+    if isinstance(obj, (tuple, list)):
+        return sum(estimate_model_bytes(o) for o in obj)
+    total = 0
+    for attr in ("parameters", "buffers"):
+        fn = getattr(obj, attr, None)
+        if not callable(fn):
+            continue
+        try:
+            total += sum(t.numel() * t.element_size() for t in fn())
+        except Exception:
+            pass
+    return total
+
+
+class _Entry:
+    __slots__ = ("value", "size", "last_used")
+
+    def __init__(self, value: Any, size: int):
+        self.value = value
+        self.size = size
+        self.last_used = time.monotonic()
+
+
+class ModelRegistry:
+    """
+    Cache de modèles borné en mémoire :
+    - max_bytes : budget total ; au-delà les modèles les moins récemment utilisés sont déchargés
+    - idle_ttl_s : un modèle inutilisé depuis plus longtemps est déchargé (0 = jamais)
+    - compteurs hits / misses / evictions / expirations / temps de chargement
+    `on_evict` est appelé après chaque déchargement (ex: torch.cuda.empty_cache).
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        idle_ttl_s: float = 0.0,
+        on_evict: Optional[Callable[[], None]] = None,
+        janitor_interval_s: float = 60.0,
+    ):
+        self.max_bytes = max_bytes
+        self.idle_ttl_s = idle_ttl_s
+        self.on_evict = on_evict
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.RLock()
+        # clé -> Event des chargements en cours (posé une fois le modèle en cache ou l'échec connu)
+        self._loading: Dict[Hashable, threading.Event] = {}
+        self.stats: Dict[str, float] = {
+            "hits": 0, "misses": 0, "evictions": 0, "expired": 0, "load_time_s": 0.0,
+        }
+        self._janitor: Optional[threading.Thread] = None
+        self._janitor_interval_s = janitor_interval_s
+
+    def get(self, key: Hashable, loader: Callable[[], Any], size_of: Callable[[Any], int] = estimate_model_bytes) -> Any:
+        """
+        Retourne le modèle `key`, chargé via loader() s'il n'est pas (ou plus) en cache.
+        Le chargement se fait hors du verrou global : seuls les appels qui demandent la même
+        clé attendent (un seul chargement par clé), get() / snapshot() restent disponibles.
+        """
+        self._start_janitor()
+        while True:
+            with self._lock:
+                self.evict_idle()
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.last_used = time.monotonic()
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return entry.value
+                loading = self._loading.get(key)
+                if loading is None:
+                    loading = self._loading[key] = threading.Event()
+                    self.stats["misses"] += 1
+                    break
+            # chargement en cours dans un autre thread : on attend puis on relit le cache
+            # (si ce chargement a échoué, ce thread retente le sien)
+            loading.wait()
+
+        try:
+            t0 = time.perf_counter()
+            value = loader()
+            elapsed = time.perf_counter() - t0
+            size = int(size_of(value))
+            logger.info("Modèle %s chargé en %.1fs (~%.0f Mo)", key, elapsed, size / 1024 ** 2)
+            with self._lock:
+                self.stats["load_time_s"] += elapsed
+                self._entries[key] = _Entry(value, size)
+                self._shrink(keep=key)
+            return value
+        finally:
+            with self._lock:
+                del self._loading[key]
+            loading.set()
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        del entry
+        if self.on_evict is not None:
+            try:
+                self.on_evict()
+            except Exception:
+                logger.exception("on_evict a échoué")
+
+    def _shrink(self, keep: Hashable) -> None:
+        """Décharge les modèles LRU tant que le budget est dépassé (sauf `keep`)."""
+        while self.total_bytes() > self.max_bytes and len(self._entries) > 1:
+            lru = next(iter(self._entries))
+            if lru == keep:
+                self._entries.move_to_end(lru)
+                lru = next(iter(self._entries))
+            logger.info("Budget mémoire dépassé : déchargement du modèle %s", lru)
+            self._drop(lru)
+            self.stats["evictions"] += 1
+
+    def evict_idle(self) -> None:
+        if self.idle_ttl_s <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if now - e.last_used > self.idle_ttl_s]:
+                logger.info("Modèle %s inutilisé depuis %.0fs : déchargé", key, now - self._entries[key].last_used)
+                self._drop(key)
+                self.stats["expired"] += 1
+
+    def _start_janitor(self) -> None:
+        # thread de fond : décharge les modèles inactifs même sans nouvelle requête
+        if self.idle_ttl_s <= 0 or self._janitor is not None:
+            return
+
+        def loop():
+            while True:
+                time.sleep(self._janitor_interval_s)
+                self.evict_idle()
+
+        self._janitor = threading.Thread(target=loop, name="model-registry-janitor", daemon=True)
+        self._janitor.start()
+
+    def total_bytes(self) -> int:
+        return sum(e.size for e in self._entries.values())
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._drop(key)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "max_bytes": self.max_bytes,
+                "total_bytes": self.total_bytes(),
+                "idle_ttl_s": self.idle_ttl_s,
+                "models": [
+                    {"key": repr(k), "bytes": e.size, "idle_s": round(now - e.last_used, 1)}
+                    for k, e in self._entries.items()
+                ],
+                **{k: (round(v, 2) if isinstance(v, float) else v) for k, v in self.stats.items()},
+            }
+
+
+def _empty_cuda_cache() -> None:
+    import gc
+
+    gc.collect()
+    try:
+        import torch
+
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except ImportError:
+        pass
+
+
+# --- registre global du process (Whisper, alignement, Demucs) ---
+# MODEL_CACHE_MAX_GB=8     : budget mémoire total des modèles chargés
+# MODEL_CACHE_IDLE_S=1800  : déchargement après ce délai sans utilisation (0 = jamais)
+model_registry = ModelRegistry(
+    max_bytes=int(float(os.environ.get("MODEL_CACHE_MAX_GB", "8")) * 1024 ** 3),
+    idle_ttl_s=float(os.environ.get("MODEL_CACHE_IDLE_S", "1800")),
+    on_evict=_empty_cuda_cache,
+)
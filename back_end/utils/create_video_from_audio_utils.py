@@ -45,6 +45,7 @@ def build_video_from_wav(
     width: int = 1280,
     height: int = 720,
     nvenc_preset: str = "p1",  # rapide, pour audio + image fixe
+    output_path=None,          # défaut : "<wav>_video.mp4" à côté du wav
 ) -> Path:
     """
     Génère une vidéo à partir d'un audio + fond fixe (image ou couleur) + sous-titres optionnels.
@@ -56,7 +57,8 @@ def build_video_from_wav(
     if not wav_path.exists():
         raise FileNotFoundError(f"Fichier audio introuvable: {wav_path}")
 
-    out =  "video_from_audio.mp4"
+    # à côté du wav (dossier du job) : pas de fichier partagé entre jobs dans le cwd
+    out = Path(output_path) if output_path else wav_path.with_name(wav_path.stem + "_video.mp4")
     out = out.resolve()
 
     duration = _ffprobe_duration(wav_path)
@@ -0,0 +1,318 @@
+# utils/decoupage/array_segmenter.py
+"""
+Moteur de découpage en phrases sur tableaux parallèles : mêmes règles et même
+résultat que segmenter.segment_phrases, mais en temps linéaire.
+  - les mots ne sont pas copiés en dicts : start / end / longueur / ponctuation
+    sont rangés dans des array.array (float64, int64, int8) ;
+  - longueur du texte et nombre de mots d'une phrase en cours = différences de
+    sommes cumulées (plus de " ".join(...) à chaque mot) ;
+  - dernière ponctuation forte / faible suivie au fil de l'eau (plus de
+    re-parcours de la phrase en arrière) ;
+  - coupures sur silences calculées d'un bloc avec NumPy.
+"""
+from array import array
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from .segmenter import _float, _word_text, _word_start, _word_end
+
+_NO_PUNCT, _SOFT, _STRONG = 0, 1, 2
+_STRONG_CHARS = ('.', '!', '?', '…')
+_SOFT_ENDINGS = (',', ';', ':')
+
+# réglages du découpage en phrases de la pipeline (batch, incrémental et streaming)
+PHRASE_OPTS = dict(silence_threshold=0.4, min_words=3, max_words=14, max_chars=80, max_duration=6)
+
+
+def _punct_class(text: str) -> int:
+    if text[-1] in _STRONG_CHARS:
+        return _STRONG
+    if text.endswith(_SOFT_ENDINGS):
+        return _SOFT
+    return _NO_PUNCT
+
+
+class WordArrays:
+    """Mots d'une transcription alignée en colonnes (indices communs)."""
+
+    __slots__ = ("text", "raw", "start", "end", "punct", "char_cum", "tok_cum")
+
+    def __init__(self):
+        self.text: List[str] = []
+        self.raw: List[Any] = []
+        self.start = array("d")
+        self.end = array("d")
+        self.punct = array("b")
+        # sommes cumulées : longueur + 1 espace, et nombre de tokens (str.split) par mot
+        self.char_cum = array("q", [0])
+        self.tok_cum = array("q", [0])
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def append(self, text: str, start: float, end: float, raw: Any) -> None:
+        self.text.append(text)
+        self.raw.append(raw)
+        self.start.append(start)
+        self.end.append(end)
+        self.punct.append(_punct_class(text))
+        self.char_cum.append(self.char_cum[-1] + len(text) + 1)
+        self.tok_cum.append(self.tok_cum[-1] + len(text.split()))
+
+    def extend(self, other: "WordArrays", lo: int = 0, hi: Optional[int] = None) -> None:
+        """Ajoute les mots [lo, hi) de `other` (colonnes copiées d'un bloc, sommes cumulées recalées)."""
+        hi = len(other) if hi is None else hi
+        self.text.extend(other.text[lo:hi])
+        self.raw.extend(other.raw[lo:hi])
+        self.start.extend(other.start[lo:hi])
+        self.end.extend(other.end[lo:hi])
+        self.punct.extend(other.punct[lo:hi])
+        for mine, theirs in ((self.char_cum, other.char_cum), (self.tok_cum, other.tok_cum)):
+            cum = np.frombuffer(theirs, dtype=np.int64)[lo + 1:hi + 1] + (mine[-1] - theirs[lo])
+            mine.frombytes(cum.tobytes())
+
+
+def flatten_to_arrays(aligned_segments: List[Dict[str, Any]]) -> WordArrays:
+    """Équivalent de segmenter.flatten_aligned, rangé en colonnes."""
+    words = WordArrays()
+    for seg in aligned_segments:
+        seg_start = _float(seg.get("start", 0.0))
+        seg_end = _float(seg.get("end", seg_start))
+        for w in seg.get("words") or []:
+            t = _word_text(w)
+            if not t:
+                continue
+            words.append(t, _word_start(w, seg_start), _word_end(w, seg_end, seg_start), w)
+    return words
+
+
+def silence_cuts(
+    words: WordArrays,
+    silence_threshold: float,
+    silence_regions: Optional[List[Tuple[float, float]]] = None,
+) -> List[Tuple[int, int]]:
+    """
+    Bornes [lo, hi) des blocs sans grand silence (mêmes coupures que
+    segmenter.split_on_silences), calculées sans boucle Python.
+    `silence_regions` triées et disjointes, comme celles de utils/audio/vad.py.
+    """
+    n = len(words)
+    if n == 0:
+        return []
+    start = np.frombuffer(words.start, dtype=np.float64)
+    end = np.frombuffer(words.end, dtype=np.float64)
+    cut = np.maximum(0.0, start[1:] - end[:-1]) >= silence_threshold
+
+    mids = np.array([(s + e) / 2.0 for s, e in (silence_regions or []) if e - s >= silence_threshold],
+                    dtype=np.float64)
+    if mids.size and n > 1:
+        # le pointeur de split_on_silences ne recule jamais : il suit le max des débuts déjà vus
+        k = np.searchsorted(mids, np.maximum.accumulate(start[:-1]), side="right")
+        found = k < mids.size
+        cut |= found & (mids[np.minimum(k, mids.size - 1)] <= start[1:])
+
+    edges = (np.flatnonzero(cut) + 1).tolist()
+    return list(zip([0] + edges, edges + [n]))
+
+
+def split_range_to_phrases(
+    words: WordArrays,
+    lo: int,
+    hi: int,
+    min_words: int,
+    max_words: int,
+    max_chars: int,
+    max_duration: float,
+) -> List[Tuple[int, int]]:
+    """
+    Découpe le bloc [lo, hi) en phrases (règles de segmenter.split_chunk_to_phrases,
+    fusion des phrases trop courtes comprise). Retourne des bornes de mots [(a, b), ...].
+    """
+    start, end, punct, char_cum = words.start, words.end, words.punct, words.char_cum
+    gap_limit = max(0.18, 0.25 * (max_duration / 8.0))
+
+    ranges = []
+    cur = lo
+    last_strong = last_soft = -1  # indices absolus ; valides s'ils sont >= cur
+    for i in range(lo, hi):
+        p = punct[i]
+        if p == _STRONG:
+            last_strong = i
+        elif p == _SOFT:
+            last_soft = i
+        n_words = i + 1 - cur
+
+        # 1) ponctuation forte, 2) petite pause avant le mot suivant
+        if n_words >= min_words and (
+            p == _STRONG or (i + 1 < hi and max(0.0, start[i + 1] - end[i]) > gap_limit)
+        ):
+            ranges.append((cur, i + 1))
+            cur = i + 1
+            continue
+
+        # 3) limites dépassées : couper à la dernière ponctuation forte, sinon faible, sinon au milieu
+        char_len = char_cum[i + 1] - char_cum[cur] - 1
+        if char_len >= max_chars or n_words >= max_words or end[i] - start[cur] >= max_duration:
+            if last_strong >= cur and last_strong + 1 - cur >= min_words:
+                cut = last_strong + 1
+            elif last_soft >= cur and last_soft + 1 - cur >= min_words:
+                cut = last_soft + 1
+            else:
+                cut = min(i + 1, cur + max(min_words, n_words // 2))
+            ranges.append((cur, cut))
+            cur = cut
+
+    if cur < hi:
+        ranges.append((cur, hi))
+
+    # fusion des phrases très courtes (durée ou nombre de mots) avec la précédente si proche
+    tok_cum = words.tok_cum
+    merged: List[List[int]] = []
+    for a, b in ranges:
+        if merged:
+            s, e = start[a], end[b - 1]
+            if (e - s < 0.8 or tok_cum[b] - tok_cum[a] < 2) and s - end[merged[-1][1] - 1] < 1.5:
+                merged[-1][1] = b
+                continue
+        merged.append([a, b])
+    return [(a, b) for a, b in merged]
+
+
+def make_phrase(words: WordArrays, a: int, b: int) -> Dict[str, Any]:
+    return {
+        "start": words.start[a],
+        "end": words.end[b - 1],
+        "text": " ".join(words.text[a:b]),
+        "words": words.raw[a:b],
+    }
+
+
+def segment_phrases_array(
+    aligned_segments: List[Dict[str, Any]],
+    *,
+    silence_threshold: float = 0.6,
+    min_words: int = 2,
+    max_words: int = 14,
+    max_chars: int = 80,
+    max_duration: float = 8.0,
+    silence_regions: Optional[List[Tuple[float, float]]] = None,
+    debug: bool = False
+) -> List[Dict[str, Any]]:
+    """Remplaçant de segmenter.segment_phrases (mêmes paramètres, mêmes phrases)."""
+    words = flatten_to_arrays(aligned_segments)
+    if not len(words):
+        return []
+
+    output = []
+    for lo, hi in silence_cuts(words, silence_threshold, silence_regions):
+        for a, b in split_range_to_phrases(words, lo, hi, min_words, max_words, max_chars, max_duration):
+            output.append(make_phrase(words, a, b))
+
+    # même nettoyage final : ordre chronologique et pas de chevauchement
+    cleaned = []
+    for seg in sorted(output, key=lambda x: x["start"]):
+        if cleaned and seg["start"] <= cleaned[-1]["end"]:
+            seg["start"] = cleaned[-1]["end"] + 0.001
+            if seg["start"] >= seg["end"]:
+                continue
+        cleaned.append(seg)
+    return cleaned
+
+
+class IncrementalSegmenter:
+    """
+    Version incrémentale de segment_phrases_array : les segments alignés arrivent par lots
+    (fenêtres de transcription) et les phrases sont rendues dès que leur bloc est fermé
+    par un silence, sans attendre la fin de la transcription. Chaque bloc est découpé par
+    split_range_to_phrases (même moteur que le mode batch).
+    Sur des mots triés dans le temps, la concaténation des retours de feed() et de
+    finish() est identique au résultat de segment_phrases.
+
+        seg = IncrementalSegmenter(silence_threshold=0.4, silence_regions=silences)
+        for window in aligned_windows:
+            emit(seg.feed(window))
+        emit(seg.finish())
+    """
+
+    def __init__(
+        self,
+        *,
+        silence_threshold: float = 0.6,
+        min_words: int = 2,
+        max_words: int = 14,
+        max_chars: int = 80,
+        max_duration: float = 8.0,
+        silence_regions: Optional[List[Tuple[float, float]]] = None,
+        debug: bool = False
+    ):
+        self.silence_threshold = silence_threshold
+        self._limits = (min_words, max_words, max_chars, max_duration)
+        self._mids = np.array([(s + e) / 2.0 for s, e in (silence_regions or []) if e - s >= silence_threshold],
+                              dtype=np.float64)
+        self._max_start = -np.inf
+        self._chunk = WordArrays()  # bloc ouvert (pas encore fermé par un silence)
+        self._last: Optional[Dict[str, Any]] = None  # dernière phrase rendue (anti-chevauchement)
+        self.emitted = 0
+
+    def add_silence_regions(self, silence_regions: List[Tuple[float, float]]) -> None:
+        """
+        Complète la carte de silences avant de donner une nouvelle fenêtre à feed()
+        (carte calculée fenêtre par fenêtre) : régions triées, après celles déjà connues.
+        """
+        mids = [(s + e) / 2.0 for s, e in silence_regions if e - s >= self.silence_threshold]
+        if mids:
+            self._mids = np.concatenate((self._mids, np.array(mids, dtype=np.float64)))
+
+    def feed(self, aligned_segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Ajoute des segments alignés ; retourne les phrases devenues définitives."""
+        words = flatten_to_arrays(aligned_segments)
+        if not len(words):
+            return []
+        chunk = self._chunk
+        first = max(0, len(chunk) - 1)  # paires (i, i + 1) pas encore examinées
+        chunk.extend(words)
+        n = len(chunk)
+
+        # mêmes coupures que silence_cuts, sur les nouvelles paires seulement
+        start = np.frombuffer(chunk.start, dtype=np.float64)
+        end = np.frombuffer(chunk.end, dtype=np.float64)
+        cut = np.maximum(0.0, start[first + 1:] - end[first:-1]) >= self.silence_threshold
+        mids = self._mids
+        if mids.size and n > 1:
+            # pointeur de split_on_silences : max des débuts déjà vus, lots précédents compris
+            seen = np.maximum.accumulate(np.concatenate(([self._max_start], start[first:-1])))[1:]
+            k = np.searchsorted(mids, seen, side="right")
+            cut |= (k < mids.size) & (mids[np.minimum(k, mids.size - 1)] <= start[first + 1:])
+        if n > 1:
+            self._max_start = max(self._max_start, float(start[first:-1].max()))
+
+        out = []
+        lo = 0
+        for edge in (np.flatnonzero(cut) + first + 1).tolist():
+            out.extend(self._close_range(chunk, lo, edge))
+            lo = edge
+        if lo:
+            # seul le bloc encore ouvert est conservé
+            self._chunk = WordArrays()
+            self._chunk.extend(chunk, lo, n)
+        return out
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """Ferme le dernier bloc et retourne ses phrases."""
+        chunk, self._chunk = self._chunk, WordArrays()
+        return self._close_range(chunk, 0, len(chunk))
+
+    def _close_range(self, chunk: WordArrays, lo: int, hi: int) -> List[Dict[str, Any]]:
+        out = []
+        for a, b in split_range_to_phrases(chunk, lo, hi, *self._limits):
+            seg = make_phrase(chunk, a, b)
+            prev = self._last
+            if prev is not None and seg["start"] <= prev["end"]:
+                seg["start"] = prev["end"] + 0.001
+                if seg["start"] >= seg["end"]:
+                    continue
+            self._last = seg
+            out.append(seg)
+        self.emitted += len(out)
+        return out
@@ -1,5 +1,5 @@
 # utils/segmenter.py
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 from copy import deepcopy
 import logging
 import math
@@ -55,19 +55,32 @@ def flatten_aligned(aligned_segments: List[Dict[str, Any]]) -> List[Dict[str, An
     return out
 
 
-def split_on_silences(words: List[Dict[str, Any]], silence_threshold: float) -> List[List[Dict[str, Any]]]:
+def split_on_silences(
+    words: List[Dict[str, Any]],
+    silence_threshold: float,
+    silence_regions: Optional[List[Tuple[float, float]]] = None,
+) -> List[List[Dict[str, Any]]]:
     """
     Split list of words into chunks where gaps > silence_threshold.
+    If a silence map is given (utils/audio/vad.py), also split where a measured
+    silence >= silence_threshold falls between two words (alignment often
+    stretches word ends over pauses).
     """
     if not words:
         return []
+    # milieux des silences assez longs, triés : parcourus avec un seul pointeur
+    mids = [(s + e) / 2.0 for s, e in (silence_regions or []) if e - s >= silence_threshold]
+    k = 0
     chunks = []
     cur = [words[0]]
     for i in range(len(words) - 1):
         cur_w = words[i]
         next_w = words[i + 1]
         gap = max(0.0, next_w["start"] - cur_w["end"])
-        if gap >= silence_threshold:
+        while k < len(mids) and mids[k] <= cur_w["start"]:
+            k += 1
+        measured_silence = k < len(mids) and mids[k] <= next_w["start"]
+        if gap >= silence_threshold or measured_silence:
             chunks.append(cur)
             cur = [next_w]
         else:
@@ -208,6 +221,7 @@ def segment_phrases(
     max_words: int = 14,
     max_chars: int = 80,
     max_duration: float = 8.0,
+    silence_regions: Optional[List[Tuple[float, float]]] = None,
     debug: bool = False
 ) -> List[Dict[str, Any]]:
     """
@@ -223,7 +237,7 @@ def segment_phrases(
         return []
 
     # Step 1: split on silences
-    chunks = split_on_silences(words, silence_threshold=silence_threshold)
+    chunks = split_on_silences(words, silence_threshold=silence_threshold, silence_regions=silence_regions)
 
     # Step 2: split each chunk to phrases
     output = []
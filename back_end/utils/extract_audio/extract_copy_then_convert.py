@@ -4,6 +4,7 @@ import os
 import time
 import subprocess
 import signal
+from .extract_direct import pcm_output_args
 
 def _safe_remove(path):
     try:
@@ -13,9 +14,12 @@ def _safe_remove(path):
         pass
 
 
-def extract_fifo_copy_then_convert_safe(input_video, output_wav, sample_rate=44100, channels=2, timeout=900):
+def extract_fifo_copy_then_convert_safe(input_video, output_wav, sample_rate=44100, channels=2, timeout=900,
+                                        asr_wav=None, asr_sample_rate=16000):
+    """Copie la piste compressée dans une FIFO lue par un second ffmpeg qui décode
+    une seule fois et écrit output_wav et/ou asr_wav (mono asr_sample_rate).
+    """
 
-    
     if os.name == "nt":
         raise RuntimeError("FIFO method not supported on Windows via os.mkfifo().")
     if shutil.which("ffmpeg") is None:
@@ -37,11 +41,7 @@ def extract_fifo_copy_then_convert_safe(input_video, output_wav, sample_rate=441
     reader_cmd = [
         "ffmpeg", "-y", "-nostdin", "-hide_banner",
         "-i", fifo_path,
-        "-ar", str(sample_rate),
-        "-ac", str(channels),
-        "-acodec", "pcm_s16le",
-        output_wav
-    ]
+    ] + pcm_output_args(output_wav, sample_rate, channels, asr_wav, asr_sample_rate)
     
     # Prépare kwargs pour Popen : preexec_fn uniquement sur Unix
     popen_kwargs = {"stdout": subprocess.DEVNULL, "stderr": subprocess.PIPE, "text": True}
@@ -97,4 +97,4 @@ def extract_fifo_copy_then_convert_safe(input_video, output_wav, sample_rate=441
         except Exception:
             pass
 
-    return {"output": output_wav, "method": "fifo_copy_then_convert", "time_s": time.perf_counter() - t0}
+    return {"output": output_wav, "asr_output": asr_wav, "method": "fifo_copy_then_convert", "time_s": time.perf_counter() - t0}
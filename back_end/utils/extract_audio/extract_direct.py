@@ -2,19 +2,50 @@
 import time
 from ..helper.run_cmd_utils import run_check
 
-def extract_direct(input_video, output_wav, sample_rate=44100, channels=2, timeout=900):
+
+def pcm_output_args(output_wav=None, sample_rate=44100, channels=2, asr_wav=None, asr_sample_rate=16000, copy=False):
+    """Arguments ffmpeg des sorties WAV d'une même passe de décodage.
+    - output_wav : WAV "complet" (44.1 kHz stéréo pour Demucs par défaut) ; None = pas produit
+    - asr_wav : WAV mono asr_sample_rate (16 kHz pour Whisper) ; None = pas produit
+    - copy : la sortie principale recopie le PCM d'origine sans ré-échantillonner
+    """
+    if output_wav is None and asr_wav is None:
+        raise ValueError("Au moins une sortie (output_wav ou asr_wav) est requise.")
+    args = []
+    if output_wav is not None:
+        if copy:
+            args += ["-map", "0:a:0", "-c:a", "copy", str(output_wav)]
+        else:
+            args += [
+                "-map", "0:a:0",
+                "-ar", str(sample_rate),
+                "-ac", str(channels),
+                "-acodec", "pcm_s16le",
+                str(output_wav),
+            ]
+    if asr_wav is not None:
+        args += [
+            "-map", "0:a:0",
+            "-ar", str(asr_sample_rate),
+            "-ac", "1",
+            "-acodec", "pcm_s16le",
+            str(asr_wav),
+        ]
+    return args
+
+
+def extract_direct(input_video, output_wav, sample_rate=44100, channels=2, timeout=900,
+                   asr_wav=None, asr_sample_rate=16000):
     """Décodage + ré-encodage en une passe.
     ffmpeg -i input -vn -ar {sample_rate} -ac {channels} -acodec pcm_s16le output.wav
+    Si asr_wav est fourni, la même passe écrit aussi un WAV mono {asr_sample_rate}
+    (output_wav peut alors être None).
     """
     cmd = [
         "ffmpeg", "-y", "-nostdin", "-hide_banner",
         "-i", input_video,
         "-vn",
-        "-ar", str(sample_rate),
-        "-ac", str(channels),
-        "-acodec", "pcm_s16le",
-        output_wav
-    ]
+    ] + pcm_output_args(output_wav, sample_rate, channels, asr_wav, asr_sample_rate)
     t0 = time.perf_counter()
     run_check(cmd, capture_output=False, timeout=timeout)
-    return {"output": output_wav, "method": "direct_reencode", "time_s": time.perf_counter() - t0}
+    return {"output": output_wav, "asr_output": asr_wav, "method": "direct_reencode", "time_s": time.perf_counter() - t0}
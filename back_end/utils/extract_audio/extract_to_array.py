@@ -0,0 +1,241 @@
+# extract_to_array.py
+import json
+import os
+import shutil
+import signal
+import subprocess
+import threading
+import time
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+# taille des lectures sur stdout de ffmpeg (en trames)
+CHUNK_FRAMES = 1 << 16
+# part du tableau pré-alloué laissée inutilisée au-delà de laquelle le résultat est recopié
+_MAX_SLACK = 0.05
+
+
+def _probe_duration(input_path) -> Optional[float]:
+    """Durée (s) annoncée par le conteneur, ou None (sert seulement à pré-allouer)."""
+    cmd = ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "json", str(input_path)]
+    try:
+        out = subprocess.check_output(cmd, stderr=subprocess.DEVNULL, timeout=30)
+        return float(json.loads(out)["format"]["duration"])
+    except Exception:
+        return None
+
+
+def _pcm_pipe_cmd(input_path, sample_rate, channels):
+    return [
+        "ffmpeg", "-nostdin", "-hide_banner", "-v", "error",
+        "-i", str(input_path),
+        "-vn", "-map", "0:a:0",
+        "-ar", str(sample_rate),
+        "-ac", str(channels),
+        "-f", "s16le", "-acodec", "pcm_s16le",
+        "pipe:1",
+    ]
+
+
+def _open_pipe(cmd):
+    popen_kwargs = {"stdout": subprocess.PIPE, "stderr": subprocess.PIPE}
+    if hasattr(os, "setsid"):
+        popen_kwargs["preexec_fn"] = os.setsid
+    return subprocess.Popen(cmd, **popen_kwargs)
+
+
+def _kill(proc):
+    try:
+        os.killpg(os.getpgid(proc.pid), signal.SIGTERM)
+    except Exception:
+        try:
+            proc.kill()
+        except Exception:
+            pass
+
+
+class PcmPipe:
+    """
+    ffmpeg -> PCM lu par blocs, sans fichier intermédiaire. read() rend le bloc suivant :
+    (indice de la première trame, float32 [-1, 1] de forme (n,) si mono sinon (n, channels)),
+    ou None en fin de flux. Le tampon int16 de lecture est alloué une fois (readinto).
+
+    `timeout` borne le temps passé bloqué dans read() sans recevoir un octet (ffmpeg figé),
+    pas la durée totale : le consommateur peut prendre son temps entre deux read().
+    kill() peut être appelé depuis n'importe quel thread, même pendant un read() bloqué.
+    """
+
+    def __init__(self, input_path, sample_rate=16000, channels=1, chunk_frames=CHUNK_FRAMES, timeout=900):
+        if shutil.which("ffmpeg") is None:
+            raise RuntimeError("ffmpeg introuvable dans le PATH.")
+        self.cmd = _pcm_pipe_cmd(input_path, sample_rate, channels)
+        self.channels = channels
+        self.timeout = timeout
+        self.pos = 0
+        self._frame_bytes = 2 * channels
+        self._raw = np.empty(chunk_frames * channels, dtype="<i2")
+        self._view = memoryview(self._raw).cast("B")
+        self._eof = False
+        self._killed = False
+        self._stalled = False
+        self._blocked_since: Optional[float] = None
+        self._closed = threading.Event()
+        self._lock = threading.Lock()
+        self.proc = _open_pipe(self.cmd)
+        if timeout:
+            threading.Thread(target=self._watchdog, name="pcm-pipe-watchdog", daemon=True).start()
+
+    def _watchdog(self) -> None:
+        interval = min(1.0, self.timeout / 4)
+        while not self._closed.wait(interval):
+            since = self._blocked_since
+            if since is not None and time.monotonic() - since > self.timeout:
+                self._stalled = True
+                self.kill()
+                return
+
+    def read(self) -> Optional[Tuple[int, np.ndarray]]:
+        if self._eof:
+            return None
+        view, stdout = self._view, self.proc.stdout
+        got = 0
+        self._blocked_since = time.monotonic()
+        try:
+            # remplir le tampon (un read() sur un pipe peut rendre moins que demandé)
+            while got < len(view):
+                n = stdout.readinto(view[got:])
+                if not n:
+                    break
+                got += n
+                self._blocked_since = time.monotonic()
+        finally:
+            self._blocked_since = None
+        if self._stalled:
+            self.close()
+            raise subprocess.TimeoutExpired(self.cmd, self.timeout)
+        if self._killed:
+            self._eof = True
+            return None
+
+        n_frames = got // self._frame_bytes
+        if got < len(view):
+            self._eof = True
+            self._finish()
+        if not n_frames:
+            return None
+        channels = self.channels
+        block = self._raw[: n_frames * channels].astype(np.float32) / np.float32(32768.0)
+        pos, self.pos = self.pos, self.pos + n_frames
+        return pos, (block if channels == 1 else block.reshape(n_frames, channels))
+
+    def _finish(self) -> None:
+        """Fin du flux : vérifie le code de retour de ffmpeg."""
+        self.proc.stdout.close()
+        stderr = self.proc.stderr.read()
+        returncode = self.proc.wait(timeout=30)
+        self.close()
+        if returncode != 0 and not self._killed:
+            raise subprocess.CalledProcessError(returncode, self.cmd, stderr=stderr.decode(errors="replace"))
+
+    def kill(self) -> None:
+        """Arrête ffmpeg (non bloquant) ; un read() en cours rend None."""
+        self._killed = True
+        if self.proc.poll() is None:
+            _kill(self.proc)
+
+    def close(self) -> None:
+        """Arrête ffmpeg s'il tourne encore et récupère le process (idempotent)."""
+        with self._lock:
+            if self._closed.is_set():
+                return
+            self._closed.set()
+            if self.proc.poll() is None:
+                self.kill()
+            self.proc.wait()
+            for stream in (self.proc.stdout, self.proc.stderr):
+                try:
+                    stream.close()
+                except Exception:
+                    pass
+
+
+def iter_pcm_chunks(input_path, sample_rate=16000, channels=1, chunk_frames=CHUNK_FRAMES,
+                    timeout=900) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Décode avec ffmpeg et produit le PCM au fil de l'eau (voir PcmPipe) :
+    (indice de la première trame, bloc float32). `timeout` = délai max sans données.
+    """
+    pipe = PcmPipe(input_path, sample_rate, channels, chunk_frames, timeout)
+    try:
+        while True:
+            item = pipe.read()
+            if item is None:
+                return
+            yield item
+    finally:
+        pipe.close()
+
+
+def extract_to_array(input_video, sample_rate=16000, channels=1, timeout=900, chunk_frames=CHUNK_FRAMES):
+    """Décode la piste audio directement dans un tableau NumPy (pas de WAV sur disque).
+    ffmpeg -i input -vn -ar {sample_rate} -ac {channels} -f s16le pipe:1
+    Le tableau float32 est pré-alloué d'après la durée ffprobe puis rogné (agrandi si besoin).
+    `timeout` : délai max sans données de ffmpeg (voir PcmPipe).
+    """
+    t0 = time.perf_counter()
+    duration = _probe_duration(input_video)
+    capacity = int((duration or 60.0) * sample_rate * 1.01) + sample_rate
+    shape = (capacity,) if channels == 1 else (capacity, channels)
+    out = np.empty(shape, dtype=np.float32)
+
+    n = 0
+    for pos, block in iter_pcm_chunks(input_video, sample_rate, channels, chunk_frames, timeout):
+        end = pos + len(block)
+        if end > len(out):
+            # durée annoncée sous-estimée : agrandir par doublement (seuls les n échantillons écrits sont recopiés)
+            grown = np.empty((max(end, 2 * len(out)),) + out.shape[1:], dtype=np.float32)
+            grown[:n] = out[:n]
+            out = grown
+        out[pos:end] = block
+        n = end
+
+    # out[:n] est une vue qui garde tout le tableau alloué en mémoire : acceptable pour le
+    # surplus normal de la pré-allocation (~1 %), sinon (durée mal annoncée, doublement) copie exacte
+    audio = out[:n] if n >= len(out) * (1 - _MAX_SLACK) else out[:n].copy()
+    return {"audio": audio, "sample_rate": sample_rate, "method": "pipe_to_array", "time_s": time.perf_counter() - t0}
+
+
+class RingBuffer:
+    """
+    Tampon circulaire float32 de capacité fixe pour les consommateurs en flux :
+    write() écrase les plus anciens échantillons, latest(n) renvoie les n derniers.
+    """
+
+    def __init__(self, capacity: int, channels: int = 1):
+        shape = (capacity,) if channels == 1 else (capacity, channels)
+        self._buf = np.zeros(shape, dtype=np.float32)
+        self.capacity = capacity
+        self.total_written = 0
+
+    def write(self, samples: np.ndarray) -> None:
+        written = len(samples)
+        if written >= self.capacity:
+            samples = samples[-self.capacity:]
+            self.total_written += written - len(samples)
+        start = self.total_written % self.capacity
+        first = min(len(samples), self.capacity - start)
+        self._buf[start:start + first] = samples[:first]
+        self._buf[: len(samples) - first] = samples[first:]
+        self.total_written += len(samples)
+
+    def __len__(self) -> int:
+        return min(self.total_written, self.capacity)
+
+    def latest(self, n: int) -> np.ndarray:
+        """Copie contiguë des n derniers échantillons (n borné au contenu)."""
+        n = min(n, len(self))
+        end = self.total_written % self.capacity
+        if n <= end:
+            return self._buf[end - n:end].copy()
+        return np.concatenate((self._buf[self.capacity - (n - end):], self._buf[:end]))
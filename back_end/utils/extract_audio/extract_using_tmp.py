@@ -13,9 +13,11 @@ def _safe_remove(path):
         pass
 
 
-def extract_copy_then_convert_tmpfile(input_video, output_wav, sample_rate=16000, channels=1, timeout=900):
+def extract_copy_then_convert_tmpfile(input_video, output_wav, sample_rate=16000, channels=1, timeout=900,
+                                      asr_wav=None, asr_sample_rate=16000):
     """Fallback cross-platform : copie la piste compressée dans un fichier temporaire,
     puis ré-encode ce fichier en WAV. Simple et compatible Windows.
+    La conversion écrit aussi asr_wav (mono asr_sample_rate) si demandé, dans la même passe.
     """
     if shutil.which("ffmpeg") is None:
         raise RuntimeError("ffmpeg introuvable dans le PATH.")
@@ -35,7 +37,8 @@ def extract_copy_then_convert_tmpfile(input_video, output_wav, sample_rate=16000
         ], capture_output=False, timeout=timeout)
 
         # 2) convert tmp to wav
-        result = extract_direct(tmp_path, output_wav, sample_rate, channels, timeout=timeout)
+        result = extract_direct(tmp_path, output_wav, sample_rate, channels, timeout=timeout,
+                                asr_wav=asr_wav, asr_sample_rate=asr_sample_rate)
         result["method"] = "copy_then_convert_tmpfile"
         result["time_s"] = time.perf_counter() - t0
         return result
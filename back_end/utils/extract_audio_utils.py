@@ -5,16 +5,19 @@ from pathlib import Path
 from typing import Union
 from .helper.prob_audio_utils import probe_first_audio
 from .helper.run_cmd_utils import run_check
-from .extract_audio.extract_direct import extract_direct
+from .extract_audio.extract_direct import extract_direct, pcm_output_args
 from .extract_audio.extract_using_tmp import extract_copy_then_convert_tmpfile
 from .extract_audio.extract_copy_then_convert import extract_fifo_copy_then_convert_safe
 
 def extract_audio(input_video, output_wav, sample_rate: Union[int,None]=44100, channels: int = 2,
-                  duration_threshold_seconds: int = 600, timeout: int = 900):
+                  duration_threshold_seconds: int = 600, timeout: int = 900,
+                  asr_wav=None, asr_sample_rate: int = 16000):
     """
     Wrapper pour extraire l'audio :
     - sample_rate=None => préserver sample rate d'origine (ne pas forcer la ré-échantillonnage)
     - Par défaut on sort en 44100 stereo (bon pour Demucs).
+    - asr_wav => écrit aussi un WAV mono asr_sample_rate (Whisper) pendant le même décodage ;
+      output_wav=None => seul asr_wav est produit (job sans séparation de la voix).
     """
     info = probe_first_audio(input_video)
     if not info:
@@ -30,39 +33,39 @@ def extract_audio(input_video, output_wav, sample_rate: Union[int,None]=44100, c
 
     compressed_set = {"aac", "mp3", "opus", "vorbis", "ac3", "eac3"}
 
+    asr = {"asr_wav": asr_wav, "asr_sample_rate": asr_sample_rate}
+
     # PCM case: only copy if sample_rate & channels match exactly
     if codec.startswith("pcm"):
         sr = info.get("sample_rate")
         ch = info.get("channels")
-        if sr == target_sr and ch == target_ch:
+        if sr == target_sr and ch == target_ch and output_wav is not None:
+            # copie du PCM d'origine (+ sortie ASR ré-échantillonnée dans la même commande)
             cmd = [
                 "ffmpeg", "-y", "-nostdin", "-hide_banner",
                 "-i", input_video,
-                "-map", "0:a:0",
-                "-c:a", "copy",
-                output_wav
-            ]
+            ] + pcm_output_args(output_wav, asr_wav=asr_wav, asr_sample_rate=asr_sample_rate, copy=True)
             t0 = time.perf_counter()
             run_check(cmd, capture_output=False, timeout=timeout)
-            return {"output": output_wav, "method": "copy_pcm", "time_s": time.perf_counter() - t0}
+            return {"output": output_wav, "asr_output": asr_wav, "method": "copy_pcm", "time_s": time.perf_counter() - t0}
         else:
-            return extract_direct(input_video, output_wav, sample_rate=target_sr, channels=target_ch, timeout=timeout)
+            return extract_direct(input_video, output_wav, sample_rate=target_sr, channels=target_ch, timeout=timeout, **asr)
 
     # compressed
     if codec in compressed_set:
         if duration < duration_threshold_seconds:
-            return extract_direct(input_video, output_wav, sample_rate=target_sr, channels=target_ch, timeout=timeout)
+            return extract_direct(input_video, output_wav, sample_rate=target_sr, channels=target_ch, timeout=timeout, **asr)
         else:
             # Long compressed file: try FIFO on Unix, tmpfile on Windows
             try:
                 if os.name == "nt":
-                    return extract_copy_then_convert_tmpfile(input_video, output_wav, sample_rate=target_sr, channels=target_ch, timeout=timeout)
+                    return extract_copy_then_convert_tmpfile(input_video, output_wav, sample_rate=target_sr, channels=target_ch, timeout=timeout, **asr)
                 else:
-                    return extract_fifo_copy_then_convert_safe(input_video, output_wav, sample_rate=target_sr, channels=target_ch, timeout=timeout)
+                    return extract_fifo_copy_then_convert_safe(input_video, output_wav, sample_rate=target_sr, channels=target_ch, timeout=timeout, **asr)
             except Exception as e:
                 # fallback to direct re-encode
                 print("Streaming method failed, fallback to direct_reencode:", e)
-                return extract_direct(input_video, output_wav, sample_rate=target_sr, channels=target_ch, timeout=timeout)
+                return extract_direct(input_video, output_wav, sample_rate=target_sr, channels=target_ch, timeout=timeout, **asr)
 
     # default fallback
-    return extract_direct(input_video, output_wav, sample_rate=target_sr, channels=target_ch, timeout=timeout)
+    return extract_direct(input_video, output_wav, sample_rate=target_sr, channels=target_ch, timeout=timeout, **asr)
@@ -5,14 +5,213 @@ import logging
 import torch
 import subprocess
 import shlex
+import wave
+from typing import Optional, Tuple
+
+import numpy as np
 
 from utils.cleaner.clear_gpu_cache import cleanup_demucs_processes, force_gpu_cleanup
+from utils.cache.model_registry import model_registry
+from utils.audio.wav_memmap import WavMemmap, open_wav
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# modèles pris en charge par la séparation (CLI et in-process)
+DEMUCS_MODELS = ("mdx", "mdx_q", "htdemucs")
+
+# séparation par blocs sur le WAV en memmap : mémoire bornée quelle que soit la durée
+DEMUCS_BLOCK_S = float(os.environ.get("DEMUCS_BLOCK_S", "120"))
+_DEMUCS_MARGIN_S = 5.0  # contexte de part et d'autre de chaque bloc, retiré ensuite
+# fenêtres du modèle : DEMUCS_SEGMENT (s, vide = défaut du modèle) et recouvrement DEMUCS_OVERLAP (0..1)
+DEMUCS_SEGMENT = float(os.environ["DEMUCS_SEGMENT"]) if os.environ.get("DEMUCS_SEGMENT") else None
+DEMUCS_OVERLAP = float(os.environ.get("DEMUCS_OVERLAP", "0.25"))
+
+
+def resolve_demucs_model(model: Optional[str] = None, single_sig: Optional[str] = None) -> str:
+    """Modèle effectivement utilisé par run_demucs pour ces paramètres."""
+    model_key = model or ("htdemucs" if (single_sig and single_sig != "") else "mdx")
+    if model_key not in DEMUCS_MODELS:
+        raise ValueError(f"Modèle demucs inconnu: {model_key} (attendu: {', '.join(DEMUCS_MODELS)})")
+    return model_key
+
+
+def _load_demucs_model(model: str, device: str):
+    def load():
+        from demucs.pretrained import get_model
+
+        logger.info("Chargement du modèle Demucs `%s` sur %s ...", model, device)
+        m = get_model(model)
+        m.to(device)
+        m.eval()
+        return m
+
+    # gardé dans model_registry (budget mémoire partagé avec whisper / alignement)
+    return model_registry.get(("demucs", model, device), load)
+
+
+def _max_segment(model) -> Optional[float]:
+    """Plus petite longueur de segment supportée par le modèle (ou ses sous-modèles)."""
+    subs = getattr(model, "models", None) or [model]
+    limits = [float(m.segment) for m in subs if getattr(m, "segment", None) is not None]
+    return min(limits) if limits else None
+
+
+def _wav_stats(wav: WavMemmap) -> Tuple[float, float]:
+    """Moyenne / écart-type du signal mono de référence, calculés par blocs (normalisation Demucs)."""
+    total, total_sq, n = 0.0, 0.0, 0
+    for _, block in wav.iter_windows(60.0, mono=True):
+        block = block.astype(np.float64)
+        total += float(block.sum())
+        total_sq += float(np.dot(block, block))
+        n += len(block)
+    if n == 0:
+        return 0.0, 0.0
+    mean = total / n
+    return mean, max(total_sq / n - mean * mean, 0.0) ** 0.5
+
+
+def _separate_block(m, block: np.ndarray, device: str, segment, overlap: float, shifts: int,
+                    mean: float, std: float) -> np.ndarray:
+    """Voix d'un bloc (n, channels) float32 -> (n, channels) float32, normalisé par (mean, std)."""
+    from demucs.apply import apply_model
+
+    x = torch.from_numpy(np.ascontiguousarray(block.T))
+    x = (x - mean) / (std + 1e-8)
+    with torch.no_grad():
+        sources = apply_model(
+            m, x[None], device=device, shifts=shifts, split=True,
+            overlap=overlap, segment=segment, progress=False,
+        )[0]
+    vocals = sources[m.sources.index("vocals")] * (std + 1e-8) + mean
+    return vocals.T.contiguous().cpu().numpy()
+
+
+def _demucs_streamed(m, wav: WavMemmap, vocals_path: Path, device: str, segment, overlap: float, shifts: int) -> None:
+    """
+    Sépare `wav` bloc par bloc (DEMUCS_BLOCK_S + marges de contexte) et écrit les voix
+    au fil de l'eau : ni le WAV complet ni les stems complets ne sont gardés en mémoire.
+    """
+    mean, std = _wav_stats(wav)
+    sr = m.samplerate
+    block = max(1, int(DEMUCS_BLOCK_S * sr))
+    margin = int(_DEMUCS_MARGIN_S * sr)
+    n = len(wav)
+
+    vocals_path.parent.mkdir(parents=True, exist_ok=True)
+    with wave.open(str(vocals_path), "wb") as out:
+        out.setnchannels(m.audio_channels)
+        out.setsampwidth(2)
+        out.setframerate(sr)
+        for start in range(0, n, block):
+            a, b = max(0, start - margin), min(n, start + block + margin)
+            vocals = _separate_block(m, wav.window(a, b, mono=False), device, segment, overlap, shifts, mean, std)
+            keep = min(block, n - start)
+            vocals = vocals[start - a:start - a + keep]
+            out.writeframes((np.clip(vocals, -1.0, 1.0) * 32767.0).round().astype("<i2").tobytes())
+
+
+def separate_vocals_array(
+    block: np.ndarray,
+    model: Optional[str] = None,
+    device: str = "cuda",
+    context: int = 0,
+    segment: Optional[float] = None,
+    overlap: float = 0.25,
+    shifts: int = 1,
+) -> np.ndarray:
+    """
+    Séparation d'un bloc en mémoire (mode streaming) : `block` (n, channels) float32 au
+    format du modèle (44.1 kHz stéréo), dont les `context` premières trames ne servent
+    que de contexte et sont retirées du résultat. Normalisation calculée sur le bloc.
+    """
+    model = resolve_demucs_model(model)
+    if device.startswith("cuda") and not torch.cuda.is_available():
+        device = "cpu"
+    m = _load_demucs_model(model, device)
+    limit = _max_segment(m)
+    if segment is not None and limit is not None and segment > limit:
+        segment = limit
+    ref = block.mean(axis=1)
+    vocals = _separate_block(m, block, device, segment, overlap, shifts, float(ref.mean()), float(ref.std()))
+    return vocals[context:]
+
+
+def vocals_to_asr(vocals: np.ndarray, sample_rate: int, asr_sample_rate: int = 16000) -> np.ndarray:
+    """Voix (n, channels) -> mono float32 au taux de Whisper (julius, dépendance de demucs)."""
+    import julius
 
-def demucs_cli_run(input_wav: Path, out_dir: Path, model: str = "mdx_q", cpu: bool = False):
+    mono = torch.from_numpy(np.ascontiguousarray(vocals.mean(axis=1, dtype=np.float32)))
+    return julius.resample_frac(mono, sample_rate, asr_sample_rate).numpy()
+
+
+def demucs_api_run(
+    input_wav: Path,
+    out_dir: Path,
+    model: str = "mdx_q",
+    device: str = "cuda",
+    segment: Optional[float] = None,
+    overlap: float = 0.25,
+    shifts: int = 1,
+):
+    """
+    Séparation in-process (pas de sous-process demucs) avec modèle gardé en cache.
+    Écrit out_dir/<model>/<stem>/vocals.wav (même arborescence que la CLI).
+    - segment : longueur (s) des fenêtres traitées, borné par le modèle (moins de VRAM si petit)
+    - overlap : recouvrement entre fenêtres (0..1)
+    Un WAV PCM 16 bits au format du modèle (celui d'extract_audio) est lu en memmap et
+    séparé par blocs ; sinon le fichier est décodé entièrement par demucs.audio.
+    """
+    from demucs.apply import apply_model
+    from demucs.audio import AudioFile, save_audio
+
+    input_wav = Path(input_wav)
+    out_dir = Path(out_dir)
+    if device.startswith("cuda") and not torch.cuda.is_available():
+        device = "cpu"
+
+    m = _load_demucs_model(model, device)
+
+    limit = _max_segment(m)
+    if segment is not None and limit is not None and segment > limit:
+        logger.info("segment=%.2fs > maximum du modèle (%.2fs) : borné.", segment, limit)
+        segment = limit
+
+    vocals_path = out_dir / model / input_wav.stem / "vocals.wav"
+    mm = open_wav(input_wav, sample_rate=m.samplerate)
+    if mm is not None and mm.channels == m.audio_channels:
+        with mm:
+            _demucs_streamed(m, mm, vocals_path, device, segment, overlap, shifts)
+        logger.info("Demucs in-process (par blocs, memmap) produced vocals: %s", vocals_path)
+        return vocals_path
+
+    wav = AudioFile(input_wav).read(streams=0, samplerate=m.samplerate, channels=m.audio_channels)
+    ref = wav.mean(0)
+    mean, std = ref.mean(), ref.std()
+    wav = (wav - mean) / (std + 1e-8)
+
+    with torch.no_grad():
+        sources = apply_model(
+            m, wav[None], device=device, shifts=shifts, split=True,
+            overlap=overlap, segment=segment, progress=False,
+        )[0]
+    sources = sources * (std + 1e-8) + mean
+
+    vocals = sources[m.sources.index("vocals")].cpu()
+    vocals_path.parent.mkdir(parents=True, exist_ok=True)
+    save_audio(vocals, str(vocals_path), samplerate=m.samplerate)
+    logger.info("Demucs in-process produced vocals: %s", vocals_path)
+    return vocals_path
+
+
+def demucs_cli_run(
+    input_wav: Path,
+    out_dir: Path,
+    model: str = "mdx_q",
+    cpu: bool = False,
+    segment: Optional[float] = None,
+    overlap: float = 0.25,
+):
     """
     Version améliorée avec meilleur contrôle du processus
     """
@@ -28,7 +227,9 @@ def demucs_cli_run(input_wav: Path, out_dir: Path, model: str = "mdx_q", cpu: bo
     else:
         device = "cuda" if torch.cuda.is_available() else "cpu"
 
-    cmd += ["-d", device]
+    cmd += ["-d", device, "--overlap", str(overlap)]
+    if segment is not None:
+        cmd += ["--segment", str(int(segment))]
 
     logger.info("Lancement Demucs CLI: %s", " ".join(shlex.quote(a) for a in cmd))
     
@@ -87,13 +288,17 @@ def run_demucs(
     wav_path: Path,
     out_target: Path,
     *,
-    single_sig: str = None,    # sig unique, ex: 'a1d90b5c' (si fourni on l'utilise comme clé de modèle)
-    model: str = "mdx",  # modèle par défaut si single_sig=None
+    single_sig: str = None,    # sig unique, ex: 'a1d90b5c' (si fourni et model=None -> htdemucs)
+    model: Optional[str] = None,  # "mdx", "mdx_q" ou "htdemucs" ; None -> htdemucs si single_sig sinon mdx
     device: str = "cuda",   # ignoré par CLI sauf si cpu=True
-    use_cli: bool = True,   # si True utilisera la CLI, sinon (fallback) garderait l'API (non utilisée ici)
+    use_cli: bool = False,  # True -> sous-process demucs (ancien comportement)
+    segment: Optional[float] = None,  # longueur des fenêtres (s), None = défaut du modèle
+    overlap: float = 0.25,
 ):
     """
-    Wrapper principal : si use_cli=True, lance demucs en CLI et retourne le path du vocals wav.
+    Wrapper principal : sépare la voix et retourne le path du vocals wav (ou None).
+    Par défaut la séparation tourne dans ce process avec un modèle gardé en cache ;
+    si demucs n'est pas importable on retombe sur la CLI.
     """
 
     wav_path = Path(wav_path)
@@ -106,7 +311,23 @@ def run_demucs(
     force_gpu_cleanup()
 
     # decide model_key
-    model_key = "htdemucs" if (single_sig and single_sig != "") else model
+    model_key = resolve_demucs_model(model, single_sig)
+
+    if not use_cli:
+        try:
+            vocals_path = demucs_api_run(
+                wav_path, out_target, model=model_key, device=str(device),
+                segment=segment, overlap=overlap,
+            )
+            force_gpu_cleanup()
+            return vocals_path
+        except ImportError as e:
+            logger.warning("demucs non importable (%s) : passage par la CLI.", e)
+            use_cli = True
+        except Exception as e:
+            logger.exception("Erreur lors de la séparation Demucs in-process: %s", e)
+            force_gpu_cleanup()
+            return None
 
     # If using CLI -> run CLI child process
     if use_cli:
@@ -114,7 +335,10 @@ def run_demucs(
         cpu_flag = (str(device).lower() == "cpu")
         # choose a safer default model for limited GPUs? we keep model_key as provided
         try:
-            vocals_path = demucs_cli_run(wav_path, out_target, model=model_key, cpu=cpu_flag)
+            vocals_path = demucs_cli_run(
+                wav_path, out_target, model=model_key, cpu=cpu_flag,
+                segment=segment, overlap=overlap,
+            )
             
             cleanup_demucs_processes()
             force_gpu_cleanup()
@@ -127,10 +351,6 @@ def run_demucs(
             
             return None
 
-    # fallback: (NOT USED) keep original python API path if you ever need it
-    logger.warning("use_cli=False demandé, mais la voie API n'est pas implémentée dans ce wrapper.")
-    return None
-
 
 # Petit test rapide si on exécute directement
 if __name__ == "__main__":
@@ -143,5 +363,5 @@ if __name__ == "__main__":
     out_dir = Path(sys.argv[2])
     sig_unique = sys.argv[3] if len(sys.argv) > 3 else None
 
-    res = run_demucs(input_wav, out_dir, single_sig=sig_unique, device=("cpu" if os.environ.get("DEMUCS_FORCE_CPU") == "1" else ("cuda" if torch.cuda.is_available() else "cpu")), jobs=1, use_cli=True)
+    res = run_demucs(input_wav, out_dir, single_sig=sig_unique, device=("cpu" if os.environ.get("DEMUCS_FORCE_CPU") == "1" else ("cuda" if torch.cuda.is_available() else "cpu")), use_cli=os.environ.get("DEMUCS_USE_CLI") == "1")
     print("Result:", res)
@@ -1,22 +1,31 @@
 from pathlib import Path
 import shlex
 import subprocess
-from typing import Union
+from typing import Optional, Union
 
 
-def convert_audio_to_wav(input_path: Union[str, Path], output_wav: Union[str, Path], sr: int = 44100, channels: int = 2):
+def convert_audio_to_wav(
+    input_path: Union[str, Path],
+    output_wav: Optional[Union[str, Path]],
+    sr: int = 44100,
+    channels: int = 2,
+    asr_wav: Optional[Union[str, Path]] = None,
+    asr_sr: int = 16000,
+):
     """
     Convertit input audio (mp3/m4a/ogg/...) en WAV PCM linéaire.
+    asr_wav : écrit aussi un WAV mono asr_sr (Whisper) pendant le même décodage
+    (output_wav peut alors être None).
     Bloquant; prévu pour être appelé via run_in_threadpool.
     """
     input_path = str(input_path)
-    output_wav = str(output_wav)
     cmd = [
         "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
         "-i", input_path,
-        "-ar", str(sr),
-        "-ac", str(channels),
         "-vn",  # s'assurer d'ignorer toute piste vidéo
-        output_wav
     ]
+    if output_wav is not None:
+        cmd += ["-map", "0:a:0", "-ar", str(sr), "-ac", str(channels), str(output_wav)]
+    if asr_wav is not None:
+        cmd += ["-map", "0:a:0", "-ar", str(asr_sr), "-ac", "1", str(asr_wav)]
     subprocess.run(cmd, check=True)
\ No newline at end of file
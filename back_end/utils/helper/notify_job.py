@@ -17,6 +17,11 @@ TASKS_ORDER: List[Tuple[str, str]] = [
     ("finished", "Terminé"),
 ]
 
+# tâches d'un job "restyle" (ré-rendu des sous-titres depuis les segments persistés)
+RESTYLE_TASKS_ORDER: List[Tuple[str, str]] = [
+    t for t in TASKS_ORDER if t[0] in ("creation_ass", "assemblage", "finished")
+]
+
 # --- état global stocké dans le module ---
 job_queues: Dict[str, asyncio.Queue] = {}
 job_states: Dict[str, Dict[str, dict]] = {}  # job_id -> { task_id: {...} }
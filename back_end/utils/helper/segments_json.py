@@ -0,0 +1,25 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, Union
+
+
+def save_segments_json(segments: List[Dict[str, Any]], language: str, path: Union[str, Path]) -> Path:
+    """
+    Sauvegarde les phrase segments d'un job (pour re-générer les sous-titres sans re-transcrire).
+    Format : {"language": "fr", "segments": [{start, end, text, words}, ...]}
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(
+        json.dumps({"language": language, "segments": segments}, ensure_ascii=False, default=str),
+        encoding="utf-8",
+    )
+    tmp.replace(path)
+    return path
+
+
+def load_segments_json(path: Union[str, Path]) -> Tuple[List[Dict[str, Any]], str]:
+    """Inverse de save_segments_json -> (segments, language)."""
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    return data.get("segments") or [], data.get("language")
@@ -0,0 +1,119 @@
+# utils/subtitle_config/export_formats.py
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple, Union
+
+from utils.subtitle_config.segment_to_ass import sanitize_line
+
+# formats exportés en plus du .ass (le .ass dépend du style, ceux-ci non)
+EXPORT_FORMATS = ("srt", "vtt", "json")
+
+# type de fichier enregistré pour le job (add_job_file) et extension par format
+EXPORT_FILE_TYPES = {"srt": "srt", "vtt": "vtt", "json": "words_json"}
+_EXTENSIONS = {"srt": ".srt", "vtt": ".vtt", "json": ".words.json"}
+
+
+def parse_export_formats(value: Union[str, Sequence[str], None]) -> Tuple[str, ...]:
+    """ "srt,vtt" ou ["srt", "vtt"] -> ("srt", "vtt") ; lève ValueError sur un format inconnu."""
+    if not value:
+        return ()
+    items = value.split(",") if isinstance(value, str) else value
+    formats = tuple(dict.fromkeys(f.strip().lower() for f in items if f.strip()))
+    unknown = [f for f in formats if f not in EXPORT_FORMATS]
+    if unknown:
+        raise ValueError(f"format(s) inconnu(s): {', '.join(unknown)} (attendus: {', '.join(EXPORT_FORMATS)})")
+    return formats
+
+
+# formats produits par défaut à la création des sous-titres ("" = aucun)
+DEFAULT_EXPORT_FORMATS = parse_export_formats(os.environ.get("SUBTITLE_EXPORT_FORMATS", "srt,vtt,json"))
+
+
+def _split_ms(seconds: float) -> Tuple[str, int]:
+    """Secondes -> ("HH:MM:SS", millisecondes) ; partagé par SRT (",") et WebVTT (".")."""
+    total_ms = int(round(max(0.0, seconds) * 1000))
+    s, ms = divmod(total_ms, 1000)
+    h, s = divmod(s, 3600)
+    m, s = divmod(s, 60)
+    return f"{h:02d}:{m:02d}:{s:02d}", ms
+
+
+def _escape_vtt(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _word_entry(w: Dict[str, Any]) -> Dict[str, Any]:
+    entry = {"word": (w.get("word") or w.get("text") or "").strip(), "start": w.get("start"), "end": w.get("end")}
+    if w.get("score") is not None:
+        entry["score"] = w["score"]
+    return entry
+
+
+def export_subtitles(
+    segments: Iterable[Dict[str, Any]],
+    output_dir: Path,
+    stem: str,
+    formats: Sequence[str] = EXPORT_FORMATS,
+    language: Optional[str] = None,
+    encoding: str = "utf-8",
+) -> Dict[str, Path]:
+    """
+    Écrit en un seul parcours des segments les formats demandés :
+      - srt  : SubRip (HH:MM:SS,mmm)
+      - vtt  : WebVTT (HH:MM:SS.mmm)
+      - json : {"language", "segments": [{start, end, text, words: [{word, start, end, score}]}]}
+    Texte nettoyé et timestamps formatés une seule fois par segment, partagés entre formats.
+    Chaque fichier est écrit dans "<nom>.part" puis renommé (jamais de fichier à moitié écrit).
+    Retourne {format: chemin}.
+    """
+    formats = [f for f in EXPORT_FORMATS if f in formats]
+    if not formats:
+        return {}
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = {f: output_dir / (stem + _EXTENSIONS[f]) for f in formats}
+    parts = {f: p.with_name(p.name + ".part") for f, p in paths.items()}
+    handles = {f: open(parts[f], "w", encoding=encoding, buffering=1 << 16) for f in formats}
+    srt, vtt, js = handles.get("srt"), handles.get("vtt"), handles.get("json")
+
+    try:
+        if vtt is not None:
+            vtt.write("WEBVTT\n\n")
+        if js is not None:
+            js.write('{"language": ' + json.dumps(language) + ', "segments": [')
+
+        n_segments = n_cues = 0
+        for seg in segments:
+            start = float(seg.get("start", 0.0))
+            end = float(seg.get("end", start + 0.001))
+            text = sanitize_line(seg.get("text", "") or "")
+            if js is not None:
+                js.write(("," if n_segments else "") + json.dumps({
+                    "start": start,
+                    "end": end,
+                    "text": text,
+                    "words": [_word_entry(w) for w in seg.get("words") or []],
+                }, ensure_ascii=False))
+            n_segments += 1
+            if not text or (srt is None and vtt is None):
+                continue
+            n_cues += 1
+            (start_hms, start_ms), (end_hms, end_ms) = _split_ms(start), _split_ms(end)
+            if srt is not None:
+                srt.write(f"{n_cues}\n{start_hms},{start_ms:03d} --> {end_hms},{end_ms:03d}\n{text}\n\n")
+            if vtt is not None:
+                vtt.write(f"{start_hms}.{start_ms:03d} --> {end_hms}.{end_ms:03d}\n{_escape_vtt(text)}\n\n")
+
+        if js is not None:
+            js.write("]}\n")
+        for f, fh in handles.items():
+            fh.close()
+            os.replace(parts[f], paths[f])
+    except BaseException:
+        for f, fh in handles.items():
+            fh.close()
+            parts[f].unlink(missing_ok=True)
+        raise
+    return paths
+
@@ -1,20 +1,11 @@
 # utils/subtitle_ass_utils.py
+import os
 from pathlib import Path
-from typing import List, Dict
+from typing import Iterable, List, Dict, Optional
 import unicodedata
 import re
 from utils.subtitle_config.subtitle_position import _ALIGNMENT_MAP
 
-# réutilise helpers que tu as déjà (ou recopie _sanitize_text/_split_text_lines si nécessaire)
-_RE_CONTROL = re.compile(r"[\x00-\x1f\x7f-\x9f]")
-def _sanitize_text(s: str) -> str:
-    if s is None:
-        return ""
-    s = _RE_CONTROL.sub(" ", s)
-    s = unicodedata.normalize("NFC", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
-
 def _format_time_ass(seconds: float) -> str:
     # ASS requires H:MM:SS.cc (centiseconds)
     total_cs = int(round(max(0.0, seconds) * 100))
@@ -23,34 +14,29 @@ def _format_time_ass(seconds: float) -> str:
     s, cs = divmod(rem, 100)
     return f"{h}:{m:02d}:{s:02d}.{cs:02d}"
 
-def _escape_ass_text(s: str) -> str:
-    # convert newlines to \N, remove control chars already sanitized
-    s = s.replace("\n", "\\N").replace("\r", "")
-    # ASS allows commas in text (Text is last field), so keep them
-    return s
+# une seule passe pour l'écriture en flux : contrôles (dont \n, \r) et blancs -> un espace
+_RE_CONTROL_OR_SPACE = re.compile(r"[\s\x00-\x1f\x7f-\x9f]+")
+def sanitize_line(s: str) -> str:
+    """Texte d'un segment sur une seule ligne (NFC), prêt pour le champ Text d'un Dialogue."""
+    if not s:
+        return ""
+    if not s.isascii():
+        s = unicodedata.normalize("NFC", s)
+    return _RE_CONTROL_OR_SPACE.sub(" ", s).strip()
 
-def segments_to_ass(
-    segments: List[Dict],
-    output_ass_path: str,
-    playresx: int = 3840,
-    playresy: int = 2160,
-    fontname: str = "Arial",
-    fontsize: int = 36,
-    font_color_ass: str = "&H00FFFFFF",   # use hex_to_ass_color if you prefer
-    outline_color_ass: str = "&H00000000",
-    outline_width: int = 2,
-    position: str = "top-center",   # <-- nouveau param
-    margin_v: int = 30,
-    encoding: str = "utf-8",
-) -> None:
-    """
-    Écrit un fichier .ass à partir de segments [{start,end,text}].
-    - output_ass_path : chemin à écrire
-    - playresx, playresy : résolution de référence (optionnel)
-    """
+def _ass_header(
+    playresx: int,
+    playresy: int,
+    fontname: str,
+    fontsize: int,
+    font_color_ass: str,
+    outline_color_ass: str,
+    outline_width: int,
+    position: str,
+    margin_v: int,
+) -> List[str]:
     align_code = _ALIGNMENT_MAP[position]
-    
-    header = [
+    return [
         "[Script Info]",
         "Title: Subs top-center",
         "ScriptType: v4.00+",
@@ -66,22 +52,123 @@ def segments_to_ass(
         "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
     ]
 
-    lines = list(header)
 
-    for seg in segments:
+class AssWriter:
+    """
+    Écriture d'un .ass en flux : l'en-tête est écrit une fois à l'ouverture, puis
+    chaque segment devient une ligne Dialogue ajoutée via un fichier bufferisé.
+    - atomic=True : on écrit dans "<fichier>.part", renommé à finalize() (le .ass
+      n'existe jamais à moitié écrit) ; abort() supprime le .part.
+    - atomic=False : on écrit directement le .ass ; après flush() le fichier est un
+      .ass valide qui grandit au fil des segments (jobs incrémentaux).
+    segments_to_ass passe par le même writer (mode atomique).
+
+        with AssWriter(path, fontname="Arial") as w:
+            w.write_segments(segments)   # finalize() à la sortie du bloc
+    """
+
+    def __init__(
+        self,
+        output_ass_path: str,
+        playresx: int = 3840,
+        playresy: int = 2160,
+        fontname: str = "Arial",
+        fontsize: int = 36,
+        font_color_ass: str = "&H00FFFFFF",
+        outline_color_ass: str = "&H00000000",
+        outline_width: int = 2,
+        position: str = "top-center",
+        margin_v: int = 30,
+        encoding: str = "utf-8",
+        atomic: bool = True,
+        buffer_size: int = 1 << 16,
+    ):
+        self.path = Path(output_ass_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._target = self.path.with_name(self.path.name + ".part") if atomic else self.path
+        header = _ass_header(playresx, playresy, fontname, fontsize, font_color_ass,
+                             outline_color_ass, outline_width, position, margin_v)
+        self._fh: Optional[object] = open(self._target, "w", encoding=encoding, buffering=buffer_size)
+        # pas de saut de ligne final : chaque Dialogue est précédé de "\n" (comme "\n".join)
+        self._fh.write("\n".join(header))
+        self.count = 0
+
+    def write_segment(self, seg: Dict) -> None:
         start = float(seg.get("start", 0.0))
         end = float(seg.get("end", start + 0.001))
-        text = seg.get("text", "") or ""
-        text = _sanitize_text(text)
-        text = _escape_ass_text(text)
-        start_str = _format_time_ass(start)
-        end_str = _format_time_ass(end)
+        text = sanitize_line(seg.get("text", "") or "")
         # Dialogue line: Dialogue: 0,0:00:00.00,0:00:01.23,Default,,0,0,0,,Text
-        # Margin fields are numeric (left,right,vertical)
-        dialogue = f"Dialogue: 0,{start_str},{end_str},Default,,0,0,0,,{text}"
-        lines.append(dialogue)
-
-    out_path = Path(output_ass_path)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    out_text = "\n".join(lines)
-    out_path.write_text(out_text, encoding=encoding)
+        self._fh.write(f"\nDialogue: 0,{_format_time_ass(start)},{_format_time_ass(end)},Default,,0,0,0,,{text}")
+        self.count += 1
+
+    def write_segments(self, segments: Iterable[Dict]) -> None:
+        for seg in segments:
+            self.write_segment(seg)
+
+    def flush(self) -> None:
+        """Vide le buffer : le fichier sur disque contient toutes les lignes écrites."""
+        self._fh.flush()
+
+    def finalize(self) -> Path:
+        """Ferme le fichier et, en mode atomique, le met en place (os.replace)."""
+        if self._fh is not None:
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+            self._fh.close()
+            self._fh = None
+            if self._target != self.path:
+                os.replace(self._target, self.path)
+        return self.path
+
+    def abort(self) -> None:
+        """Ferme sans publier : le .part est supprimé (en mode non atomique le fichier reste)."""
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+            if self._target != self.path:
+                self._target.unlink(missing_ok=True)
+
+    def __enter__(self) -> "AssWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.finalize()
+        else:
+            self.abort()
+
+
+def segments_to_ass(
+    segments: List[Dict],
+    output_ass_path: str,
+    playresx: int = 3840,
+    playresy: int = 2160,
+    fontname: str = "Arial",
+    fontsize: int = 36,
+    font_color_ass: str = "&H00FFFFFF",   # use hex_to_ass_color if you prefer
+    outline_color_ass: str = "&H00000000",
+    outline_width: int = 2,
+    position: str = "top-center",   # <-- nouveau param
+    margin_v: int = 30,
+    encoding: str = "utf-8",
+) -> None:
+    """
+    Écrit un fichier .ass à partir de segments [{start,end,text}].
+    - output_ass_path : chemin à écrire
+    - playresx, playresy : résolution de référence (optionnel)
+    Les lignes sont écrites au fil de l'eau (AssWriter), le fichier est publié atomiquement.
+    """
+    with AssWriter(
+        output_ass_path,
+        playresx=playresx,
+        playresy=playresy,
+        fontname=fontname,
+        fontsize=fontsize,
+        font_color_ass=font_color_ass,
+        outline_color_ass=outline_color_ass,
+        outline_width=outline_width,
+        position=position,
+        margin_v=margin_v,
+        encoding=encoding,
+    ) as writer:
+        writer.write_segments(segments)
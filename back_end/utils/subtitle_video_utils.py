@@ -120,3 +120,64 @@ def burn_subtitles_into_video(
 
     logger.info("Fichier vidéo avec sous-titres écrit : %s", out)
     return out
+
+
+# modes d'assemblage -> extension de la vidéo finale
+# "burn" : incrustation (ré-encodage) ; "soft-*" : piste de sous-titres, vidéo et audio copiés
+SUBTITLE_MODES = {"burn": ".mp4", "soft-mkv": ".mkv", "soft-mp4": ".mp4"}
+
+# codec de la piste de sous-titres selon le conteneur (mode "soft" : pas de ré-encodage)
+_SOFT_SUBTITLE_CODECS = {".mkv": "ass", ".mp4": "mov_text", ".mov": "mov_text", ".webm": "webvtt"}
+
+
+def mux_subtitles_into_video(
+    input_video: Union[str, Path],
+    input_subs: Union[str, Path],
+    output_video: Optional[Union[str, Path]] = None,
+    *,
+    ffmpeg_path: str = "ffmpeg",
+    overwrite: bool = True,
+    timeout: Optional[int] = None,
+    language: Optional[str] = None,
+) -> Path:
+    """
+    Ajoute les sous-titres comme piste sélectionnable (sans les incruster) :
+    vidéo et audio copiés tels quels (-c copy), donc à la vitesse du disque.
+    Le conteneur est choisi par l'extension de sortie :
+      - .mkv  : piste ASS (style conservé)
+      - .mp4 / .mov : piste mov_text (texte seul, style perdu)
+      - .webm : piste WebVTT
+    """
+    input_video = Path(input_video)
+    input_subs = Path(input_subs)
+
+    if not input_video.exists():
+        raise FileNotFoundError(f"Vidéo introuvable: {input_video}")
+    if not input_subs.exists():
+        raise FileNotFoundError(f"Sous-titres introuvables: {input_subs}")
+
+    out = Path(output_video) if output_video else input_video.with_name(input_video.stem + "_sub.mkv")
+    codec = _SOFT_SUBTITLE_CODECS.get(out.suffix.lower())
+    if codec is None:
+        raise ValueError(f"Conteneur non supporté pour les sous-titres: {out.suffix} ({', '.join(_SOFT_SUBTITLE_CODECS)})")
+    out.parent.mkdir(parents=True, exist_ok=True)
+
+    cmd = [ffmpeg_path, "-y" if overwrite else "-n", "-hide_banner",
+           "-i", str(input_video), "-i", str(input_subs),
+           "-map", "0:v", "-map", "0:a?", "-map", "1:0",
+           "-c:v", "copy", "-c:a", "copy", "-c:s", codec,
+           "-disposition:s:0", "default"]
+    if language:
+        cmd += ["-metadata:s:s:0", f"language={language}"]
+    if out.suffix.lower() in (".mp4", ".mov"):
+        cmd += ["-movflags", "+faststart"]
+    cmd.append(str(out))
+
+    logger.info("Lancement ffmpeg pour piste de sous-titres (sans ré-encodage) : %s", " ".join(shlex.quote(c) for c in cmd))
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=timeout)
+    if proc.returncode != 0:
+        logger.error("ffmpeg a échoué (returncode=%d). stderr:\n%s", proc.returncode, proc.stderr)
+        raise subprocess.CalledProcessError(proc.returncode, cmd, output=proc.stdout, stderr=proc.stderr)
+
+    logger.info("Fichier vidéo avec piste de sous-titres écrit : %s", out)
+    return out
@@ -1,8 +1,10 @@
 # pip install git+https://github.com/openai/whisper.git
 from pathlib import Path
-from typing import Any, Dict, Tuple
+from typing import Any, Optional, Union
 import logging
 
+import numpy as np
+
 try:
     import whisper
     import torch
@@ -12,14 +14,15 @@ except Exception as e:
 
 def transcribe_with_whisper_auto(
     logger: logging.Logger,
-    audio_path: Path,
+    audio: Union[str, Path, np.ndarray],  # chemin, ou buffer float32 mono 16 kHz déjà décodé
     model_name: str,     # e.g. "small", "base", "medium"
     device: str,         # "cuda", "cuda:0" or "cpu"
     language: str,
     temperature: float = 0.0,
     beam_size: int = 5,
     reuse: bool = True,
-    whisper_models: Dict[Tuple[str, str, str], Any] = {}
+    registry: Optional[Any] = None,  # ModelRegistry (utils.cache.model_registry) ; None = pas de cache
+    word_timestamps: bool = False,  # horodatage mot à mot natif de Whisper (sans modèle d'alignement)
 ) -> dict:
     if not HAS_WHISPER:
         raise RuntimeError("whisper non installé. 'pip install git+https://github.com/openai/whisper.git'")
@@ -30,54 +33,79 @@ def transcribe_with_whisper_auto(
         logger.warning("CUDA demandé mais indisponible. Passage en CPU.")
         requested_device = "cpu"
 
-    compute_type = "float32"
+    # float16 d'abord sur GPU (2x plus rapide), float32 en repli ; CPU : float32 uniquement
+    compute_types = ["float16", "float32"] if requested_device.startswith("cuda") else ["float32"]
     
-    key = (model_name, requested_device, compute_type)
-    try:
-        # récupération du modèle en cache si demandé
-        if reuse and key in whisper_models:
-            model = whisper_models[key]
-        else:
-            logger.info("Chargement whisper model=%s compute_type=%s device=%s", model_name, compute_type, requested_device)
-            # load_model accepte un paramètre device dans certaines versions,
-            # mais pour être sûr on load sur CPU puis on déplace sur device.
-            model = whisper.load_model(model_name, download_root=None)  # charge par défaut
-            # déplacer sur device
-            torch_device = torch.device(requested_device)
-            model.to(torch_device)
-            
-            if reuse:
-                whisper_models[key] = model
+    key = ("whisper", model_name, requested_device)
+
+    def load():
+        logger.info("Chargement whisper model=%s device=%s", model_name, requested_device)
+        # load_model accepte un paramètre device dans certaines versions,
+        # mais pour être sûr on load sur CPU puis on déplace sur device.
+        m = whisper.load_model(model_name, download_root=None)  # charge par défaut
+        # déplacer sur device
+        m.to(torch.device(requested_device))
+        return m
+
+    if isinstance(audio, np.ndarray):
+        logger.info("Transcription (whisper) d'un buffer de %.1fs (lang=%s)...", len(audio) / 16000, language)
+    else:
+        logger.info("Transcription (whisper) de %s (lang=%s)...", audio, language)
+        audio = str(audio)
+
+    last_exc = None
+    for compute_type in compute_types:
+        try:
+            # récupération du modèle en cache si demandé
+            if reuse and registry is not None:
+                model = registry.get(key, load)
+            else:
+                model = load()
 
-        logger.info("Transcription (whisper) de %s (lang=%s) with %s...", audio_path, language, compute_type)
-        # whisper.Model.transcribe retourne dict avec 'text' et 'segments'
-        result = model.transcribe(
-            str(audio_path),
-            language=language,
-            temperature=temperature,
-            beam_size=beam_size,
-            task="transcribe"
-        )
+            # whisper.Model.transcribe retourne dict avec 'text' et 'segments'
+            result = model.transcribe(
+                audio,
+                language=language,
+                temperature=temperature,
+                beam_size=beam_size if beam_size and beam_size > 1 else None,  # None = décodage glouton
+                fp16=(compute_type == "float16"),
+                word_timestamps=word_timestamps,
+                task="transcribe"
+            )
 
-        # normaliser les segments au même format que faster-whisper
-        segments = []
-        for s in result.get("segments", []):
-            segments.append({
-                "start": float(s["start"]),
-                "end": float(s["end"]),
-                "text": s["text"].strip()
-            })
+            # normaliser les segments au même format que faster-whisper
+            segments = []
+            for s in result.get("segments", []):
+                seg = {
+                    "start": float(s["start"]),
+                    "end": float(s["end"]),
+                    "text": s["text"].strip(),
+                    # scores de confiance (utilisés par le décodage adaptatif)
+                    "avg_logprob": s.get("avg_logprob"),
+                    "compression_ratio": s.get("compression_ratio"),
+                    "no_speech_prob": s.get("no_speech_prob"),
+                }
+                if word_timestamps:
+                    seg["words"] = [
+                        {"word": w["word"], "start": float(w["start"]), "end": float(w["end"]),
+                         "probability": w.get("probability")}
+                        for w in s.get("words", [])
+                    ]
+                segments.append(seg)
 
-        return {
-            "text": result.get("text", "").strip(),
-            "segments": segments,
-            "info": {k: result.get(k) for k in ("language", "language_probs") if k in result},
-            "compute_type": compute_type
-        }
+            return {
+                "text": result.get("text", "").strip(),
+                "segments": segments,
+                "language": result.get("language", language),
+                "info": {k: result.get(k) for k in ("language", "language_probs") if k in result},
+                "compute_type": compute_type
+            }
 
-    except Exception as exc:
-        logger.warning("Échec avec compute_type=%s : %s", compute_type, str(exc))
-        last_exc = exc
-        # essayer suivant compute_type
+        except Exception as exc:
+            logger.warning("Échec avec compute_type=%s : %s", compute_type, str(exc))
+            last_exc = exc
+            # essayer suivant compute_type
 
-    raise RuntimeError("Impossible de charger/transcrire avec whisper (essayé float16 et float32). Dernière erreur: " + str(last_exc))
+    raise RuntimeError(
+        f"Impossible de charger/transcrire avec whisper (essayé {' et '.join(compute_types)}). Dernière erreur: {last_exc}"
+    )
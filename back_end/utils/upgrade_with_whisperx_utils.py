@@ -1,23 +1,40 @@
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Tuple, Dict, Any, List
+from typing import Callable, Optional, Tuple, Dict, Any, List, Union
 
+import numpy as np
 import torch
 import whisperx
 
-from .transcribe_with_whisper_utils import transcribe_with_whisper_auto
+from .asr.registry import choose_backend
+from .asr.parallel import transcribe_chunked, DEFAULT_CHUNK_WORKERS, DEFAULT_MAX_CHUNK_S
+from .asr.adaptive import transcribe_adaptive, DEFAULT_DECODING
+from .asr.base import DEFAULT_TIMING_MODE, shift_segments
+from .audio.vad import compact_windows, remap_to_original, split_on_silences
+from .audio.wav_memmap import WavMemmap, open_wav
+from .cache.model_registry import model_registry
 
 torch.backends.cuda.matmul.allow_tf32 = True
 torch.backends.cudnn.allow_tf32 = True
 
 
-# caches pour éviter de recharger les modèles à chaque appel
-_WHISPER_MODELS: Dict[Tuple[str, str, Optional[str]], Any] = {}
-_ALIGN_MODELS: Dict[Tuple[str, str, Optional[str]], Any] = {}
+# les modèles whisper / alignement sont gardés dans model_registry (budget mémoire + LRU + TTL)
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# alignement par fenêtres de segments : la mémoire de pointe ne dépend plus de la durée du fichier
+ALIGN_WINDOW_S = float(os.environ.get("ALIGN_WINDOW_S", "300"))
+ALIGN_WORKERS = int(os.environ.get("ALIGN_WORKERS", "1"))
+_ALIGN_MARGIN_S = 1.0  # marge audio autour de chaque fenêtre (bornes Whisper approximatives)
+# avec on_aligned : l'audio est transcrit (puis aligné) par fenêtres de cette durée au plus
+INCREMENTAL_WINDOW_S = float(os.environ.get("ASR_INCREMENTAL_WINDOW_S", "120"))
+# avec une carte de parole : régions décodées par fenêtres compactes de cette durée au plus
+COMPACT_WINDOW_S = float(os.environ.get("ASR_COMPACT_WINDOW_S", "600"))
+SAMPLE_RATE = 16000
+
 
 
 def _resolve_device(device: str) -> str:
@@ -28,71 +45,243 @@ def _resolve_device(device: str) -> str:
 
 
 def _load_align_model(language_code: str, device: str, reuse: bool = True):
-    key = (language_code, device)
-    if reuse and key in _ALIGN_MODELS:
-        return _ALIGN_MODELS[key]
-
-    logger.info("Chargement du modèle d'alignement pour `%s` sur %s ...", language_code, device)
-    model_a, metadata = whisperx.load_align_model(language_code=language_code, device=device)
-    if reuse:
-        _ALIGN_MODELS[key] = (model_a, metadata)
+    def load():
+        logger.info("Chargement du modèle d'alignement pour `%s` sur %s ...", language_code, device)
+        return whisperx.load_align_model(language_code=language_code, device=device)
+
+    if not reuse:
+        return load()
+    model_a, metadata = model_registry.get(("align", language_code, device), load)
     return model_a, metadata
 
 
+def load_audio_16k(audio: Union[str, Path, np.ndarray, WavMemmap]) -> Union[np.ndarray, WavMemmap]:
+    """
+    Retourne l'audio en float32 mono 16 kHz (format attendu par Whisper et whisperx.align).
+    Un tableau déjà décodé est renvoyé tel quel : le fichier n'est décodé qu'une fois.
+    Un WAV PCM 16 kHz (celui d'extract_audio) est ouvert en memmap : les consommateurs
+    (VAD, découpage, alignement) lisent et convertissent seulement les fenêtres utiles.
+    """
+    if isinstance(audio, (np.ndarray, WavMemmap)):
+        return audio.astype(np.float32, copy=False) if isinstance(audio, np.ndarray) else audio
+    wav = open_wav(audio, sample_rate=SAMPLE_RATE)
+    if wav is not None:
+        logger.info("Audio ouvert en memmap: %s (%.1fs)", audio, wav.duration)
+        return wav
+    logger.info("Chargement audio depuis %s", audio)
+    return whisperx.load_audio(str(audio))
+
+
+def _window_groups(segments: List[Dict[str, Any]], window_s: float) -> List[List[Dict[str, Any]]]:
+    """Découpe la liste de segments en groupes consécutifs couvrant au plus `window_s` secondes."""
+    groups: List[List[Dict[str, Any]]] = []
+    for seg in segments:
+        if groups and float(seg["end"]) - float(groups[-1][0]["start"]) <= window_s:
+            groups[-1].append(seg)
+        else:
+            groups.append([seg])
+    return groups
+
+
+def align_chunked(
+    segments: List[Dict[str, Any]],
+    model_a: Any,
+    metadata: Any,
+    audio: Union[np.ndarray, WavMemmap],
+    device: str,
+    window_s: float = ALIGN_WINDOW_S,
+    workers: int = ALIGN_WORKERS,
+    on_aligned: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    whisperx.align par fenêtres de segments : chaque appel ne reçoit que la tranche
+    d'audio de sa fenêtre (vue numpy sans copie, ou fenêtre lue dans le memmap) et des timestamps relatifs, recalés
+    ensuite sur la timeline complète. Le modèle d'alignement est partagé ; avec
+    workers > 1 les fenêtres sont réparties sur un pool de threads.
+    `on_aligned` reçoit les segments de chaque fenêtre, dans l'ordre, dès qu'elle est alignée.
+    """
+    duration = len(audio) / SAMPLE_RATE
+    groups = _window_groups(segments, window_s)
+
+    def align_group(group):
+        start = max(0.0, float(group[0]["start"]) - _ALIGN_MARGIN_S)
+        end = min(duration, float(group[-1]["end"]) + _ALIGN_MARGIN_S)
+        view = audio[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)]  # vue (ndarray) ou fenêtre memmap
+        local = shift_segments([{k: v for k, v in seg.items() if k != "words"} for seg in group], -start)
+        aligned = whisperx.align(local, model_a, metadata, view, device=device)
+        return shift_segments(aligned.get("segments", local), start)
+
+    logger.info("Alignement par fenêtres: %d fenêtres de <= %.0fs (%d workers)", len(groups), window_s, workers)
+    out: List[Dict[str, Any]] = []
+    if workers > 1 and len(groups) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(align_group, groups)  # rendus dans l'ordre des fenêtres
+            for r in results:
+                out.extend(r)
+                if on_aligned is not None:
+                    on_aligned(r)
+    else:
+        for g in groups:
+            r = align_group(g)
+            out.extend(r)
+            if on_aligned is not None:
+                on_aligned(r)
+    return out
+
+
 def transcribe_and_align(
-    audio_clear_path: Path,
+    audio_clear_path: Union[Path, str, np.ndarray, WavMemmap],  # chemin, buffer float32 mono 16 kHz ou memmap
     language: str,                     # <-- par défaut EN si tu utilises whisper CLI en anglais
     whisper_model: str,
     device: str = "cuda",
     reuse_models: bool = True,
-) -> Tuple[Any, str]:
+    asr_backend: Optional[str] = None,  # "openai-whisper", "ctranslate2", "stub" ; None/"auto" = ASR_BACKEND
+    chunk_workers: Optional[int] = None,  # >1 : transcription par morceaux en parallèle (CPU) ; None = ASR_CHUNK_WORKERS
+    speech_regions: Optional[List[Tuple[float, float]]] = None,  # carte de parole (utils/audio/vad.py) ; None = tout le fichier
+    decoding: Optional[str] = None,  # "adaptive", "beam" ou "greedy" ; None = ASR_DECODING
+    timing_mode: Optional[str] = None,  # "align" (whisperx) ou "asr" (timestamps Whisper) ; None = TIMING_MODE
+    on_aligned: Optional[Callable[[List[Dict[str, Any]]], None]] = None,  # segments alignés, au fil de la transcription
+) -> Tuple[Any, str, Dict[str, Any]]:
    
    
     device = _resolve_device(device)
+    timing_mode = timing_mode or DEFAULT_TIMING_MODE
+    word_timestamps = timing_mode == "asr"
 
-    # charger l'audio (toujours nécessaire pour l'alignement)
+    # décodage unique : le même buffer sert à la transcription et à l'alignement
     try:
-        logger.info("Chargement audio depuis %s", audio_clear_path)
-        audio = whisperx.load_audio(str(audio_clear_path))
+        audio = load_audio_16k(audio_clear_path)
     except Exception as e:
         logger.exception("Impossible de charger l'audio: %s", e)
         raise
 
     # -------------- 1) Transcription (choix du back-end) -----------------------
+    decoding = decoding or DEFAULT_DECODING
     try:
-        logger.info("Transcription via whisper lib (transcribe_with_whisper)...")
-        result = transcribe_with_whisper_auto(
-            logger,
-            audio_path=audio_clear_path,
+        backend = choose_backend(asr_backend, device)
+        workers = DEFAULT_CHUNK_WORKERS if chunk_workers is None else chunk_workers
+        chunked = workers > 1 and not device.startswith("cuda")
+    except Exception as e:
+        logger.exception("Erreur durant la transcription (%s): %s", asr_backend or "auto", e)
+        raise
+
+    def decode(buf, beam):
+        if chunked:
+            # CPU : morceaux coupés sur les silences, un process (et un modèle) par worker
+            return transcribe_chunked(
+                buf,
+                backend.name,
+                model_name=whisper_model,
+                device=device,
+                language=language,
+                temperature=0.0,
+                beam_size=beam,
+                word_timestamps=word_timestamps,
+                workers=workers,
+            )
+        if not isinstance(buf, np.ndarray):
+            buf = np.asarray(buf)  # memmap -> float32 : le moteur décode tout le buffer
+        return backend.transcribe(
+            buf,
             model_name=whisper_model,
             device=device,
             language=language,
             temperature=0.0,
-            beam_size=5,
+            beam_size=beam,
             reuse=reuse_models,
-            whisper_models = _WHISPER_MODELS
+            word_timestamps=word_timestamps,
         )
-    except Exception as e:
-        logger.exception("Erreur durant la transcription avec whisper lib: %s", e)
-        raise
 
-    if "segments" not in result or not result["segments"]:
-        logger.error("La transcription n'a pas renvoyé de segments.")
-        raise SystemExit("Arrêt du programme : aucun segment trouvé.")
+    def transcribe(buf):
+        try:
+            if decoding == "adaptive":
+                return transcribe_adaptive(decode, buf, beam_size=5)
+            return decode(buf, 5 if decoding == "beam" else 1)
+        except Exception as e:
+            logger.exception("Erreur durant la transcription (%s): %s", backend.name, e)
+            raise
 
     # -------------- 2) Alignement mot-à-mot avec whisperx ---------------------
-    try:
-        model_a, metadata = _load_align_model(language, device, reuse=reuse_models)
-        logger.info("Alignement en cours...")
-        aligned = whisperx.align(result["segments"], model_a, metadata, audio, device=device)
-    except Exception as e:
-        logger.exception("Erreur durant l'alignement: %s", e)
-        raise
+    align_model = None
+
+    def align(asr_segments, on_window=None):
+        """Segments (timeline d'origine) -> mots horodatés."""
+        nonlocal align_model
+        if timing_mode == "asr":
+            # mots horodatés par le moteur ASR : même format {"word", "start", "end"} que whisperx
+            if on_window is not None:
+                on_window(asr_segments)
+            return asr_segments
+        try:
+            if align_model is None:
+                align_model = _load_align_model(language or detected_language, device, reuse=reuse_models)
+            model_a, metadata = align_model
+            return align_chunked(asr_segments, model_a, metadata, audio, device, on_aligned=on_window)
+        except Exception as e:
+            logger.exception("Erreur durant l'alignement: %s", e)
+            raise
+
+    logger.info("Transcription via %s (décodage %s%s)...", backend.name, decoding,
+                f", {workers} workers" if chunked else "")
+    if timing_mode == "asr":
+        logger.info("Alignement sauté (timing_mode=asr) : timestamps de mots du moteur ASR.")
+
+    # fenêtres décodées : (buffer, table de recalage du buffer compact, décalage en secondes)
+    window_s = INCREMENTAL_WINDOW_S if on_aligned is not None else COMPACT_WINDOW_S
+    if chunked:
+        window_s = max(window_s, workers * DEFAULT_MAX_CHUNK_S)  # une fenêtre occupe tout le pool
+    if speech_regions:
+        # seules les régions de parole sont décodées (silences / applaudissements retirés),
+        # mises bout à bout fenêtre par fenêtre : pas de copie compacte du fichier entier
+        speech_s = sum(e - s for s, e in speech_regions)
+        logger.info("Silences retirés: %.1fs décodées sur %.1fs", speech_s, len(audio) / SAMPLE_RATE)
+        windows = ((buf, table, 0.0) for buf, table in
+                   compact_windows(audio, speech_regions, SAMPLE_RATE, max_window_s=window_s))
+    elif on_aligned is not None:
+        # phrases au fil de l'eau : fenêtres coupées sur les silences, chacune alignée
+        # et transmise dès qu'elle est transcrite
+        bounds = split_on_silences(audio, SAMPLE_RATE, max_chunk_s=window_s, min_chunk_s=window_s / 3)
+        logger.info("Transcription incrémentale: %d fenêtres de <= %.0fs", len(bounds), window_s)
+        windows = ((audio[a:b], None, a / SAMPLE_RATE) for a, b in bounds)
+    else:
+        windows = [(audio, None, 0.0)]
+
+    segments: List[Dict[str, Any]] = []
+    pending: List[Dict[str, Any]] = []  # sans on_aligned : alignés en une fois à la fin
+    redecoded = 0
+    detected_language = language
+    for i, (buf, table, offset) in enumerate(windows):
+        result = transcribe(buf)
+        if i == 0:
+            detected_language = result.get("language", language)
+            language = language or detected_language  # fenêtres suivantes : même langue
+        redecoded += result.get("info", {}).get("redecoded_windows", 0)
+        window_segments = result.get("segments") or []
+        if table:
+            remap_to_original(window_segments, table)  # buffer compact -> timeline d'origine
+        else:
+            shift_segments(window_segments, offset)
+        if not window_segments:
+            continue
+        if on_aligned is None:
+            pending.extend(window_segments)
+        else:
+            segments.extend(align(window_segments, on_aligned))
+    if pending:
+        segments = align(pending)
+
+    # statistiques de la transcription (remontées jusqu'à l'évènement SSE "transcription")
+    info = {
+        "asr_backend": backend.name,
+        "decoding": decoding,
+        "redecoded_windows": redecoded,
+        "timing_mode": timing_mode,
+    }
+    if not segments:
+        # fichier / fenêtre sans parole : résultat vide (pas d'exception, l'appelant décide)
+        logger.warning("La transcription n'a renvoyé aucun segment.")
+        return [], detected_language, info
 
-    segments = aligned.get("segments", result.get("segments"))
-    detected_language = result.get("language", language)
-    logger.info("Terminé: %d segments, langue détectée: %s", len(segments) if segments else 0, detected_language)
-    
+    logger.info("Terminé: %d segments, langue détectée: %s", len(segments), detected_language)
     logger.info(segments)
-    
-    return segments, detected_language
\ No newline at end of file
+    return segments, detected_language, info
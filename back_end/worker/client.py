@@ -0,0 +1,204 @@
+# worker/client.py
+import logging
+import os
+import queue
+import secrets
+import subprocess
+import sys
+import time
+from multiprocessing.connection import Client
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BACK_END_DIR = Path(__file__).resolve().parents[1]
+
+
+class InferenceWorkerError(RuntimeError):
+    pass
+
+
+class InferenceWorkerPool:
+    """
+    Pool de workers d'inférence (voir worker/inference_worker.py).
+    Chaque appel emprunte un worker libre (bloque si tous sont occupés),
+    ce qui sérialise les requêtes par worker / par GPU.
+    Un worker dont la connexion tombe (process mort) est relancé s'il a été lancé
+    par ce pool, sinon retiré du pool.
+    """
+
+    def __init__(self, addresses: List[Tuple[str, int]], authkey: bytes):
+        self.addresses = list(addresses)
+        self.authkey = authkey
+        self._free: "queue.Queue[Tuple[str, int]]" = queue.Queue()
+        for addr in self.addresses:
+            self._free.put(addr)
+        self._alive = set(self.addresses)
+        self._procs: Dict[Tuple[str, int], subprocess.Popen] = {}
+        self._stub = False
+
+    @classmethod
+    def spawn_local(cls, n: int, base_port: int = 6100, stub: bool = False) -> "InferenceWorkerPool":
+        """Lance `n` workers locaux (un process python chacun) et attend qu'ils répondent."""
+        addresses = [("127.0.0.1", base_port + i) for i in range(n)]
+        pool = cls(addresses, secrets.token_hex(16).encode())
+        pool._stub = stub
+        for addr in addresses:
+            pool._spawn(addr)
+        for addr in addresses:
+            pool._wait_ready(addr)
+        return pool
+
+    def _spawn(self, addr: Tuple[str, int]) -> None:
+        host, port = addr
+        cmd = [sys.executable, "-m", "worker.inference_worker",
+               "--host", host, "--port", str(port), "--authkey", self.authkey.decode()]
+        if self._stub:
+            cmd.append("--stub")
+        logger.info("Lancement worker d'inférence sur %s:%d (stub=%s)", host, port, self._stub)
+        self._procs[addr] = subprocess.Popen(cmd, cwd=str(BACK_END_DIR))
+
+    def _recover(self, addr: Tuple[str, int]) -> bool:
+        """Worker injoignable : relancé si local (True), sinon retiré du pool (False)."""
+        proc = self._procs.get(addr)
+        if proc is None:
+            logger.error("Worker %s:%d injoignable : retiré du pool", *addr)
+            self._alive.discard(addr)
+            return False
+        logger.error("Worker %s:%d mort (code %s) : relance", addr[0], addr[1], proc.poll())
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+        try:
+            self._spawn(addr)
+            self._wait_ready(addr)
+        except Exception:
+            logger.exception("Relance du worker %s:%d impossible : retiré du pool", *addr)
+            self._alive.discard(addr)
+            return False
+        return True
+
+    def _call(self, addr: Tuple[str, int], request: Dict[str, Any],
+              on_event: Optional[Callable[[Dict[str, Any]], None]] = None) -> Any:
+        with Client(addr, authkey=self.authkey) as conn:
+            conn.send(request)
+            # le worker peut envoyer des messages {"event": ...} avant la réponse finale
+            while True:
+                response = conn.recv()
+                if "event" not in response:
+                    break
+                if on_event is not None:
+                    on_event(response)
+        if not response.get("ok"):
+            raise InferenceWorkerError(
+                f"Worker {addr[0]}:{addr[1]} : {response.get('error')}\n{response.get('traceback', '')}"
+            )
+        return response.get("result")
+
+    def _wait_ready(self, addr: Tuple[str, int], timeout: float = 60.0) -> None:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                self._call(addr, {"op": "ping"})
+                return
+            except (ConnectionRefusedError, FileNotFoundError):
+                if time.monotonic() > deadline:
+                    raise InferenceWorkerError(f"Worker {addr[0]}:{addr[1]} injoignable après {timeout}s")
+                time.sleep(0.2)
+
+    def _acquire(self) -> Tuple[str, int]:
+        while True:
+            if not self._alive:
+                raise InferenceWorkerError("Aucun worker d'inférence disponible")
+            try:
+                return self._free.get(timeout=1.0)
+            except queue.Empty:
+                continue
+
+    def request(self, op: str, on_event: Optional[Callable[[Dict[str, Any]], None]] = None, **kwargs: Any) -> Any:
+        addr = self._acquire()
+        usable = True
+        try:
+            return self._call(addr, {"op": op, "kwargs": kwargs, "events": on_event is not None}, on_event)
+        except (EOFError, ConnectionError, FileNotFoundError) as e:
+            # process mort pendant (ou avant) la requête : ne pas rendre une adresse morte au pool
+            usable = self._recover(addr)
+            raise InferenceWorkerError(f"Worker {addr[0]}:{addr[1]} : connexion perdue ({e!r})") from e
+        finally:
+            if usable:
+                self._free.put(addr)
+
+    def build_phrases(
+        self,
+        on_phrases: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+        **kwargs: Any,
+    ) -> Tuple[List[Dict[str, Any]], str, Dict[str, Any]]:
+        on_event = None
+        if on_phrases is not None:
+            def on_event(message):
+                if message["event"] == "phrases":
+                    on_phrases(message["data"])
+        segments, lang, info = self.request("build_phrases", on_event=on_event, **kwargs)
+        return segments, lang, info
+
+    def close(self) -> None:
+        # on n'arrête que les workers lancés par ce pool (pas les workers externes)
+        if not self._procs:
+            return
+        for addr in self.addresses:
+            try:
+                self._call(addr, {"op": "shutdown"})
+            except Exception:
+                pass
+        for p in self._procs.values():
+            try:
+                p.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                p.kill()
+        self._procs = {}
+
+
+# --- pool global, configuré par variables d'environnement ---
+# INFERENCE_WORKERS=N           : lance N workers locaux au démarrage de l'API (0 = inférence dans l'API)
+# INFERENCE_WORKER_PORT=6100    : premier port utilisé par les workers locaux
+# INFERENCE_WORKER_STUB=1       : workers factices (aucun modèle, utile sur une machine CPU)
+# INFERENCE_WORKER_ADDRESSES    : "host:port,host:port" de workers déjà lancés (+ INFERENCE_WORKER_AUTHKEY)
+_POOL: Optional[InferenceWorkerPool] = None
+
+
+def start_worker_pool() -> Optional[InferenceWorkerPool]:
+    global _POOL
+    if _POOL is not None:
+        return _POOL
+
+    external = os.environ.get("INFERENCE_WORKER_ADDRESSES", "").strip()
+    if external:
+        addresses = []
+        for item in external.split(","):
+            host, _, port = item.strip().rpartition(":")
+            addresses.append((host or "127.0.0.1", int(port)))
+        authkey = os.environ.get("INFERENCE_WORKER_AUTHKEY", "").encode()
+        _POOL = InferenceWorkerPool(addresses, authkey)
+        return _POOL
+
+    n = int(os.environ.get("INFERENCE_WORKERS", "0") or 0)
+    if n <= 0:
+        return None
+    _POOL = InferenceWorkerPool.spawn_local(
+        n,
+        base_port=int(os.environ.get("INFERENCE_WORKER_PORT", "6100")),
+        stub=os.environ.get("INFERENCE_WORKER_STUB") == "1",
+    )
+    return _POOL
+
+
+def get_worker_pool() -> Optional[InferenceWorkerPool]:
+    return _POOL
+
+
+def stop_worker_pool() -> None:
+    global _POOL
+    if _POOL is not None:
+        _POOL.close()
+        _POOL = None
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# worker/inference_worker.py
+"""
+Process d'inférence résident : garde Whisper / les modèles d'alignement chargés
+entre les jobs. L'API lui parle via multiprocessing.connection (socket locale + authkey).
+
+Lancement manuel (depuis back_end/) :
+    python -m worker.inference_worker --port 6100 --authkey secret
+    python -m worker.inference_worker --port 6100 --authkey secret --stub   # sans modèles (CPU / tests)
+"""
+import argparse
+import logging
+import traceback
+import wave
+from multiprocessing.connection import Listener
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("inference_worker")
+logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+
+
+def _stub_build_phrases(
+    audio_clear_path: Any,
+    language: str,
+    whisper_model: str,
+    device: str = "cpu",
+    reuse_models: bool = True,
+    on_phrases: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+    **_: Any,
+) -> Tuple[List[Dict[str, Any]], str, Dict[str, Any]]:
+    """
+    Remplaçant déterministe de build_phrases (aucun modèle chargé) :
+    une phrase toutes les 3 secondes sur la durée du WAV (ou du buffer 16 kHz).
+    """
+    if not isinstance(audio_clear_path, (str, Path)):
+        duration = len(audio_clear_path) / 16000.0
+    else:
+        try:
+            with wave.open(str(audio_clear_path), "rb") as wf:
+                duration = wf.getnframes() / float(wf.getframerate() or 1)
+        except (wave.Error, EOFError):
+            duration = 3.0
+
+    segments = []
+    t, i = 0.0, 0
+    while t < duration:
+        end = min(duration, t + 3.0)
+        text = f"segment {i + 1}"
+        segments.append({
+            "start": round(t, 3),
+            "end": round(end, 3),
+            "text": text,
+            "words": [{"word": w, "start": round(t, 3), "end": round(end, 3)} for w in text.split()],
+        })
+        t, i = end, i + 1
+    if on_phrases is not None and segments:
+        on_phrases(segments)
+    return segments, language, {"asr_backend": "stub", "decoding": None, "redecoded_windows": 0}
+
+
+def _handle(request: Dict[str, Any], stub: bool,
+            send_event: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    op = request.get("op")
+    if op == "ping":
+        return {"ok": True, "result": "pong"}
+    if op == "stats":
+        # compteurs du registre de modèles de ce worker (hits / misses / temps de chargement)
+        from utils.cache.model_registry import model_registry
+        return {"ok": True, "result": model_registry.snapshot()}
+    if op == "build_phrases":
+        if stub:
+            build = _stub_build_phrases
+        else:
+            # import tardif : torch / whisperx ne sont chargés que dans ce process
+            from utils.align_utils import build_phrases as build
+        kwargs = dict(request.get("kwargs", {}))
+        if request.get("events") and send_event is not None:
+            # phrases envoyées au client au fil de l'alignement, avant la réponse finale
+            kwargs["on_phrases"] = lambda phrases: send_event({"event": "phrases", "data": phrases})
+        segments, lang, info = build(**kwargs)
+        return {"ok": True, "result": (segments, lang, info)}
+    return {"ok": False, "error": f"opération inconnue: {op}"}
+
+
+def serve(host: str, port: int, authkey: bytes, stub: bool = False) -> None:
+    """
+    Boucle principale : une requête à la fois (un worker = un GPU / un jeu de modèles).
+    Les modèles restent en cache dans ce process entre les requêtes.
+    """
+    with Listener((host, port), authkey=authkey) as listener:
+        logger.info("Worker d'inférence prêt sur %s:%d (stub=%s)", host, port, stub)
+        while True:
+            with listener.accept() as conn:
+                try:
+                    request = conn.recv()
+                except EOFError:
+                    continue
+                if request.get("op") == "shutdown":
+                    conn.send({"ok": True, "result": None})
+                    logger.info("Arrêt du worker demandé.")
+                    return
+                try:
+                    response = _handle(request, stub, conn.send)
+                except BaseException as e:
+                    # SystemExit & co. levés par le code d'inférence ne doivent pas tuer le worker :
+                    # l'erreur est renvoyée au client et le worker reste disponible
+                    logger.exception("Erreur dans le worker: %r", e)
+                    response = {"ok": False, "error": str(e) or repr(e), "traceback": traceback.format_exc()}
+                    if isinstance(e, KeyboardInterrupt):
+                        conn.send(response)
+                        raise
+                conn.send(response)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Worker d'inférence résident (Whisper + alignement)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--authkey", required=True)
+    parser.add_argument("--stub", action="store_true", help="réponses factices, aucun modèle chargé")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.authkey.encode(), stub=args.stub)